@@ -1,11 +1,13 @@
-import subprocess
-
 import streamlit as st
 import pandas as pd
 import os
+import time
+from cache import default_cache, restore_outputs
 from coord import create_indexed_pharmacy_file
 from matrix import extract_and_convert_matrices
 from pdf_generator import generate_pdf
+import numpy_solver
+from solver import LIB_PATH, SolveJob, load_library, solve, tuned_params, write_routes
 
 def main():
     st.header("Upload du fichier CSV")
@@ -24,9 +26,15 @@ def main():
             st.header("Aperçu du fichier")
             st.dataframe(df)
 
+            time_limit = st.number_input("Temps de calcul maximal (secondes, 0 : sans limite)",
+                                         min_value=0, value=0, step=5)
+
             if st.button("Trouver le meilleur chemin", type="primary"):
                 with st.spinner("Traitement en cours :"):
-                    process_file(uploaded_file)
+                    process_file(uploaded_file, time_limit or None)
+
+            if "job" in st.session_state:
+                follow_job()
 
             if "result_matrix" in st.session_state:
                 display_matrixes(st.session_state["result_matrix"])
@@ -43,30 +51,92 @@ def main():
         st.info("Veuillez uploader un fichier CSV pour commencer")
 
 
-def process_file(uploaded_file):
+def process_file(uploaded_file, time_limit=None):
 
     try:
-        os.makedirs('Python/input', exist_ok=True)
-        temp_file_path = f"Python/input/{uploaded_file.name}"
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        st.session_state["result_coord"] = create_indexed_pharmacy_file(temp_file_path)
-        st.session_state["result_matrix"]  = extract_and_convert_matrices()
-        if st.session_state["result_matrix"] is None:
-            st.error("Échec de l'extraction des matrices")
-            return
-        subprocess.run(["make", "clean"], cwd=".", capture_output=True, text=True)
-        build = subprocess.run(["make"], cwd=".", capture_output=True, text=True)
-        if build.returncode != 0:
-            st.error(f"Erreur lors du make :\n{build.stderr}")
+        cache = default_cache()
+        prepared_key = cache.prepared_key(uploaded_file.getvalue())
+        prepared = cache.get(prepared_key)
+
+        if prepared is None:
+            os.makedirs('Python/input', exist_ok=True)
+            temp_file_path = f"Python/input/{uploaded_file.name}"
+            with open(temp_file_path, "wb") as f:
+                f.write(uploaded_file.getbuffer())
+            create_indexed_pharmacy_file(temp_file_path)
+            prepared = extract_and_convert_matrices()
+            if prepared is None:
+                st.error("Échec de l'extraction des matrices")
+                return
+            cache.put(prepared_key, prepared)
+        else:
+            # Fichiers relus par la génération du PDF
+            restore_outputs(prepared[2], prepared[0], prepared[1])
+
+        distance_df, time_df, coord_df = prepared
+        st.session_state["result_coord"] = coord_df
+        st.session_state["result_matrix"] = prepared
+        st.session_state.pop("Ran", None)
+
+        options = {"runs": 3, "time_limit": time_limit, "params": tuned_params(len(time_df))}
+        solver, solver_path = solve, LIB_PATH
+        try:
+            load_library()  # Compilation éventuelle : la clé dépend de la bibliothèque
+        except RuntimeError:
+            st.warning("Solveur C indisponible : résolution par le solveur NumPy, plus lent")
+            solver, solver_path = numpy_solver.solve, numpy_solver.__file__
+        solution_key = cache.solution_key(prepared_key, options, solver_path)
+        routes = cache.get(solution_key)
+        if routes is not None:
+            write_routes(routes)
+            st.session_state["Ran"] = True
+            st.success("Tournées retrouvées dans le cache")
             return
-        cmd = ["./vrp", "./Python/output/time.csv", "./Python/output/meters.csv"]
-        subprocess.run(cmd, capture_output=True, text=True)
-        st.session_state["Ran"] = True
+
+        st.session_state["job"] = SolveJob(time_df.to_numpy(), distance_df.to_numpy(), solver=solver,
+                                           coordinates=coord_df[['latitude', 'longitude']].to_numpy(),
+                                           **options)
+        st.session_state["job_key"] = solution_key
     except Exception as e:
         st.error(f"Erreur durant le traitement: {e}")
 
 
+def follow_job():
+    """Courbe de convergence en direct ; l'arrêt garde la meilleure solution trouvée."""
+    job = st.session_state["job"]
+
+    if st.button("Arrêter et garder la meilleure solution"):
+        job.stop()
+
+    status = st.empty()
+    chart = st.empty()
+    while True:
+        finished = job.done()
+        history = list(job.history)
+        if history:
+            progress = pd.DataFrame(history)
+            chart.line_chart(progress.pivot_table(index='generation', columns='seed',
+                                                  values='fitness', aggfunc='min'))
+            best = progress.loc[progress['fitness'].idxmin()]
+            status.info(f"Génération {progress['generation'].max()} — meilleure fitness {best['fitness']}, "
+                        f"{best['vehicles']} véhicules, {best['distance'] / 1000:.1f} km "
+                        f"({progress['gen_per_s'].iloc[-1]:.0f} gén/s)")
+        if finished:
+            break
+        time.sleep(0.5)
+
+    del st.session_state["job"]
+    solution_key = st.session_state.pop("job_key", None)
+    if job.error is not None:
+        st.error(f"Erreur durant le traitement: {job.error}")
+        return
+    write_routes(job.result.routes)
+    st.session_state["Ran"] = True
+    # Une résolution arrêtée avant son terme n'est pas mémorisée
+    if solution_key is not None and not job.stopped():
+        default_cache().put(solution_key, job.result.routes)
+
+
 def display_matrixes(result_matrix):
     tab1, tab2, tab3 = st.tabs(["Matrice des distances", "Matrice des temps de trajet", "Coordonées"])
 
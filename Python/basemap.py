@@ -0,0 +1,268 @@
+"""
+Fond de carte tuilé (CartoDB Positron) avec cache disque persistant
+Chaque tuile n'est téléchargée qu'une fois puis relue depuis Python/sources/tiles.
+Le cache est borné en taille : les tuiles les moins récemment utilisées sont
+supprimées en premier. Une fois le cache rempli (ou pré-rempli avec --seed),
+les cartes se dessinent sans réseau.
+
+Usage : python Python/basemap.py --seed [--zoom 11-13] [--bbox ouest,sud,est,nord]
+"""
+
+import argparse
+import io
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+TILE_URL = "https://a.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png"
+ATTRIBUTION = "© OpenStreetMap contributors © CARTO"
+TILE_SIZE = 256
+
+CACHE_DIR = os.path.join('Python', 'sources', 'tiles')
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+CATALOGUE_FILE = os.path.join('Python', 'sources', 'pharmacies_coordonnees.csv')
+
+# Demi-circonférence terrestre en Web Mercator (EPSG:3857), en mètres
+HALF_WORLD = 20037508.342789244
+
+
+def lonlat_to_mercator(lon, lat):
+    """Projette un point (lon, lat) en Web Mercator."""
+    x = lon * HALF_WORLD / 180
+    y = math.log(math.tan((90 + lat) * math.pi / 360)) * HALF_WORLD / math.pi
+    return x, y
+
+
+def mercator_to_tile(x, y, zoom):
+    """Coordonnées de tuile (fractionnaires) d'un point Web Mercator."""
+    n = 2 ** zoom
+    return (x + HALF_WORLD) / (2 * HALF_WORLD) * n, (HALF_WORLD - y) / (2 * HALF_WORLD) * n
+
+
+def tile_to_mercator(tx, ty, zoom):
+    """Coin haut-gauche d'une tuile en Web Mercator."""
+    n = 2 ** zoom
+    return tx / n * 2 * HALF_WORLD - HALF_WORLD, HALF_WORLD - ty / n * 2 * HALF_WORLD
+
+
+def tile_range(west, south, east, north, zoom):
+    """Tuiles (x0, x1, y0, y1 inclus) couvrant une emprise Web Mercator."""
+    last = 2 ** zoom - 1
+    x0, y0 = mercator_to_tile(west, north, zoom)
+    x1, y1 = mercator_to_tile(east, south, zoom)
+    return (max(0, int(x0)), min(last, int(x1)),
+            max(0, int(y0)), min(last, int(y1)))
+
+
+class TileCache:
+    """Cache disque de tuiles {z}/{x}/{y}.png, borné à max_bytes."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, url=None, offline=None):
+        """
+        Args:
+            url: Modèle d'URL des tuiles (par défaut BASEMAP_TILE_URL ou CartoDB Positron)
+            offline: Ne jamais télécharger (par défaut, vrai si BASEMAP_OFFLINE est défini)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.url = url or os.environ.get("BASEMAP_TILE_URL") or TILE_URL
+        self.offline = bool(os.environ.get("BASEMAP_OFFLINE")) if offline is None else offline
+        self.size = None
+        self.session = None
+        self.hits = 0
+        self.downloads = 0
+
+    def _path(self, z, x, y):
+        return os.path.join(self.directory, str(z), str(x), f"{y}.png")
+
+    def _files(self):
+        """Tuiles présentes sur disque : liste de (date d'utilisation, taille, chemin)."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Supprimée entre-temps par un autre processus
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _download(self, z, x, y):
+        if self.session is None:
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          respect_retry_after_header=True, raise_on_status=False)
+            self.session = requests.Session()
+            self.session.mount("http://", HTTPAdapter(max_retries=retry))
+            self.session.mount("https://", HTTPAdapter(max_retries=retry))
+            self.session.headers["User-Agent"] = "CERP-Genetic/1.0"
+
+        try:
+            response = self.session.get(self.url.format(z=z, x=x, y=y), timeout=(5, 20))
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        return response.content
+
+    def get(self, z, x, y):
+        """Contenu PNG d'une tuile, depuis le disque ou le réseau ; None si indisponible."""
+        path = self._path(z, x, y)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Date d'utilisation pour l'éviction
+            self.hits += 1
+            return data
+        except FileNotFoundError:
+            pass
+
+        if self.offline:
+            return None
+
+        data = self._download(z, x, y)
+        if data is not None:
+            self.downloads += 1
+            self._store(path, data)
+        return data
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Écriture atomique : plusieurs processus de rendu partagent le cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self._files())
+        else:
+            self.size += len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self, target_bytes=None):
+        """Supprime les tuiles les moins récemment utilisées jusqu'à target_bytes (90 % du maximum par défaut)."""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.size = total
+
+    def seed(self, west, south, east, north, zooms):
+        """
+        Pré-remplit le cache pour une emprise en degrés (lon/lat) et une liste de niveaux de zoom.
+
+        Returns:
+            Nombre de tuiles disponibles dans le cache pour cette emprise
+        """
+        west, south = lonlat_to_mercator(west, south)
+        east, north = lonlat_to_mercator(east, north)
+
+        available = 0
+        for z in zooms:
+            x0, x1, y0, y1 = tile_range(west, south, east, north, z)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    if self.get(z, x, y) is not None:
+                        available += 1
+        return available
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Cache partagé par les cartes d'un même processus."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TileCache()
+    return _default_cache
+
+
+def render_basemap(west, south, east, north, zoom, cache=None):
+    """
+    Assemble les tuiles couvrant une emprise Web Mercator.
+
+    Les tuiles indisponibles (hors ligne, absentes du cache) restent en gris clair.
+
+    Returns:
+        (image RGB en tableau NumPy, emprise (gauche, droite, bas, haut) de l'image)
+    """
+    cache = cache or default_cache()
+    x0, x1, y0, y1 = tile_range(west, south, east, north, zoom)
+
+    mosaic = Image.new("RGB", ((x1 - x0 + 1) * TILE_SIZE, (y1 - y0 + 1) * TILE_SIZE), (235, 235, 235))
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            data = cache.get(zoom, x, y)
+            if data is None:
+                continue
+            tile = Image.open(io.BytesIO(data)).convert("RGB")
+            mosaic.paste(tile, ((x - x0) * TILE_SIZE, (y - y0) * TILE_SIZE))
+
+    left, top = tile_to_mercator(x0, y0, zoom)
+    right, bottom = tile_to_mercator(x1 + 1, y1 + 1, zoom)
+    return np.asarray(mosaic), (left, right, bottom, top)
+
+
+def add_basemap(ax, west, south, east, north, zoom=12, cache=None):
+    """Dessine le fond de carte tuilé sous une emprise Web Mercator."""
+    image, extent = render_basemap(west, south, east, north, zoom, cache)
+    ax.imshow(image, extent=extent, interpolation='bilinear', zorder=0)
+    ax.set_xlim(west, east)
+    ax.set_ylim(south, north)
+    ax.text(0.995, 0.005, ATTRIBUTION, transform=ax.transAxes, fontsize=6,
+            ha='right', va='bottom', color='#555555', zorder=12)
+
+
+def service_area(catalogue=CATALOGUE_FILE, margin=0.05):
+    """Emprise (ouest, sud, est, nord) en degrés couvrant toutes les pharmacies du catalogue."""
+    df = pd.read_csv(catalogue, encoding='utf-8').dropna(subset=['latitude', 'longitude'])
+    return (df['longitude'].min() - margin, df['latitude'].min() - margin,
+            df['longitude'].max() + margin, df['latitude'].max() + margin)
+
+
+def _parse_zooms(text):
+    if "-" in text:
+        low, high = text.split("-")
+        return list(range(int(low), int(high) + 1))
+    return [int(z) for z in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache des tuiles du fond de carte")
+    parser.add_argument("--seed", action="store_true", help="Pré-remplir le cache pour la zone desservie")
+    parser.add_argument("--zoom", default="12", help="Niveaux de zoom, ex. 12 ou 10-13 (défaut 12)")
+    parser.add_argument("--bbox", help="Emprise ouest,sud,est,nord en degrés (défaut: catalogue des pharmacies)")
+    parser.add_argument("--max-mb", type=int, default=MAX_CACHE_BYTES // (1024 * 1024), help="Taille maximale du cache")
+    args = parser.parse_args()
+
+    cache = TileCache(max_bytes=args.max_mb * 1024 * 1024)
+    if args.seed:
+        bbox = [float(v) for v in args.bbox.split(",")] if args.bbox else service_area()
+        zooms = _parse_zooms(args.zoom)
+        print(f"Pré-remplissage du cache {cache.directory} (zoom {zooms}, emprise {bbox})...")
+        available = cache.seed(*bbox, zooms)
+        print(f"{available} tuiles disponibles ({cache.downloads} téléchargées, {cache.hits} déjà en cache)")
+    else:
+        files = cache._files()
+        print(f"Cache {cache.directory}: {len(files)} tuiles, {sum(s for _, s, _ in files) / 1e6:.1f} Mo")
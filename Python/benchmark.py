@@ -0,0 +1,285 @@
+"""
+Banc d'essai du solveur génétique
+Résout les tournées livraison20 et livraison85 ainsi que des instances
+synthétiques avec des graines fixes, puis enregistre pour chaque exécution :
+générations par seconde, temps pour atteindre la fitness cible, fitness finale,
+véhicules et mémoire maximale. Le JSON produit se compare d'un commit à l'autre.
+
+Usage (depuis la racine du dépôt) :
+    python Python/benchmark.py [--seeds 1,2,3] [--synthetic 200,500] [--output bench.json]
+    python Python/benchmark.py --compare data/benchmark-ancien.json
+    python Python/benchmark.py --params crossover=ox --compare data/benchmark-<commit>.json
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from coord import load_catalogue
+from matrix import gather_submatrix, load_matrix_store
+
+INPUT_DIR = os.path.join('Python', 'input')
+DELIVERY_FILES = ['livraison20.csv', 'livraison85.csv']
+DEFAULT_SEEDS = [1, 2, 3]
+DEFAULT_SYNTHETIC = [200, 500]
+
+# Instances synthétiques : pharmacies tirées autour du dépôt (Mareuil-lès-Meaux)
+DEPOT_LAT, DEPOT_LON = 48.93, 2.87
+SYNTHETIC_RADIUS_KM = 40
+ROAD_FACTOR = 1.3             # détour de la route par rapport au vol d'oiseau
+SPEED_M_PER_S = 50 / 3.6      # 50 km/h
+
+
+def delivery_instance(path):
+    """Matrices et coordonnées d'un fichier de livraison (dépôt en indice 0), sans écrire Python/output."""
+    catalogue = load_catalogue()
+    names = pd.read_csv(path, header=None, names=['nom', 'adresse', 'code_postal', 'ville'], encoding='utf-8')['nom']
+    matched = catalogue.match_exact(names).dropna(subset=['indice'])
+
+    depot = catalogue.df[catalogue.df['indice'] == 0]
+    rows = pd.concat([depot, matched], ignore_index=True)
+    indices = rows['indice'].astype(np.int64).to_numpy()
+
+    distance_matrix, distance_rows = load_matrix_store('meters')
+    time_matrix, time_rows = load_matrix_store('time')
+    return (gather_submatrix(time_matrix, time_rows, indices),
+            gather_submatrix(distance_matrix, distance_rows, indices),
+            rows[['latitude', 'longitude']].to_numpy(dtype=np.float64))
+
+
+def synthetic_instance(num_pharmacies, seed=0):
+    """Instance aléatoire reproductible : distances routières approchées et temps à vitesse constante."""
+    rng = np.random.default_rng(seed)
+    radius = SYNTHETIC_RADIUS_KM * np.sqrt(rng.random(num_pharmacies))
+    angle = 2 * np.pi * rng.random(num_pharmacies)
+
+    lat = np.concatenate([[DEPOT_LAT], DEPOT_LAT + radius * np.sin(angle) / 111.0])
+    lon = np.concatenate([[DEPOT_LON], DEPOT_LON + radius * np.cos(angle) / (111.0 * math.cos(math.radians(DEPOT_LAT)))])
+
+    phi = np.radians(lat)
+    dphi = phi[:, None] - phi[None, :]
+    dlambda = np.radians(lon)[:, None] - np.radians(lon)[None, :]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlambda / 2) ** 2
+    meters = 2 * 6371000 * np.arcsin(np.sqrt(a)) * ROAD_FACTOR
+
+    return (np.rint(meters / SPEED_M_PER_S).astype(np.int32), np.rint(meters).astype(np.int32),
+            np.column_stack([lat, lon]))
+
+
+def time_to_target(trace, target):
+    """Premier instant où la trace atteint la cible, None si jamais."""
+    for elapsed, fitness in trace:
+        if fitness <= target:
+            return elapsed
+    return None
+
+
+def _route_distance(dist_matrix, route):
+    stops = np.concatenate([[0], route, [0]])
+    return int(dist_matrix[stops[:-1], stops[1:]].sum())
+
+
+def _init_worker():
+    # Les traces de génération du solveur (printf) ne polluent pas le rapport
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+
+
+def _run_case(time_matrix, dist_matrix, coordinates, seed, params=None):
+    """Une exécution dans un processus neuf : la mémoire maximale est celle de ce seul calcul."""
+    from solver import solve
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = solve(time_matrix, dist_matrix, runs=1, jobs=1, seed=seed, coordinates=coordinates,
+                   params=params)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    stats = result.stats
+    search_time = stats.elapsed - stats.init_time
+    return {
+        "seed": seed,
+        "fitness": result.fitness,
+        "vehicles": len(result.routes),
+        "distance": sum(_route_distance(dist_matrix, route) for route in result.routes),
+        "generations": stats.generations,
+        "init_time": round(stats.init_time, 4),
+        "elapsed": round(stats.elapsed, 4),
+        "generations_per_second": round(stats.generations / search_time, 2) if search_time > 0 else None,
+        "restarts": stats.restarts,
+        "clones": stats.clones,
+        "cache_hit_rate": round(stats.cache_hit_rate, 4) if stats.cache_hit_rate is not None else None,
+        "peak_rss_mb": round(peak / 1024, 1),
+        "solver_rss_mb": round((peak - baseline) / 1024, 1),
+        "trace": [[round(t, 4), f] for t, f in stats.trace],
+    }
+
+
+def _summary(runs, target):
+    times = [time_to_target(run["trace"], target) for run in runs]
+    reached = [t for t in times if t is not None]
+    for run, t in zip(runs, times):
+        run["time_to_target"] = None if t is None else round(t, 4)
+
+    return {
+        "target": target,
+        "reached": len(reached),
+        "median_time_to_target": round(statistics.median(reached), 4) if reached else None,
+        "median_generations_per_second": round(statistics.median(r["generations_per_second"] or 0 for r in runs), 2),
+        "median_fitness": statistics.median(r["fitness"] for r in runs),
+        "best_fitness": min(r["fitness"] for r in runs),
+        "median_vehicles": statistics.median(r["vehicles"] for r in runs),
+        "max_peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_params(spec):
+    """Paramètres "crossover=ox,mutation_rate=0.3" (mêmes noms que vrp -p), valeurs numériques converties."""
+    params = {}
+    for item in filter(None, spec.split(",")):
+        name, _, value = item.partition("=")
+        try:
+            params[name] = int(value)
+        except ValueError:
+            try:
+                params[name] = float(value)
+            except ValueError:
+                params[name] = value
+    return params
+
+
+def run_benchmark(seeds, synthetic_sizes, baseline=None, params=None):
+    """
+    Lance toutes les exécutions et retourne le rapport.
+
+    La cible de chaque instance est la pire fitness finale parmi les graines
+    (niveau atteint par toutes), ou celle du rapport de référence s'il est fourni,
+    pour mesurer le temps nécessaire à retrouver la même qualité.
+    """
+    from solver import load_library
+    load_library()  # Compilation éventuelle avant de lancer les processus
+
+    instances = {}
+    for name in DELIVERY_FILES:
+        instances[os.path.splitext(name)[0]] = delivery_instance(os.path.join(INPUT_DIR, name))
+    for size in synthetic_sizes:
+        instances[f"synthetic{size}"] = synthetic_instance(size, seed=size)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "seeds": seeds,
+        "params": params or {},
+        "instances": {},
+    }
+
+    # Un processus neuf par exécution (mesure mémoire isolée), une exécution à la fois (mesure de débit)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker,
+                             max_tasks_per_child=1) as executor:
+        for name, (time_matrix, dist_matrix, coordinates) in instances.items():
+            print(f"{name} ({len(time_matrix) - 1} pharmacies)...", flush=True)
+            runs = [executor.submit(_run_case, time_matrix, dist_matrix, coordinates, seed, params).result()
+                    for seed in seeds]
+
+            target = max(r["fitness"] for r in runs)
+            if baseline and name in baseline["instances"]:
+                target = baseline["instances"][name]["summary"]["target"]
+
+            report["instances"][name] = {
+                "cities": len(time_matrix),
+                "summary": _summary(runs, target),
+                "runs": runs,
+            }
+    return report
+
+
+def print_report(report, baseline=None, tolerance=0.1):
+    """
+    Affiche le résumé par instance, avec l'écart au rapport de référence.
+
+    Returns:
+        Liste des régressions au-delà de tolerance (débit, temps jusqu'à la cible, fitness, mémoire)
+    """
+    regressions = []
+    print(f"\n{'instance':<14}{'gen/s':>9}{'cible (s)':>11}{'fitness':>12}{'vehicules':>10}{'mem (Mo)':>10}")
+
+    for name, instance in report["instances"].items():
+        s = instance["summary"]
+        ttt = "-" if s["median_time_to_target"] is None else f"{s['median_time_to_target']:.2f}"
+        print(f"{name:<14}{s['median_generations_per_second']:>9.1f}{ttt:>11}{s['median_fitness']:>12.0f}"
+              f"{s['median_vehicles']:>10.1f}{s['max_peak_rss_mb']:>10.1f}")
+
+        if not baseline or name not in baseline["instances"]:
+            continue
+        old = baseline["instances"][name]["summary"]
+        checks = [
+            ("gen/s", old["median_generations_per_second"], s["median_generations_per_second"], False),
+            ("temps jusqu'à la cible", old["median_time_to_target"], s["median_time_to_target"], True),
+            ("fitness", old["median_fitness"], s["median_fitness"], True),
+            ("mémoire", old["max_peak_rss_mb"], s["max_peak_rss_mb"], True),
+        ]
+        for label, before, after, lower_is_better in checks:
+            if before is None or after is None or before == 0:
+                if before is not None and after is None:
+                    regressions.append(f"{name}: cible non atteinte")
+                continue
+            change = (after - before) / before
+            print(f"{'':<14}{label}: {before} -> {after} ({change:+.1%})")
+            if (change > tolerance) if lower_is_better else (change < -tolerance):
+                regressions.append(f"{name}: {label} {change:+.1%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai du solveur")
+    parser.add_argument("--seeds", default=",".join(map(str, DEFAULT_SEEDS)), help="Graines, ex. 1,2,3")
+    parser.add_argument("--synthetic", default=",".join(map(str, DEFAULT_SYNTHETIC)),
+                        help="Tailles des instances synthétiques, ex. 200,500 (vide: aucune)")
+    parser.add_argument("--output", help="Fichier JSON du rapport (défaut: data/benchmark-<commit>.json)")
+    parser.add_argument("--compare", help="Rapport de référence : mêmes cibles et écarts affichés")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Écart relatif toléré avant régression")
+    parser.add_argument("--params", default="", help="Paramètres de l'algorithme, ex. crossover=ox (défaut: ceux de genetic.h)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    seeds = [int(s) for s in args.seeds.split(",") if s]
+    sizes = [int(s) for s in args.synthetic.split(",") if s]
+    report = run_benchmark(seeds, sizes, baseline, parse_params(args.params))
+
+    output = args.output or os.path.join("data", f"benchmark-{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+
+    regressions = print_report(report, baseline, args.tolerance)
+    print(f"\nRapport écrit dans {output}")
+    if regressions:
+        print("Régressions :")
+        for line in regressions:
+            print(f"   - {line}")
+        sys.exit(1)
@@ -0,0 +1,177 @@
+"""
+Cache des résultats de la chaîne de traitement (fichier de livraison -> tournées)
+Les entrées sont adressées par le contenu : l'empreinte du fichier de livraison
+et des sources (catalogue, matrices complètes) désigne les coordonnées et les
+sous-matrices ; en y ajoutant les paramètres du solveur et la bibliothèque
+compilée, elle désigne la solution. Une tournée déjà calculée est donc retrouvée
+sans rien recalculer, et toute modification d'une source invalide ses entrées.
+Le cache est borné en taille : les entrées les moins récemment utilisées sont
+supprimées en premier.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+CACHE_DIR = os.path.join('Python', 'sources', 'cache')
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Fichiers dont dépendent les coordonnées et les sous-matrices
+SOURCE_FILES = [os.path.join('Python', 'sources', name)
+                for name in ('pharmacies_coordonnees.csv', 'meters.csv', 'time.csv')]
+
+OUTPUT_DIR = os.path.join('Python', 'output')
+
+# À incrémenter quand le format des entrées ou le calcul qu'elles mémorisent change
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """Cache disque d'objets Python (pickle) adressés par une empreinte SHA-256, borné à max_bytes."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+        self._digests = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _files(self):
+        """Entrées présentes sur disque : liste de (date d'utilisation, taille, chemin)."""
+        files = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return files
+        for name in names:
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Supprimée entre-temps par un autre processus
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def file_digest(self, path):
+        """
+        Empreinte du contenu d'un fichier.
+
+        Elle n'est recalculée que si la taille ou la date du fichier changent :
+        les empreintes connues sont conservées dans digests.json.
+        """
+        if self._digests is None:
+            try:
+                with open(os.path.join(self.directory, "digests.json"), encoding='utf-8') as f:
+                    self._digests = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._digests = {}
+
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        known = self._digests.get(os.path.abspath(path))
+        if known is not None and known["signature"] == signature:
+            return known["digest"]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self._digests[os.path.abspath(path)] = {"signature": signature, "digest": digest.hexdigest()}
+        self._write(os.path.join(self.directory, "digests.json"),
+                    json.dumps(self._digests, indent=1).encode('utf-8'))
+        return digest.hexdigest()
+
+    def prepared_key(self, input_data, sources=SOURCE_FILES):
+        """Clé des coordonnées et sous-matrices d'un fichier de livraison (contenu brut)."""
+        key = hashlib.sha256(f"prepared:{CACHE_VERSION}\n".encode())
+        key.update(hashlib.sha256(input_data).digest())
+        for path in sources:
+            key.update(self.file_digest(path).encode())
+        return key.hexdigest()
+
+    def solution_key(self, prepared_key, options, library_path=None):
+        """Clé de la solution : instance préparée, options du solveur (JSON) et bibliothèque utilisée."""
+        key = hashlib.sha256(f"solution:{CACHE_VERSION}\n{prepared_key}\n".encode())
+        key.update(json.dumps(options, sort_keys=True, default=str).encode())
+        if library_path is not None:
+            key.update(self.file_digest(library_path).encode())
+        return key.hexdigest()
+
+    def get(self, key):
+        """Objet mémorisé sous key, None s'il est absent."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # Date d'utilisation pour l'éviction
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (pickle.UnpicklingError, EOFError):
+            os.remove(path)  # Entrée illisible : recalculée
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(self._path(key), data)
+
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self._files())
+        else:
+            self.size += len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def _write(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        # Écriture atomique : l'application et les scripts partagent le cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self, target_bytes=None):
+        """Supprime les entrées les moins récemment utilisées jusqu'à target_bytes (90 % du maximum par défaut)."""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.size = total
+
+
+def restore_outputs(coord_df, distance_df, time_df, output_dir=OUTPUT_DIR):
+    """Réécrit coord.csv, meters.csv et time.csv comme la chaîne de traitement (lus par le PDF)."""
+    os.makedirs(output_dir, exist_ok=True)
+    coord_df.to_csv(os.path.join(output_dir, 'coord.csv'), index=False, encoding='utf-8')
+    distance_df.to_csv(os.path.join(output_dir, 'meters.csv'), encoding='utf-8')
+    time_df.to_csv(os.path.join(output_dir, 'time.csv'), encoding='utf-8')
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Cache partagé par les traitements d'un même processus."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
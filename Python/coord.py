@@ -1,14 +1,96 @@
 import os
+from collections import Counter, defaultdict
 
 import pandas as pd
 
 
-def create_indexed_pharmacy_file(file):
+CATALOGUE_FILE = 'Python/sources/pharmacies_coordonnees.csv'
+RESULT_COLUMNS = ['indice', 'indice_original', 'nom', 'adresse', 'code_postal', 'ville', 'latitude', 'longitude']
+
+_catalogues = {}
+
+
+def normalize_names(names):
+    """Normalise une série de noms (minuscules, espaces de bord supprimés)."""
+    return names.astype(str).str.lower().str.strip()
+
+
+def _ngrams(name, n=3):
+    padded = f" {name} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class PharmacyCatalogue:
+    """Catalogue des pharmacies indexé par nom normalisé."""
+
+    def __init__(self, coord_df: pd.DataFrame):
+        self.df = coord_df.reset_index(drop=True)
+        self.keys = normalize_names(self.df['nom'])
+
+        # Table de hachage nom normalisé -> première ligne du catalogue
+        self.by_name = self.df.assign(cle=self.keys).drop_duplicates('cle', keep='first')
+
+        self._ngram_index = None
+        self._ngram_sizes = None
+
+    def ngram_index(self):
+        """Index n-gramme -> lignes du catalogue, construit à la première recherche approchée."""
+        if self._ngram_index is None:
+            index = defaultdict(list)
+            sizes = {}
+            for row, key in self.by_name['cle'].items():
+                grams = _ngrams(key)
+                sizes[row] = len(grams)
+                for gram in grams:
+                    index[gram].append(row)
+            self._ngram_index = index
+            self._ngram_sizes = sizes
+        return self._ngram_index
+
+    def match_exact(self, names: pd.Series) -> pd.DataFrame:
+        """Jointure vectorisée des noms demandés sur le catalogue (ordre des noms conservé)."""
+        wanted = pd.DataFrame({'cle': normalize_names(names).to_numpy()})
+        return wanted.merge(self.by_name, on='cle', how='left')
+
+    def match_fuzzy(self, name: str, threshold: float = 0.6):
+        """
+        Recherche la pharmacie la plus proche d'un nom par similarité de trigrammes.
+
+        Returns:
+            La ligne du catalogue retenue, ou None si aucune ne dépasse le seuil
+        """
+        grams = _ngrams(name.lower().strip())
+        index = self.ngram_index()
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(index.get(gram, ()))
+
+        best_row, best_score = None, threshold
+        for row, count in shared.items():
+            score = count / (len(grams) + self._ngram_sizes[row] - count)
+            if score >= best_score:
+                best_row, best_score = row, score
+
+        return None if best_row is None else self.by_name.loc[best_row]
+
+
+def load_catalogue(path=CATALOGUE_FILE) -> PharmacyCatalogue:
+    """Charge le catalogue une seule fois par version du fichier."""
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in _catalogues:
+        _catalogues.clear()
+        _catalogues[key] = PharmacyCatalogue(pd.read_csv(path, encoding='utf-8'))
+    return _catalogues[key]
+
+
+def create_indexed_pharmacy_file(file, fuzzy=False, threshold=0.6):
 
     print("Chargement des fichiers")
 
-    # Charger le fichier avec toutes les coordonnées (maintenant avec colonne indice)
-    coord_df = pd.read_csv('Python/sources/pharmacies_coordonnees.csv', encoding='utf-8')
+    # Charger le catalogue avec toutes les coordonnées (index par nom réutilisé entre les appels)
+    catalogue = load_catalogue()
+    coord_df = catalogue.df
 
     # Charger le fichier sous-ensemble
     subset_df = pd.read_csv(file, header=None,
@@ -23,49 +105,38 @@ def create_indexed_pharmacy_file(file):
     else:
         index_0_data = index_0_row.iloc[0]
 
-    # Préparer le DataFrame de résultat
-    result_data = []
+    # Recherche par nom exact, en une seule jointure
+    matched = catalogue.match_exact(subset_df['nom'])
+    missing = matched['indice'].isna()
+
+    # Recherche approchée des noms restants
+    if fuzzy:
+        for pos in matched.index[missing]:
+            candidate = catalogue.match_fuzzy(subset_df.at[pos, 'nom'], threshold)
+            if candidate is not None:
+                print(f"{subset_df.at[pos, 'nom']} → {candidate['nom']} (approché)")
+                matched.loc[pos, candidate.index] = candidate.values
+        missing = matched['indice'].isna()
+
+    for name in subset_df.loc[missing.to_numpy(), 'nom']:
+        print(f"{name} → Non trouvé")
+
+    found = matched[~missing].rename(columns={'indice': 'indice_original'})
 
     # Ajouter d'abord la ligne d'indice 0 si elle existe (indice séquentiel = 0)
     if index_0_data is not None:
-        result_data.append({
-            'indice': 0,  # Indice séquentiel
-            'indice_original': index_0_data['indice'],  # Indice original
-            'nom': index_0_data['nom'],
-            'adresse': index_0_data['adresse'],
-            'code_postal': index_0_data['code_postal'],
-            'ville': index_0_data['ville'],
-            'latitude': index_0_data['latitude'],
-            'longitude': index_0_data['longitude']
-        })
-
-    matches_found = 0
-    sequential_index = 1 if index_0_data is not None else 0  # Commencer à 1 si l'indice 0 existe
-
-    for index, row in subset_df.iterrows():
-        # Recherche par nom exact
-        match = coord_df[coord_df['nom'].str.lower().str.strip() == row['nom'].lower().strip()]
-
-        if len(match) > 0:
-            # Récupérer les données de la pharmacie correspondante
-            match_data = match.iloc[0]
-            result_data.append({
-                'indice': sequential_index,  # Indice séquentiel
-                'indice_original': match_data['indice'],  # Indice original
-                'nom': match_data['nom'],
-                'adresse': match_data['adresse'],
-                'code_postal': match_data['code_postal'],
-                'ville': match_data['ville'],
-                'latitude': match_data['latitude'],
-                'longitude': match_data['longitude']
-            })
-            matches_found += 1
-            sequential_index += 1
-        else:
-            print(f"{row['nom']} → Non trouvé")
+        depot = index_0_data.to_frame().T.rename(columns={'indice': 'indice_original'})
+        found = pd.concat([depot, found], ignore_index=True)
 
     # Créer le DataFrame final
-    result_df = pd.DataFrame(result_data)
+    result_df = found.reset_index(drop=True)
+    result_df['indice'] = range(len(result_df))
+    result_df['indice_original'] = result_df['indice_original'].astype(coord_df['indice'].dtype)
+    result_df = result_df.reindex(columns=RESULT_COLUMNS)
+
+    # La jointure à gauche a pu élargir les types (NaN), on restaure ceux du catalogue
+    columns = [col for col in RESULT_COLUMNS[2:] if col in coord_df.columns]
+    result_df = result_df.astype(coord_df[columns].dtypes.to_dict())
 
     os.makedirs("Python/output", exist_ok=True)
 
@@ -86,4 +157,4 @@ if __name__ == "__main__":
     if len(valid_pharmacies) > 0:
         indices = valid_pharmacies['indice'].astype(int).tolist()
     else:
-        print(f"\nAucune correspondance trouvée!")
\ No newline at end of file
+        print(f"\nAucune correspondance trouvée!")
@@ -1,33 +1,48 @@
+import argparse
 import pandas as pd
 import requests
+import hashlib
 import json
 import numpy as np
+import os
+import shutil
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple, Optional
 
+import ors
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+METERS_FILE = os.path.join('sources', 'meters.csv')
+TIME_FILE = os.path.join('sources', 'time.csv')
+
 
 class DistanceMatrixCalculator:
     """Calculateur de matrice de distances et temps avec OpenRouteService."""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: Optional[str] = None, requests_per_minute: float = 40,
+                 max_workers: int = 4, checkpoint_dir: str = os.path.join('sources', 'checkpoints')):
         """
         Initialise le calculateur.
 
         Args:
             api_key: Clé API OpenRouteService
+            base_url: URL du service (par défaut ORS_BASE_URL ou le service public),
+                par exemple celle de mock_ors.py pour les tests
+            requests_per_minute: Débit maximal de requêtes, partagé entre les threads
+            max_workers: Lots calculés simultanément
+            checkpoint_dir: Dossier des lots déjà calculés, pour reprendre un calcul interrompu
         """
         self.api_key = api_key
-        self.base_url = "https://api.openrouteservice.org/v2/matrix/driving-car"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Accept': 'application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8',
-            'Authorization': api_key,
-            'Content-Type': 'application/json; charset=utf-8'
-        })
+        self.base_url = f"{ors.base_url(base_url)}/v2/matrix/driving-car"
+        self.max_workers = max_workers
+        self.checkpoint_dir = checkpoint_dir
+        self.bucket = ors.TokenBucket(requests_per_minute / 60, capacity=max_workers)
+        # Les nouvelles tentatives passent par _execute_matrix_request (et donc par le limiteur)
+        self.session = ors.create_session(api_key, pool_size=max_workers, retries=0)
 
     def load_pharmacies(self, csv_file: str) -> pd.DataFrame:
         """Charge les pharmacies depuis le fichier CSV."""
@@ -97,38 +112,84 @@ class DistanceMatrixCalculator:
         num_batches = (total_locations + batch_size - 1) // batch_size
         logger.info(f"🔄 Division en {num_batches} lots nécessaire")
 
-        # Initialiser les matrices résultat
+        checkpoint = self.checkpoint_path(coordinates, batch_size)
+        os.makedirs(checkpoint, exist_ok=True)
+
+        # Initialiser les matrices résultat, puis reprendre les lots déjà calculés
         distance_matrix = np.zeros((total_locations, total_locations))
         duration_matrix = np.zeros((total_locations, total_locations))
 
-        # Traiter chaque lot
-        for batch_idx in range(num_batches):
-            start_idx = batch_idx * batch_size
-            end_idx = min((batch_idx + 1) * batch_size, total_locations)
-            sources = list(range(start_idx, end_idx))
-
-            logger.info(f"📦 Lot {batch_idx + 1}/{num_batches}: sources {start_idx}-{end_idx - 1}")
-
-            batch_distances, batch_durations = self._batch_matrix_request(
-                coordinates, sources, max_retries
-            )
-
-            if batch_distances is None or batch_durations is None:
-                logger.error(f"❌ Échec du lot {batch_idx + 1}")
-                return None, None
+        pending = []
+        for start_idx in range(0, total_locations, batch_size):
+            end_idx = min(start_idx + batch_size, total_locations)
+            block = self._load_block(checkpoint, start_idx)
+            if block is None:
+                pending.append((start_idx, end_idx))
+            else:
+                distance_matrix[start_idx:end_idx, :], duration_matrix[start_idx:end_idx, :] = block
+
+        if len(pending) < num_batches:
+            logger.info(f"♻️ Reprise: {num_batches - len(pending)} lots déjà calculés dans {checkpoint}")
+
+        # Lots restants en parallèle, au débit autorisé par le limiteur
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._batch_matrix_request, coordinates, list(range(start_idx, end_idx)), max_retries):
+                    (start_idx, end_idx)
+                for start_idx, end_idx in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                start_idx, end_idx = futures[future]
+                batch_distances, batch_durations = future.result()
+
+                if batch_distances is None or batch_durations is None:
+                    logger.error(f"❌ Échec du lot des sources {start_idx}-{end_idx - 1}")
+                    failed += 1
+                    continue
 
-            # Intégrer les résultats dans les matrices globales
-            distance_matrix[start_idx:end_idx, :] = batch_distances
-            duration_matrix[start_idx:end_idx, :] = batch_durations
+                # Intégrer les résultats dans les matrices globales et les sauvegarder
+                distance_matrix[start_idx:end_idx, :] = batch_distances
+                duration_matrix[start_idx:end_idx, :] = batch_durations
+                self._save_block(checkpoint, start_idx, batch_distances, batch_durations)
+                logger.info(f"📦 Lot {done}/{len(pending)}: sources {start_idx}-{end_idx - 1}")
 
-            # Pause entre les requêtes pour respecter les limites
-            if batch_idx < num_batches - 1:
-                logger.info("⏳ Pause de 2 secondes...")
-                time.sleep(2)
+        if failed:
+            logger.error(f"❌ {failed} lots en échec; les lots réussis sont conservés, "
+                         f"relancez le calcul pour reprendre")
+            return None, None
 
         logger.info("✅ Matrices complètes calculées avec succès!")
         return distance_matrix, duration_matrix
 
+    def checkpoint_path(self, coordinates: List[List[float]], batch_size: int) -> str:
+        """Dossier de reprise propre à une liste de coordonnées et une taille de lots."""
+        key = hashlib.sha1(json.dumps([coordinates, batch_size]).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.checkpoint_dir, key)
+
+    def clear_checkpoint(self, coordinates: List[List[float]]) -> None:
+        """Supprime les lots sauvegardés une fois les matrices enregistrées."""
+        batch_size = self.calculate_optimal_batch_size(len(coordinates))
+        shutil.rmtree(self.checkpoint_path(coordinates, batch_size), ignore_errors=True)
+
+    def _block_file(self, checkpoint: str, start_idx: int) -> str:
+        return os.path.join(checkpoint, f"sources_{start_idx:06d}.npz")
+
+    def _load_block(self, checkpoint: str, start_idx: int):
+        path = self._block_file(checkpoint, start_idx)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as block:
+            return block['distances'], block['durations']
+
+    def _save_block(self, checkpoint: str, start_idx: int, distances: np.ndarray, durations: np.ndarray) -> None:
+        """Sauvegarde atomique d'un lot (un lot interrompu en cours d'écriture n'est jamais relu)."""
+        path = self._block_file(checkpoint, start_idx)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, distances=distances, durations=durations)
+        os.replace(tmp_path, path)
+
     def _single_matrix_request(self, coordinates: List[List[float]],
                                max_retries: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
         """Requête simple pour petites matrices."""
@@ -141,30 +202,114 @@ class DistanceMatrixCalculator:
         return self._execute_matrix_request(payload, max_retries)
 
     def _batch_matrix_request(self, coordinates: List[List[float]],
-                              sources: List[int], max_retries: int) -> Tuple[
+                              sources: List[int], max_retries: int,
+                              destinations: Optional[List[int]] = None) -> Tuple[
         Optional[np.ndarray], Optional[np.ndarray]]:
-        """Requête par lot avec paramètres sources/destinations."""
+        """Requête par lot avec paramètres sources/destinations (par défaut, toutes les destinations)."""
+        if destinations is None:
+            destinations = list(range(len(coordinates)))
         payload = {
             "locations": coordinates,
             "sources": sources,
-            "destinations": list(range(len(coordinates))),
+            "destinations": destinations,
             "metrics": ["distance", "duration"],
             "units": "m"
         }
 
         return self._execute_matrix_request(payload, max_retries)
 
+    def update_matrices(self, pharmacy_df: pd.DataFrame, max_retries: int = 3,
+                        meters_file: str = METERS_FILE, time_file: str = TIME_FILE) -> Tuple[
+        Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Met à jour les matrices existantes après ajout ou retrait de pharmacies.
+
+        Les pharmacies du catalogue sont comparées aux indices des matrices déjà
+        enregistrées : seules la ligne et la colonne de chaque pharmacie ajoutée sont
+        demandées à l'API, celles des pharmacies retirées sont supprimées.
+
+        Returns:
+            Tuple (distance_matrix, duration_matrix) alignées sur pharmacy_df,
+            ou (None, None) si une requête a échoué
+        """
+        old_meters = pd.read_csv(meters_file, encoding='utf-8', index_col=0)
+        old_time = pd.read_csv(time_file, encoding='utf-8', index_col=0)
+        old_meters.columns = old_meters.columns.astype(int)
+        old_time.columns = old_time.columns.astype(int)
+
+        ids = pharmacy_df['indice'].to_numpy()
+        known = np.isin(ids, old_meters.index) & np.isin(ids, old_time.index)
+        kept = np.flatnonzero(known)
+        added = np.flatnonzero(~known)
+        removed = old_meters.index.difference(ids)
+
+        logger.info(f"🔁 Mise à jour incrémentale: {len(kept)} conservées, "
+                    f"{len(added)} ajoutées, {len(removed)} retirées")
+
+        total_locations = len(ids)
+        distance_matrix = np.zeros((total_locations, total_locations))
+        duration_matrix = np.zeros((total_locations, total_locations))
+
+        kept_ids = ids[kept]
+        distance_matrix[np.ix_(kept, kept)] = old_meters.loc[kept_ids, kept_ids].to_numpy()
+        duration_matrix[np.ix_(kept, kept)] = old_time.loc[kept_ids, kept_ids].to_numpy()
+
+        if len(added) == 0:
+            return distance_matrix, duration_matrix
+
+        coordinates = self.prepare_coordinates(pharmacy_df)
+
+        # Lignes des ajouts (vers toutes les pharmacies), puis colonnes des ajouts
+        # (depuis les pharmacies conservées), en lots de 3500 routes au plus
+        blocks = []
+        row_batch = self.calculate_optimal_batch_size(total_locations)
+        for start in range(0, len(added), row_batch):
+            blocks.append((added[start:start + row_batch], np.arange(total_locations)))
+        for first in range(0, len(added), 3500):
+            destinations = added[first:first + 3500]
+            column_batch = max(1, 3500 // len(destinations))
+            for start in range(0, len(kept), column_batch):
+                blocks.append((kept[start:start + column_batch], destinations))
+
+        logger.info(f"🌐 {len(blocks)} requêtes au lieu d'un recalcul complet")
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._batch_matrix_request, coordinates, sources.tolist(), max_retries,
+                            destinations.tolist()): (sources, destinations)
+                for sources, destinations in blocks
+            }
+            for future in as_completed(futures):
+                sources, destinations = futures[future]
+                batch_distances, batch_durations = future.result()
+                if batch_distances is None or batch_durations is None:
+                    failed += 1
+                    continue
+                distance_matrix[np.ix_(sources, destinations)] = batch_distances
+                duration_matrix[np.ix_(sources, destinations)] = batch_durations
+
+        if failed:
+            logger.error(f"❌ {failed} requêtes en échec, matrices existantes inchangées")
+            return None, None
+
+        logger.info("✅ Matrices mises à jour avec succès!")
+        return distance_matrix, duration_matrix
+
     def _execute_matrix_request(self, payload: dict, max_retries: int) -> Tuple[
         Optional[np.ndarray], Optional[np.ndarray]]:
         """Exécute une requête vers l'API et retourne les matrices de distances et temps."""
         for attempt in range(max_retries):
+            # Attente exponentielle avant une nouvelle tentative (hors limite de débit)
+            backoff = min(60, 2 ** attempt)
             try:
+                self.bucket.acquire()
                 logger.info(f"🌐 Requête API (tentative {attempt + 1}/{max_retries})...")
 
                 response = self.session.post(
                     self.base_url,
                     data=json.dumps(payload),
-                    timeout=120
+                    timeout=(5, 120)
                 )
 
                 if response.status_code == 200:
@@ -175,34 +320,45 @@ class DistanceMatrixCalculator:
                     return distances, durations
 
                 elif response.status_code == 429:  # Rate limit
-                    wait_time = 60 * (attempt + 1)
-                    logger.warning(f"⏰ Rate limit atteint. Attente de {wait_time}s...")
-                    time.sleep(wait_time)
+                    # Le serveur indique l'attente ; elle s'applique à tous les threads
+                    retry_after = response.headers.get('Retry-After', '')
+                    wait_time = float(retry_after) if retry_after.replace('.', '', 1).isdigit() else backoff * 5
+                    logger.warning(f"⏰ Rate limit atteint. Pause de {wait_time:.0f}s...")
+                    self.bucket.pause(wait_time)
                     continue
 
                 else:
-                    logger.error(f"❌ Erreur API: {response.status_code} - {response.text}")
+                    logger.error(f"❌ Erreur API: {response.status_code} - {response.text[:200]}")
                     if attempt == max_retries - 1:
                         return None, None
-                    time.sleep(10)
+                    time.sleep(backoff)
 
             except requests.exceptions.Timeout:
                 logger.warning(f"⏰ Timeout lors de la tentative {attempt + 1}")
                 if attempt == max_retries - 1:
                     return None, None
-                time.sleep(30)
+                time.sleep(backoff)
 
             except Exception as e:
                 logger.error(f"❌ Erreur lors de la tentative {attempt + 1}: {e}")
                 if attempt == max_retries - 1:
                     return None, None
-                time.sleep(10)
+                time.sleep(backoff)
 
         return None, None
 
     def save_matrices(self, distance_matrix: np.ndarray, duration_matrix: np.ndarray,
-                      pharmacy_df: pd.DataFrame) -> None:
-        """Sauvegarde les matrices de distances et temps."""
+                      pharmacy_df: pd.DataFrame, meters_file: str = METERS_FILE,
+                      time_file: str = TIME_FILE) -> None:
+        """
+        Sauvegarde les matrices de distances et temps.
+
+        Les deux fichiers sont d'abord écrits à côté des originaux puis mis en place
+        par renommage : une interruption ne laisse jamais de matrice tronquée. Les
+        deux renommages restent distincts : une interruption entre eux laisse un
+        meters.csv récent à côté d'un ancien time.csv, que le magasin binaire
+        (matrix.py) refuse si leurs indices diffèrent.
+        """
         try:
             # Utiliser la colonne 'indice' (séquentielle) pour les indices des matrices
             indices = pharmacy_df['indice'].tolist()
@@ -213,8 +369,7 @@ class DistanceMatrixCalculator:
                 index=indices,
                 columns=indices
             )
-            df_meters.to_csv('sources/meters.csv', encoding='utf-8')
-            logger.info("✅ sources/meters.csv sauvegardé")
+            df_meters.to_csv(f'{meters_file}.tmp', encoding='utf-8')
 
             # Matrice des temps en secondes
             df_time = pd.DataFrame(
@@ -222,8 +377,12 @@ class DistanceMatrixCalculator:
                 index=indices,
                 columns=indices
             )
-            df_time.to_csv('sources/time.csv', encoding='utf-8')
-            logger.info("✅ sources/time.csv sauvegardé")
+            df_time.to_csv(f'{time_file}.tmp', encoding='utf-8')
+
+            os.replace(f'{meters_file}.tmp', meters_file)
+            logger.info(f"✅ {meters_file} sauvegardé")
+            os.replace(f'{time_file}.tmp', time_file)
+            logger.info(f"✅ {time_file} sauvegardé")
 
             # Statistiques
             non_zero_distances = distance_matrix[distance_matrix > 0]
@@ -247,6 +406,12 @@ class DistanceMatrixCalculator:
 def main():
     """Fonction principale."""
 
+    parser = argparse.ArgumentParser(description="Calcul des matrices de distances et temps")
+    parser.add_argument("--update", action="store_true",
+                        help="Mettre à jour les matrices existantes (pharmacies ajoutées ou retirées)")
+    parser.add_argument("--base-url", help="URL du service OpenRouteService (ex. serveur simulé)")
+    args = parser.parse_args()
+
     # Configuration
     input_file = "sources/coord.csv"
 
@@ -261,7 +426,7 @@ def main():
 
     try:
         # Initialisation
-        calculator = DistanceMatrixCalculator(api_key)
+        calculator = DistanceMatrixCalculator(api_key, base_url=args.base_url)
 
         # Chargement des pharmacies
         logger.info("🔄 Chargement des pharmacies...")
@@ -278,7 +443,10 @@ def main():
         logger.info("⏳ Cela peut prendre quelques minutes...")
 
         # Calcul des matrices de distances et temps
-        distance_matrix, duration_matrix = calculator.calculate_matrices_batched(coordinates)
+        if args.update and os.path.exists(METERS_FILE) and os.path.exists(TIME_FILE):
+            distance_matrix, duration_matrix = calculator.update_matrices(pharmacy_df)
+        else:
+            distance_matrix, duration_matrix = calculator.calculate_matrices_batched(coordinates)
 
         if distance_matrix is None or duration_matrix is None:
             logger.error("❌ Échec du calcul des matrices")
@@ -287,6 +455,7 @@ def main():
         # Sauvegarde des résultats
         logger.info("💾 Sauvegarde des résultats...")
         calculator.save_matrices(distance_matrix, duration_matrix, pharmacy_df)
+        calculator.clear_checkpoint(coordinates)
 
         print(f"\n🎉 Calcul terminé avec succès!")
         print(f"📁 Fichiers créés:")
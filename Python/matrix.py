@@ -3,6 +3,81 @@ import numpy as np
 import os
 
 
+SOURCES_DIR = os.path.join('Python', 'sources')
+STORE_DIR = os.path.join(SOURCES_DIR, 'store')
+
+
+def _store_paths(name):
+    """Chemins du CSV source, de la matrice binaire et de l'index d'un magasin."""
+    csv_path = os.path.join(SOURCES_DIR, f'{name}.csv')
+    matrix_path = os.path.join(STORE_DIR, f'{name}.npy')
+    index_path = os.path.join(STORE_DIR, f'{name}.indice.npy')
+    return csv_path, matrix_path, index_path
+
+
+def _save_atomic(path, array):
+    """Écrit un tableau .npy via un fichier temporaire puis un renommage atomique."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def build_matrix_store(name):
+    """
+    Compile une matrice source CSV (meters ou time) en magasin binaire int32.
+
+    La matrice est enregistrée au format .npy (mappable en mémoire) et la liste
+    des indices de ligne dans un second fichier, dans l'ordre des lignes.
+    """
+    csv_path, matrix_path, index_path = _store_paths(name)
+    print(f"Compilation du magasin binaire: {csv_path}")
+
+    df = pd.read_csv(csv_path, encoding='utf-8', index_col=0)
+    df.columns = df.columns.astype(int)
+    # Les colonnes suivent l'ordre des lignes pour que l'index serve aux deux axes
+    df = df.loc[:, df.index]
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    _save_atomic(matrix_path, df.values.astype(np.int32))
+    _save_atomic(index_path, df.index.to_numpy(dtype=np.int64))
+
+
+def load_matrix_store(name):
+    """
+    Ouvre le magasin binaire d'une matrice source, en le recompilant si le CSV est plus récent.
+
+    Returns:
+        Tuple (matrice int32 mappée en mémoire, table indice -> ligne)
+    """
+    csv_path, matrix_path, index_path = _store_paths(name)
+
+    stale = (not os.path.exists(matrix_path) or not os.path.exists(index_path)
+             or os.path.getmtime(csv_path) > os.path.getmtime(matrix_path))
+    if stale:
+        build_matrix_store(name)
+
+    matrix = np.load(matrix_path, mmap_mode='r')
+    indices = np.load(index_path)
+
+    # Table dense indice -> ligne (-1 pour un indice absent)
+    row_of = np.full(int(indices.max()) + 1, -1, dtype=np.int64)
+    row_of[indices] = np.arange(len(indices))
+
+    return matrix, row_of
+
+
+def gather_submatrix(matrix, row_of, indices):
+    """Extrait la sous-matrice des indices donnés en une seule lecture indexée."""
+    indices = np.asarray(indices, dtype=np.int64)
+    if len(indices) and (indices.max() >= len(row_of) or indices.min() < 0):
+        raise KeyError("Indice hors de la matrice source")
+    rows = row_of[indices]
+    if (rows < 0).any():
+        raise KeyError(f"Indices absents de la matrice source: {indices[rows < 0].tolist()}")
+    return np.asarray(matrix[rows[:, None], rows], dtype=np.int32)
+
+
 def extract_and_convert_matrices():
     print("Extraction des sous-matrices...")
 
@@ -15,18 +90,21 @@ def extract_and_convert_matrices():
     indices_originaux = coord_df['indice_original'].tolist()
 
     try:
-        distance_matrix = pd.read_csv('Python/sources/meters.csv', encoding='utf-8', index_col=0)
-        time_matrix = pd.read_csv('Python/sources/time.csv', encoding='utf-8', index_col=0)
+        distance_matrix, distance_rows = load_matrix_store('meters')
+        time_matrix, time_rows = load_matrix_store('time')
     except Exception as e:
         print(f"Erreur: {e}")
         return
 
-    indices_lignes = indices_originaux
-    indices_colonnes = [str(idx) for idx in indices_originaux]
+    # Une mise à jour interrompue entre les deux renommages peut laisser des
+    # matrices d'indices différents : leurs lignes ne se correspondraient plus
+    if not np.array_equal(distance_rows, time_rows):
+        print("Erreur: les matrices meters et time n'ont pas les memes indices")
+        return
 
     try:
-        sub_distance = distance_matrix.loc[indices_lignes, indices_colonnes]
-        sub_time = time_matrix.loc[indices_lignes, indices_colonnes]
+        sub_distance = gather_submatrix(distance_matrix, distance_rows, indices_originaux)
+        sub_time = gather_submatrix(time_matrix, time_rows, indices_originaux)
     except Exception as e:
         print(f"Erreur lors de l'extraction: {e}")
         return
@@ -34,13 +112,13 @@ def extract_and_convert_matrices():
     indices_sequentiels = list(range(len(coord_df)))
 
     final_distance_matrix = pd.DataFrame(
-        sub_distance.values.astype(int),
+        sub_distance,
         index=indices_sequentiels,
         columns=indices_sequentiels
     )
 
     final_time_matrix = pd.DataFrame(
-        sub_time.values.astype(int),
+        sub_time,
         index=indices_sequentiels,
         columns=indices_sequentiels
     )
@@ -76,4 +154,4 @@ if __name__ == "__main__":
         print(f"   - Python/output/time.csv")
         print(f"   - Python/output/coord.csv")
     else:
-        print(f"\nExtraction échouée")
\ No newline at end of file
+        print(f"\nExtraction échouée")
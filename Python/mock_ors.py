@@ -0,0 +1,181 @@
+"""
+Serveur local imitant OpenRouteService, pour les tests et mesures hors ligne
+
+Points d'accès simulés :
+    POST /v2/directions/<profil>  itinéraire en ligne droite (polyline encodée)
+    POST /v2/matrix/<profil>      matrices distances/durées à vol d'oiseau
+
+Usage : python Python/mock_ors.py --port 8080 --latency 0.5 --rate-limit 10 [--fail-rate 0.1]
+puis ORS_BASE_URL=http://127.0.0.1:8080
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SPEED_M_PER_S = 50 / 3.6  # 50 km/h
+POINTS_PER_LEG = 10
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """Distance en mètres entre deux points (lon, lat)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+def encode_polyline(points):
+    """Encode une liste de [lat, lon] au format polyline Google (précision 1e-5)."""
+    encoded = []
+    prev_lat = prev_lon = 0
+    for lat, lon in points:
+        ilat, ilon = round(lat * 1e5), round(lon * 1e5)
+        for delta in (ilat - prev_lat, ilon - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                encoded.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            encoded.append(chr(value + 63))
+        prev_lat, prev_lon = ilat, ilon
+    return "".join(encoded)
+
+
+class RateLimiter:
+    """Fenêtre glissante d'une seconde : au-delà de limit requêtes, réponse 429."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.stamps = []
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if not self.limit:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            self.stamps = [t for t in self.stamps if now - t < 1.0]
+            if len(self.stamps) >= self.limit:
+                return False
+            self.stamps.append(now)
+            return True
+
+
+class MockORSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Connexions persistantes, comme le vrai service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "JSON invalide"})
+            return
+
+        with self.server.stats_lock:
+            self.server.requests += 1
+
+        if not self.server.limiter.allow():
+            self._reply(429, {"error": "Rate limit exceeded"}, {"Retry-After": "1"})
+            return
+
+        time.sleep(self.server.latency)
+
+        if random.random() < self.server.fail_rate:
+            self._reply(503, {"error": "Panne simulée"})
+            return
+
+        if self.path.startswith("/v2/directions/"):
+            self._reply(200, directions(body))
+        elif self.path.startswith("/v2/matrix/"):
+            self._reply(200, matrix(body))
+        else:
+            self._reply(404, {"error": f"Chemin inconnu: {self.path}"})
+
+
+def directions(body):
+    """Réponse d'itinéraire : segments droits entre les points demandés."""
+    coordinates = body["coordinates"]
+    points = []
+    distance = 0.0
+    for (lon1, lat1), (lon2, lat2) in zip(coordinates, coordinates[1:]):
+        distance += haversine(lon1, lat1, lon2, lat2)
+        for k in range(POINTS_PER_LEG):
+            t = k / POINTS_PER_LEG
+            points.append([lat1 + t * (lat2 - lat1), lon1 + t * (lon2 - lon1)])
+    points.append([coordinates[-1][1], coordinates[-1][0]])
+
+    return {"routes": [{
+        "summary": {"distance": distance, "duration": distance / SPEED_M_PER_S},
+        "geometry": encode_polyline(points),
+    }]}
+
+
+def matrix(body):
+    """Réponse de matrice pour les sources et destinations demandées."""
+    locations = body["locations"]
+    sources = body.get("sources", range(len(locations)))
+    destinations = body.get("destinations", range(len(locations)))
+
+    distances = [[round(haversine(*locations[i], *locations[j]), 2) for j in destinations] for i in sources]
+    durations = [[round(d / SPEED_M_PER_S, 2) for d in row] for row in distances]
+    return {"distances": distances, "durations": durations}
+
+
+def start_server(port=0, latency=0.0, rate_limit=None, fail_rate=0.0, verbose=False):
+    """
+    Démarre le serveur dans un thread d'arrière-plan.
+
+    fail_rate est la proportion de requêtes acceptées qui échouent (503), pour
+    éprouver les nouvelles tentatives et la reprise.
+
+    Returns:
+        (serveur, URL de base) ; serveur.shutdown() l'arrête, serveur.requests
+        compte les requêtes reçues
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockORSHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.limiter = RateLimiter(rate_limit)
+    server.fail_rate = fail_rate
+    server.verbose = verbose
+    server.requests = 0
+    server.stats_lock = threading.Lock()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur OpenRouteService simulé")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence ajoutée par requête (s)")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requêtes par seconde avant 429")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Proportion de réponses 503 simulées")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, args.latency, args.rate_limit, args.fail_rate, verbose=True)
+    print(f"Serveur ORS simulé sur {url} (Ctrl+C pour arrêter)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,425 @@
+"""
+Solveur génétique en NumPy pur, pour les machines sans compilateur C
+Même modèle que la bibliothèque C (fitness, MAX_TIME, paramètres de GAParams),
+en codage tour géant : chaque individu est une permutation des pharmacies,
+découpée en routes par Split. Toute la population est tenue dans des tableaux
+2-D (une ligne par individu) et chaque génération est traitée d'un bloc :
+sélection, croisement, mutation, découpage et évaluation des durées, distances
+et pénalités MAX_TIME de tous les individus, par lectures groupées (gather)
+dans les matrices de temps et de distances.
+Entrées et sortie identiques à celles de vrp : Python/output/time.csv et
+meters.csv, routes dans data/output.txt (relu tel quel par pdf_generator).
+
+Usage (depuis la racine du dépôt) :
+    python Python/numpy_solver.py [--runs 3] [--seed 1] [--time-limit 60] [--config data/params/small.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from solver import GA_PARAMS, SolveResult, SolverStats, write_routes
+
+# Constantes de include/location.h et include/genetic.h
+DEPOT = 0
+MAX_TIME = 10800
+SERVICE_TIME = 180
+VEHICLE_COST = 1500000
+DURATION_PENALTY = 10000
+MAX_GENERATIONS = 10000
+PROGRESS_INTERVAL = 0.25
+RANDOM_NN_CHOICES = 3
+CHUNK_ROWS = 32    # individus de la population initiale construits d'un bloc entre deux vérifications du budget
+SPLIT_CHECK = 64   # positions du tour découpées entre deux vérifications du budget
+
+# Valeurs par défaut de GAParams ; local_search_rate, crossover et
+# restart_diversity ne concernent que le solveur C (ici, pas de recherche
+# locale, pas de relance et toujours le croisement OX)
+DEFAULT_PARAMS = {"population_size": 500, "mutation_rate": 0.2, "crossover_rate": 0.9,
+                  "tournament_size": 7, "elite_size": 0, "stagnation_limit": 200}
+
+INPUT_DIR = os.path.join("Python", "output")
+
+_INFINITY = np.iinfo(np.int64).max // 4
+
+# Coûts de chaque individu d'une population (tableaux d'une valeur par ligne)
+Evaluation = namedtuple("Evaluation", ["fitness", "distance", "duration", "vehicles"])
+
+
+def check_params(params):
+    """Paramètres complétés par les valeurs par défaut, ValueError s'ils sont incohérents (check_ga_params)."""
+    unknown = set(params or {}) - set(GA_PARAMS)
+    if unknown:
+        raise ValueError(f"Paramètres inconnus : {', '.join(sorted(unknown))}")
+    merged = dict(DEFAULT_PARAMS)
+    merged.update({name: value for name, value in (params or {}).items() if name in DEFAULT_PARAMS})
+
+    if not (merged["population_size"] >= 2
+            and 0.0 <= merged["mutation_rate"] <= 1.0
+            and 0.0 <= merged["crossover_rate"] <= 1.0
+            and merged["tournament_size"] >= 1
+            and 0 <= merged["elite_size"] < merged["population_size"]
+            and merged["stagnation_limit"] >= 1):
+        raise ValueError(f"Paramètres de l'algorithme invalides : {params}")
+    return merged
+
+
+def evaluate(tours, starts, time_matrix, dist_matrix):
+    """
+    Évaluation vectorisée d'une population.
+
+    Args:
+        tours: Tableau (individus, villes) des tours géants
+        starts: Tableau booléen de même forme, vrai pour la première ville de chaque route
+
+    Returns:
+        Evaluation ; la fitness est celle du solveur C (distance * 2, coût des
+        véhicules et pénalité par seconde au-delà de MAX_TIME sur chaque route)
+    """
+    count, n = tours.shape
+
+    # Arc entrant de chaque ville (depuis le dépôt en tête de route), retour au dépôt en fin de route
+    previous = np.empty_like(tours)
+    previous[:, 0] = DEPOT
+    previous[:, 1:] = tours[:, :-1]
+    previous[starts] = DEPOT
+    ends = np.empty_like(starts)
+    ends[:, :-1] = starts[:, 1:]
+    ends[:, -1] = True
+
+    leg_distance = dist_matrix[previous, tours] + np.where(ends, dist_matrix[tours, DEPOT], 0)
+    leg_time = time_matrix[previous, tours] + SERVICE_TIME + np.where(ends, time_matrix[tours, DEPOT], 0)
+
+    # Durée de chaque route : somme par (individu, numéro de route)
+    route = np.cumsum(starts, axis=1) - 1 + n * np.arange(count)[:, None]
+    route_duration = np.bincount(route.ravel(), weights=leg_time.ravel(), minlength=count * n)
+    excess = np.maximum(route_duration.reshape(count, n).astype(np.int64) - MAX_TIME, 0).sum(axis=1)
+
+    distance = leg_distance.sum(axis=1)
+    vehicles = starts.sum(axis=1)
+    fitness = distance * 2 + vehicles.astype(np.int64) * VEHICLE_COST + excess * DURATION_PENALTY
+    return Evaluation(fitness, distance, leg_time.sum(axis=1), vehicles)
+
+
+def split(tours, time_matrix, dist_matrix, expired=None):
+    """
+    Découpage optimal de chaque tour en routes (même programme dynamique que
+    split_tour de src/giant_tour.c), vectorisé sur la population.
+
+    Le coût d'une route tour[i..j-1] se sépare en une part de sa première ville
+    et une part de sa dernière grâce aux cumuls le long du tour : les routes
+    finissant en j sont évaluées d'un bloc pour tous les individus, sur une
+    fenêtre bornée par la plus longue route possible.
+
+    Returns:
+        Tableau booléen des débuts de route, de même forme que tours, ou None
+        si expired() devient vrai en cours de découpage (vérifié toutes les
+        SPLIT_CHECK positions)
+    """
+    count, n = tours.shape
+    rows = np.arange(count)
+    positions = np.arange(n)
+
+    cumul_distance = np.zeros((count, n), dtype=np.int64)
+    cumul_time = np.zeros((count, n), dtype=np.int64)
+    cumul_distance[:, 1:] = np.cumsum(dist_matrix[tours[:, :-1], tours[:, 1:]], axis=1)
+    cumul_time[:, 1:] = np.cumsum(time_matrix[tours[:, :-1], tours[:, 1:]], axis=1)
+
+    # distance(i, j) = out_distance[i] + in_distance[j-1], de même pour la durée
+    out_distance = dist_matrix[DEPOT, tours] - cumul_distance
+    in_distance = cumul_distance + dist_matrix[tours, DEPOT]
+    out_time = time_matrix[DEPOT, tours] - cumul_time - SERVICE_TIME * positions
+    in_time = cumul_time + SERVICE_TIME * (positions + 1) + time_matrix[tours, DEPOT]
+
+    # Plus longue route possible : au-delà, le trajet entre la première et la
+    # dernière ville dépasse déjà MAX_TIME pour toutes les positions du tour
+    window = 1
+    while window < n:
+        length = window + 1
+        inner = cumul_time[:, length - 1:] - cumul_time[:, :n - length + 1] + SERVICE_TIME * length
+        if (inner > MAX_TIME).all():
+            break
+        window = length
+
+    label = np.full((count, n + 1), _INFINITY, dtype=np.int64)
+    label[:, 0] = 0
+    pred = np.zeros((count, n + 1), dtype=np.int64)
+
+    for j in range(1, n + 1):
+        if expired is not None and j % SPLIT_CHECK == 0 and expired():
+            return None
+        first = np.arange(max(0, j - window), j)
+        duration = out_time[:, first] + in_time[:, j - 1, None]
+        cost = (label[:, first] + (out_distance[:, first] + in_distance[:, j - 1, None]) * 2 + VEHICLE_COST
+                + np.maximum(duration - MAX_TIME, 0) * DURATION_PENALTY)
+        # Une route d'une seule ville est toujours acceptée, avec sa pénalité
+        feasible = duration <= MAX_TIME
+        feasible[:, -1] = True
+        cost = np.where(feasible, cost, _INFINITY)
+
+        best = np.argmin(cost, axis=1)
+        label[:, j] = cost[rows, best]
+        pred[:, j] = first[best]
+
+    starts = np.zeros((count, n), dtype=bool)
+    end = np.full(count, n)
+    while (end > 0).any():
+        active = end > 0
+        begin = pred[rows, end]
+        starts[rows[active], begin[active]] = True
+        end = np.where(active, begin, 0)
+    return starts
+
+
+def nearest_neighbor_tours(dist_matrix, count, rng, choices=RANDOM_NN_CHOICES, deterministic=True):
+    """
+    Tours du plus proche voisin, construits ensemble : le premier déterministe
+    (si deterministic), les autres tirés parmi les choices villes non visitées
+    les plus proches.
+    """
+    num_cities = dist_matrix.shape[0]
+    rows = np.arange(count)
+    tours = np.empty((count, num_cities - 1), dtype=np.int64)
+    visited = np.zeros((count, num_cities), dtype=bool)
+    visited[:, DEPOT] = True
+    current = np.full(count, DEPOT)
+
+    for k in range(num_cities - 1):
+        distance = np.where(visited, np.inf, dist_matrix[current])
+        width = min(choices, num_cities - 1 - k)
+        nearest = np.argpartition(distance, width - 1, axis=1)[:, :width]
+        chosen = nearest[rows, rng.integers(0, width, count)]
+        if deterministic:
+            chosen[0] = np.argmin(distance[0])
+        tours[:, k] = chosen
+        visited[rows, chosen] = True
+        current = chosen
+    return tours
+
+
+def initial_population(time_matrix, dist_matrix, size, rng, expired):
+    """
+    Population initiale du plus proche voisin, construite et découpée par blocs
+    de CHUNK_ROWS individus. Budget épuisé (expired) : les places restantes
+    reprennent les individus déjà construits, le premier bloc l'est toujours.
+
+    Returns:
+        Tuple (tours, débuts de route)
+    """
+    tours, starts = [], []
+    built = 0
+    while built < size and not (built and expired()):
+        block = nearest_neighbor_tours(dist_matrix, min(CHUNK_ROWS, size - built), rng,
+                                       deterministic=(built == 0))
+        tours.append(block)
+        starts.append(split(block, time_matrix, dist_matrix))
+        built += len(block)
+    fill = np.arange(size) % built
+    return np.concatenate(tours)[fill], np.concatenate(starts)[fill]
+
+
+def tournament(fitness, count, size, rng):
+    """Indices des gagnants de count tournois de size individus."""
+    contenders = rng.integers(0, len(fitness), (count, size))
+    return contenders[np.arange(count), np.argmin(fitness[contenders], axis=1)]
+
+
+def order_crossover(parents1, parents2, rng):
+    """
+    Croisement d'ordre de chaque paire de lignes : l'enfant garde un segment de
+    parent1 à sa place, les autres villes suivent l'ordre de parent2 depuis le
+    début du tour (variante linéaire d'OX, sans rotation).
+    """
+    count, n = parents1.shape
+    bounds = np.sort(rng.integers(0, n, (count, 2)), axis=1)
+    positions = np.arange(n)
+    segment = (positions >= bounds[:, :1]) & (positions <= bounds[:, 1:])
+
+    # Villes du segment, indexées par ville
+    in_segment = np.zeros((count, n + 1), dtype=bool)
+    np.put_along_axis(in_segment, parents1, segment, axis=1)
+    kept = ~np.take_along_axis(in_segment, parents2, axis=1)
+
+    # Autant de villes gardées que de places hors segment sur chaque ligne :
+    # le remplissage ligne par ligne conserve l'ordre de parent2
+    children = parents1.copy()
+    children[~segment] = parents2[kept]
+    return children
+
+
+def mutate(tours, rate, rng):
+    """
+    Mutation d'une part rate des lignes : inversion d'un segment, déplacement
+    d'une ville ou échange de deux villes, appliqués par une permutation des
+    positions de chaque ligne.
+    """
+    count, n = tours.shape
+    positions = np.arange(n)
+    low, high = np.sort(rng.integers(0, n, (count, 2)), axis=1).T
+    low, high = low[:, None], high[:, None]
+    kind = rng.integers(0, 3, count)[:, None]
+
+    inversion = np.where((positions >= low) & (positions <= high), low + high - positions, positions)
+    relocation = np.where((positions >= low) & (positions < high), positions + 1, positions)
+    relocation = np.where(positions == high, low, relocation)
+    exchange = np.where(positions == low, high, np.where(positions == high, low, positions))
+
+    source = np.where(kind == 0, inversion, np.where(kind == 1, relocation, exchange))
+    source = np.where(rng.random(count)[:, None] < rate, source, positions)
+    return np.take_along_axis(tours, source, axis=1)
+
+
+def solve(time_matrix, dist_matrix, runs=1, jobs=None, seed=None, coordinates=None,
+          progress=None, stop=None, time_limit=None, target=None, params=None):
+    """
+    Résout le VRP ; mêmes arguments et même résultat que solver.solve.
+
+    jobs et coordinates sont acceptés pour la compatibilité et ignorés : les
+    exécutions se suivent dans le processus appelant, et la population
+    initiale vient du plus proche voisin.
+
+    Returns:
+        SolveResult (routes en tableaux d'indices sans le dépôt, fitness,
+        graine retenue, SolverStats de l'exécution retenue)
+    """
+    params = check_params(params)
+    time_matrix = np.asarray(time_matrix, dtype=np.int64)
+    dist_matrix = np.asarray(dist_matrix, dtype=np.int64)
+    num_cities = time_matrix.shape[0]
+
+    if time_matrix.shape != (num_cities, num_cities) or dist_matrix.shape != time_matrix.shape:
+        raise ValueError("Les matrices de temps et de distances doivent être carrées et de même taille")
+    if time_limit is not None and time_limit <= 0:
+        raise ValueError(f"Budget de temps invalide : {time_limit}")
+    if seed is None:
+        seed = time.time_ns() & 0xFFFFFFFF
+    if num_cities < 2:
+        return SolveResult([], 0, seed, SolverStats(0, 0.0, 0.0, []))
+
+    deadline = None if time_limit is None else time.time() + time_limit
+    best = None
+    for run in range(runs):
+        # Budget restant partagé entre les exécutions restantes
+        run_deadline = None if deadline is None else time.time() + (deadline - time.time()) / (runs - run)
+        result = _run(time_matrix, dist_matrix, seed + run, params, progress, stop, run_deadline, target)
+        print(f"Execution {run + 1}: graine={seed + run} fitness={result.fitness} "
+              f"vehicules={len(result.routes)} generations={result.stats.generations}")
+        if best is None or result.fitness < best.fitness:
+            best = result
+        if (stop is not None and stop.is_set()) or (target and best.fitness <= target):
+            break
+    return best
+
+
+def _run(time_matrix, dist_matrix, seed, params, progress, stop, deadline, target):
+    """Une exécution de l'algorithme génétique."""
+    rng = np.random.default_rng(seed)
+    size = params["population_size"]
+    elite = params["elite_size"] or size // 10
+    start = time.time()
+
+    def expired():
+        return ((stop is not None and stop.is_set())
+                or (deadline is not None and time.time() >= deadline))
+
+    tours, starts = initial_population(time_matrix, dist_matrix, size, rng, expired)
+    costs = evaluate(tours, starts, time_matrix, dist_matrix)
+
+    def best_point(generation, gen_per_s, final):
+        b = int(np.argmin(costs.fitness))
+        return {"seed": seed, "generation": generation, "fitness": int(costs.fitness[b]),
+                "vehicles": int(costs.vehicles[b]), "distance": int(costs.distance[b]),
+                "duration": int(costs.duration[b]), "gen_per_s": round(gen_per_s, 1),
+                "elapsed": round(time.time() - start, 2), "final": final}
+
+    init_time = time.time() - start
+    best_fitness = int(costs.fitness.min())
+    trace = [(init_time, best_fitness)]
+    if progress is not None:
+        progress(best_point(0, 0.0, False))
+    last_report, last_generation = time.time(), 0
+
+    generation = stagnation = 0
+    while generation < MAX_GENERATIONS and stagnation < params["stagnation_limit"]:
+        if expired() or (target and best_fitness <= target):
+            break
+
+        # Élites recopiés, le reste de la population remplacé par des enfants
+        order = np.argsort(costs.fitness, kind="stable")[:elite]
+        offspring = size - elite
+        parents1 = tournament(costs.fitness, offspring, params["tournament_size"], rng)
+        parents2 = tournament(costs.fitness, offspring, params["tournament_size"], rng)
+        children = tours[parents1]
+        crossing = rng.random(offspring) < params["crossover_rate"]
+        children[crossing] = order_crossover(tours[parents1[crossing]], tours[parents2[crossing]], rng)
+        children = mutate(children, params["mutation_rate"], rng)
+
+        # Budget épuisé en cours de découpage : la génération est abandonnée
+        children_starts = split(children, time_matrix, dist_matrix, expired)
+        if children_starts is None:
+            break
+        children_costs = evaluate(children, children_starts, time_matrix, dist_matrix)
+
+        tours = np.concatenate([tours[order], children])
+        starts = np.concatenate([starts[order], children_starts])
+        costs = Evaluation(*(np.concatenate([field[order], child_field])
+                             for field, child_field in zip(costs, children_costs)))
+        generation += 1
+
+        fitness = int(costs.fitness.min())
+        if fitness < best_fitness:
+            best_fitness = fitness
+            stagnation = 0
+            trace.append((time.time() - start, fitness))
+        else:
+            stagnation += 1
+
+        if generation % 100 == 0:
+            print(f"Generation {generation}: Fitness={best_fitness}")
+        now = time.time()
+        if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+            progress(best_point(generation, (generation - last_generation) / (now - last_report), False))
+            last_report, last_generation = now, generation
+
+    elapsed = time.time() - start
+    if progress is not None:
+        progress(best_point(generation, generation / (elapsed - init_time) if elapsed > init_time else 0.0, True))
+
+    b = int(np.argmin(costs.fitness))
+    routes = [route.astype(np.int32) for route in np.split(tours[b], np.flatnonzero(starts[b])[1:])]
+    return SolveResult(routes, int(costs.fitness[b]), seed, SolverStats(generation, init_time, elapsed, trace))
+
+
+def read_instance(input_dir=INPUT_DIR):
+    """Matrices de temps et de distances écrites par la chaîne de traitement (dépôt en indice 0)."""
+    time_matrix = pd.read_csv(os.path.join(input_dir, "time.csv"), index_col=0).to_numpy()
+    dist_matrix = pd.read_csv(os.path.join(input_dir, "meters.csv"), index_col=0).to_numpy()
+    return time_matrix, dist_matrix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solveur génétique NumPy (sans bibliothèque C)")
+    parser.add_argument("--runs", type=int, default=3, help="Exécutions indépendantes, la meilleure est gardée")
+    parser.add_argument("--seed", type=int, help="Graine de la première exécution")
+    parser.add_argument("--time-limit", type=float, help="Budget de temps total en secondes")
+    parser.add_argument("--config", help="Paramètres de l'algorithme en JSON (ex. data/params/small.json)")
+    parser.add_argument("--input", default=INPUT_DIR, help="Dossier de time.csv et meters.csv")
+    parser.add_argument("--output", default=os.path.join("data", "output.txt"), help="Fichier des routes")
+    args = parser.parse_args()
+
+    params = None
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            params = json.load(f)
+
+    time_matrix, dist_matrix = read_instance(args.input)
+    result = solve(time_matrix, dist_matrix, runs=args.runs, seed=args.seed,
+                   time_limit=args.time_limit, params=params)
+    write_routes(result.routes, args.output)
+    print(f"Meilleure solution: graine {result.seed}, fitness {result.fitness}, "
+          f"{len(result.routes)} vehicules -> {args.output}")
@@ -0,0 +1,101 @@
+"""
+Client HTTP OpenRouteService partagé (itinéraires et matrices)
+Connexions réutilisées, nombre de requêtes simultanées borné et nouvelles
+tentatives automatiques sur les limites de débit (429) et erreurs serveur
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_BASE_URL = "https://api.openrouteservice.org"
+DEFAULT_API_KEY = "5b3ce3597851110001cf62482cb15bb058ef4ee5b65525786431e0cb"
+
+# Délai de connexion court, délai de lecture large (calculs côté serveur)
+DEFAULT_TIMEOUT = (5, 30)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def base_url(url=None):
+    """URL du service : argument, sinon variable ORS_BASE_URL, sinon le service public."""
+    return (url or os.environ.get("ORS_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+
+
+def api_key(key=None):
+    """Clé API : argument, sinon variable ORS_API_KEY, sinon la clé du projet."""
+    return key or os.environ.get("ORS_API_KEY") or DEFAULT_API_KEY
+
+
+def create_session(key=None, pool_size=4, retries=4, backoff=1.0):
+    """
+    Crée une session HTTP partageable entre threads.
+
+    Args:
+        key: Clé API OpenRouteService
+        pool_size: Connexions gardées ouvertes (au moins le nombre de threads)
+        retries: Nouvelles tentatives par requête (429, 5xx, erreurs réseau)
+        backoff: Base de l'attente exponentielle entre tentatives, en secondes.
+            L'en-tête Retry-After du serveur est respecté lorsqu'il est présent.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        'Authorization': api_key(key),
+        'Content-Type': 'application/json; charset=utf-8',
+        'Accept': 'application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8',
+    })
+    return session
+
+
+class TokenBucket:
+    """
+    Limiteur de débit partagé entre threads : rate jetons par seconde,
+    au plus capacity d'avance (rafale).
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Suspend tous les appelants (réponse 429 du serveur) et vide la réserve."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = self.paused_until
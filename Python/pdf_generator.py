@@ -16,16 +16,20 @@ from reportlab.lib.units import cm
 from reportlab.lib import colors
 import requests
 import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import matplotlib.pyplot as plt
 from PIL import Image as PILImage
 
+import basemap
+import ors
+
 try:
-    import contextily as ctx
     from pyproj import Transformer
 
-    CONTEXTILY_AVAILABLE = True
+    BASEMAP_AVAILABLE = True
 except ImportError:
-    CONTEXTILY_AVAILABLE = False
+    BASEMAP_AVAILABLE = False
 
 
 class CERPDeliveryPDFGenerator:
@@ -219,20 +223,30 @@ class CERPDeliveryPDFGenerator:
 
         return coordinates
 
-    def fetch_all_routes_openrouteservice(self, all_trucks):
+    def fetch_all_routes_openrouteservice(self, all_trucks, base_url=None, max_workers=4):
         """
         Récupère les routes détaillées via l'API OpenRouteService
+
+        Les camionnettes sont interrogées en parallèle (au plus max_workers requêtes
+        simultanées) sur une session commune qui réutilise les connexions et
+        relance les requêtes refusées pour limite de débit.
+
+        Args:
+            base_url: URL du service (par défaut ORS_BASE_URL ou le service public),
+                par exemple celle de mock_ors.py pour les tests
+            max_workers: Nombre maximal de requêtes simultanées
         """
-        API_KEY = "5b3ce3597851110001cf62482cb15bb058ef4ee5b65525786431e0cb"
+        API_KEY = ors.api_key()
 
         if API_KEY == "VOTRECLEAPI":
             print("⚠️ Clé API non configurée.")
             return
 
-        for truck_num, truck_route in all_trucks.items():
-            print(f"\n📍 Traitement camionnette {truck_num}...")
+        url = f"{ors.base_url(base_url)}/v2/directions/driving-car"
 
-            # Construire la liste des coordonnées
+        # Construire la liste des coordonnées de chaque camionnette
+        jobs = {}
+        for truck_num, truck_route in all_trucks.items():
             coordinates = []
             for loc_idx in truck_route:
                 if loc_idx in self.pharmacies:
@@ -247,103 +261,93 @@ class CERPDeliveryPDFGenerator:
             if len(coordinates) < 2:
                 print(f"⚠️ Pas assez de points pour la camionnette {truck_num}")
                 continue
-
-            try:
-                # Configuration de la requête
-                url = "https://api.openrouteservice.org/v2/directions/driving-car"
-
-                headers = {
-                    'Authorization': API_KEY,
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json, application/geo+json, application/gpx+xml, img/png; charset=utf-8'
-                }
-
-                # Corps de la requête
-                body = {
-                    "coordinates": coordinates,
-                    "elevation": False,
-                    "geometry": True  # On veut la géométrie
-                }
-
-                print(f"  Envoi requête avec {len(coordinates)} points")
-
-                # Envoi de la requête
-                response = requests.post(url, json=body, headers=headers, timeout=30)
-
-                if response.status_code == 200:
-                    data = response.json()
-
-                    # Vérifier la structure de la réponse
-                    if 'routes' in data and len(data['routes']) > 0:
-                        route_data = data['routes'][0]
-
-                        # Récupérer et traiter la géométrie
-                        if 'geometry' in route_data:
-                            geometry = route_data['geometry']
-
-                            # Cas 1: Polyline encodée (string)
-                            if isinstance(geometry, str):
-                                print(f"  Décodage polyline pour camionnette {truck_num}")
-                                decoded_coords = self.decode_polyline(geometry)
-                                self.all_routes_data[truck_num] = decoded_coords
-                                print(f"  ✓ Route décodée: {len(decoded_coords)} points")
-
-                            # Cas 2: GeoJSON (dict avec coordinates)
-                            elif isinstance(geometry, dict) and 'coordinates' in geometry:
-                                route_coords = [[coord[1], coord[0]] for coord in geometry['coordinates']]
-                                self.all_routes_data[truck_num] = route_coords
-                                print(f"  ✓ Route GeoJSON: {len(route_coords)} points")
-
-                            # Cas 3: Liste de coordonnées directe
-                            elif isinstance(geometry, list):
-                                route_coords = [[coord[1], coord[0]] for coord in geometry]
-                                self.all_routes_data[truck_num] = route_coords
-                                print(f"  ✓ Route directe: {len(route_coords)} points")
-
-                            else:
-                                print(f"  ⚠️ Format de géométrie non reconnu: {type(geometry)}")
-                                # Fallback: utiliser les points de passage
-                                self._use_fallback_route(truck_num, truck_route)
-
-                        # Afficher les statistiques de la route
-                        if 'summary' in route_data:
-                            summary = route_data['summary']
-                            distance_km = summary.get('distance', 0) / 1000
-                            duration_min = summary.get('duration', 0) / 60
-                            print(f"  📊 Distance: {distance_km:.1f} km, Durée: {duration_min:.0f} min")
-
-                    else:
-                        print(f"  ⚠️ Pas de route trouvée dans la réponse")
-                        self._use_fallback_route(truck_num, truck_route)
-
-                elif response.status_code == 401:
-                    print(f"  ❌ Erreur d'authentification. Vérifiez votre clé API.")
-                    self._use_fallback_route(truck_num, truck_route)
-
-                elif response.status_code == 429:
-                    print(f"  ❌ Limite de requêtes atteinte. Réessayez plus tard.")
-                    self._use_fallback_route(truck_num, truck_route)
-
+            jobs[truck_num] = coordinates
+
+        print(f"📍 {len(jobs)} camionnettes, {max_workers} requêtes simultanées au plus")
+
+        with ors.create_session(API_KEY, pool_size=max_workers) as session, \
+                ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self._fetch_route_geometry, session, url, truck_num, coordinates): truck_num
+                for truck_num, coordinates in jobs.items()
+            }
+            for future in as_completed(futures):
+                truck_num = futures[future]
+                route_coords, message = future.result()
+                print(message)
+                if route_coords is None:
+                    self._use_fallback_route(truck_num, all_trucks[truck_num])
                 else:
-                    print(f"  ❌ Erreur API: {response.status_code}")
-                    print(f"  Réponse: {response.text[:200]}...")
-                    self._use_fallback_route(truck_num, truck_route)
+                    self.all_routes_data[truck_num] = route_coords
 
-            except requests.exceptions.Timeout:
-                print(f"  ⏱️ Timeout pour camionnette {truck_num}")
-                self._use_fallback_route(truck_num, truck_route)
+        print(f"\n✅ Traitement terminé. {len(self.all_routes_data)} routes récupérées.")
 
-            except requests.exceptions.ConnectionError:
-                print(f"  🌐 Erreur de connexion pour camionnette {truck_num}")
-                self._use_fallback_route(truck_num, truck_route)
+    def _fetch_route_geometry(self, session, url, truck_num, coordinates):
+        """
+        Interroge le service d'itinéraires pour une camionnette.
 
-            except Exception as e:
-                print(f"  ❌ Erreur inattendue pour camionnette {truck_num}: {e}")
-                import traceback
-                traceback.print_exc()
-                self._use_fallback_route(truck_num, truck_route)
+        Appelée depuis plusieurs threads : le compte rendu est renvoyé plutôt
+        qu'affiché, pour que les lignes des camionnettes ne se mélangent pas.
 
-        print(f"\n✅ Traitement terminé. {len(self.all_routes_data)} routes récupérées.")
+        Returns:
+            (liste de coordonnées [lat, lon] ou None en cas d'échec, message)
+        """
+        body = {
+            "coordinates": coordinates,
+            "elevation": False,
+            "geometry": True  # On veut la géométrie
+        }
+
+        try:
+            response = session.post(url, json=body, timeout=ors.DEFAULT_TIMEOUT)
+        except requests.exceptions.Timeout:
+            return None, f"  ⏱️ Timeout pour camionnette {truck_num}"
+        except requests.exceptions.ConnectionError:
+            return None, f"  🌐 Erreur de connexion pour camionnette {truck_num}"
+        except Exception as e:
+            return None, f"  ❌ Erreur inattendue pour camionnette {truck_num}: {e}"
+
+        if response.status_code == 401:
+            return None, f"  ❌ Camionnette {truck_num}: erreur d'authentification. Vérifiez votre clé API."
+        if response.status_code == 429:
+            return None, f"  ❌ Camionnette {truck_num}: limite de requêtes atteinte malgré les nouvelles tentatives."
+        if response.status_code != 200:
+            return None, (f"  ❌ Camionnette {truck_num}: erreur API {response.status_code}\n"
+                          f"  Réponse: {response.text[:200]}...")
+
+        data = response.json()
+
+        # Vérifier la structure de la réponse
+        if not data.get('routes'):
+            return None, f"  ⚠️ Camionnette {truck_num}: pas de route trouvée dans la réponse"
+        route_data = data['routes'][0]
+
+        route_coords = self._parse_geometry(route_data.get('geometry'))
+        if route_coords is None:
+            return None, f"  ⚠️ Camionnette {truck_num}: format de géométrie non reconnu"
+
+        # Statistiques de la route
+        summary = route_data.get('summary', {})
+        distance_km = summary.get('distance', 0) / 1000
+        duration_min = summary.get('duration', 0) / 60
+        return route_coords, (f"  ✓ Camionnette {truck_num}: {len(route_coords)} points, "
+                              f"{distance_km:.1f} km, {duration_min:.0f} min")
+
+    def _parse_geometry(self, geometry):
+        """Convertit la géométrie renvoyée par l'API en liste de [lat, lon]."""
+        # Cas 1: Polyline encodée (string)
+        if isinstance(geometry, str):
+            return self.decode_polyline(geometry)
+
+        # Cas 2: GeoJSON (dict avec coordinates)
+        if isinstance(geometry, dict) and 'coordinates' in geometry:
+            return [[coord[1], coord[0]] for coord in geometry['coordinates']]
+
+        # Cas 3: Liste de coordonnées directe
+        if isinstance(geometry, list):
+            return [[coord[1], coord[0]] for coord in geometry]
+
+        return None
 
     def _use_fallback_route(self, truck_num, truck_route):
         """
@@ -397,19 +401,17 @@ class CERPDeliveryPDFGenerator:
         max_lon += margin_lon
 
         fig, ax = plt.subplots(figsize=(12, 10))
-        use_contextily = CONTEXTILY_AVAILABLE
+        use_basemap = BASEMAP_AVAILABLE
 
-        if use_contextily:
+        if use_basemap:
             try:
                 transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
 
                 west, south = transformer.transform(min_lon, min_lat)
                 east, north = transformer.transform(max_lon, max_lat)
 
-                ax.set_xlim(west, east)
-                ax.set_ylim(south, north)
-
-                ctx.add_basemap(ax, crs="EPSG:3857", source=ctx.providers.CartoDB.Positron, zoom=12)
+                # Tuiles lues depuis le cache disque, téléchargées seulement à la première utilisation
+                basemap.add_basemap(ax, west, south, east, north, zoom=12)
 
                 for point in points:
                     point['x'], point['y'] = transformer.transform(point['lon'], point['lat'])
@@ -441,9 +443,9 @@ class CERPDeliveryPDFGenerator:
                 ax.set_yticks([])
 
             except Exception as e:
-                use_contextily = False
+                use_basemap = False
 
-        if not use_contextily:
+        if not use_basemap:
             ax.set_xlim(min_lon, max_lon)
             ax.set_ylim(min_lat, max_lat)
             ax.set_facecolor('#e6f3ff')
@@ -776,7 +778,70 @@ class CERPDeliveryPDFGenerator:
 
         return output_file
 
-def generate_pdf():
+# Générateur chargé une fois par le processus parent, transmis aux processus de rendu
+_render_generator = None
+
+
+def _init_render_worker(generator):
+    global _render_generator
+    _render_generator = generator
+
+
+def _render_truck_pdf(truck_num, truck_route, period):
+    return truck_num, _render_generator.generate_truck_pdf(truck_route, truck_num, period)
+
+
+def render_truck_pdfs(generator, trucks, period="morning", workers=None):
+    """
+    Génère les PDF de chaque camionnette, en parallèle sur plusieurs processus.
+
+    Les cartes (matplotlib) et la compression PNG occupent le processeur et sont
+    indépendantes d'une camionnette à l'autre. Les processus de rendu reçoivent le
+    générateur déjà chargé (pharmacies, matrices, itinéraires) au démarrage, par
+    héritage du processus parent lorsque le système le permet (fork), sans
+    relire les fichiers.
+
+    Args:
+        workers: Nombre de processus (par défaut, le nombre de cœurs) ; 1 pour
+            un rendu séquentiel dans le processus courant
+
+    Returns:
+        Dictionnaire numéro de camionnette -> fichier PDF
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(trucks))
+
+    files = {}
+    if workers <= 1:
+        for truck_num, truck_route in trucks.items():
+            files[truck_num] = generator.generate_truck_pdf(truck_route, truck_num, period)
+            print(f"  ✓ Camionnette {truck_num}: {files[truck_num]}")
+        return files
+
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_render_worker, initargs=(generator,)) as pool:
+        futures = [pool.submit(_render_truck_pdf, truck_num, truck_route, period)
+                   for truck_num, truck_route in trucks.items()]
+        for future in as_completed(futures):
+            truck_num, output_file = future.result()
+            files[truck_num] = output_file
+            print(f"  ✓ Camionnette {truck_num}: {output_file}")
+
+    return files
+
+
+def generate_pdf(workers=None):
+    """
+    Génère les PDF de tournées et le récapitulatif.
+
+    Args:
+        workers: Processus de rendu des PDF par camionnette (par défaut, le nombre de cœurs)
+    """
     print("🚚 Génération des PDF de tournées CERP Rouen")
     print("=" * 50)
 
@@ -798,9 +863,7 @@ def generate_pdf():
     period = "morning"
 
     print(f"\n📄 Génération des PDF...")
-    for truck_num, truck_route in trucks.items():
-        output_file = generator.generate_truck_pdf(truck_route, truck_num, period)
-        print(f"  ✓ Camionnette {truck_num}: {output_file}")
+    render_truck_pdfs(generator, trucks, period, workers)
 
     summary_file = generator.generate_summary_pdf(trucks, period)
     print(f"  ✓ Récapitulatif: {summary_file}")
@@ -0,0 +1,372 @@
+"""
+Liaison Python du solveur génétique (bibliothèque partagée bin/libvrp.so)
+La bibliothèque est compilée une seule fois, puis appelée directement en mémoire
+"""
+
+import ctypes
+import glob
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB_PATH = os.path.join(ROOT_DIR, "bin", "libvrp.so")
+
+_library = None
+
+SolveResult = namedtuple("SolveResult", ["routes", "fitness", "seed", "stats"])
+
+# Statistiques de l'exécution retenue : durées en secondes, trace de convergence
+# en liste de (instant, fitness) à chaque amélioration du meilleur individu
+SolverStats = namedtuple("SolverStats", ["generations", "init_time", "elapsed", "trace",
+                                         "restarts", "clones", "diversity", "cache_hit_rate"],
+                         defaults=(0, 0, None, None))
+
+TRACE_CAPACITY = 256  # TRACE_CAPACITY de include/genetic.h
+
+_int_matrix = np.ctypeslib.ndpointer(dtype=np.int32, ndim=2, flags='C_CONTIGUOUS')
+_int_array = np.ctypeslib.ndpointer(dtype=np.int32, ndim=1, flags='C_CONTIGUOUS')
+
+
+def _library_is_stale():
+    if not os.path.exists(LIB_PATH):
+        return True
+    built = os.path.getmtime(LIB_PATH)
+    sources = glob.glob(os.path.join(ROOT_DIR, "src", "*.c")) + glob.glob(os.path.join(ROOT_DIR, "include", "*.h"))
+    return any(os.path.getmtime(path) > built for path in sources)
+
+
+def load_library():
+    """Charge libvrp.so, en la compilant d'abord si elle est absente ou périmée."""
+    global _library
+
+    if _library is not None:
+        return _library
+
+    if _library_is_stale():
+        print("Compilation de la bibliothèque du solveur...")
+        try:
+            build = subprocess.run(["make", "lib"], cwd=ROOT_DIR, capture_output=True, text=True)
+        except OSError as e:
+            raise RuntimeError(f"Compilation impossible ({e}) : voir numpy_solver pour un solveur sans C") from e
+        if build.returncode != 0:
+            raise RuntimeError(f"Erreur lors du make lib :\n{build.stderr}")
+
+    library = ctypes.CDLL(LIB_PATH)
+    library.vrp_solve.argtypes = [
+        _int_matrix, _int_matrix, ctypes.c_int,
+        ctypes.c_int, ctypes.c_int, ctypes.c_uint,
+        _int_array, ctypes.c_int,
+        _int_array, ctypes.c_int,
+        ctypes.POINTER(ctypes.c_ulonglong), ctypes.POINTER(ctypes.c_uint),
+    ]
+    library.vrp_solve.restype = ctypes.c_int
+
+    library.vrp_solve_islands.argtypes = [
+        _int_matrix, _int_matrix, ctypes.c_int,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        ctypes.c_uint,
+        _int_array, ctypes.c_int,
+        _int_array, ctypes.c_int,
+        ctypes.POINTER(ctypes.c_ulonglong), ctypes.POINTER(ctypes.c_uint),
+    ]
+    library.vrp_solve_islands.restype = ctypes.c_int
+
+    library.vrp_set_neighbors.argtypes = [ctypes.c_int]
+    library.vrp_set_neighbors.restype = None
+
+    library.vrp_set_construction.argtypes = [ctypes.c_char_p]
+    library.vrp_set_construction.restype = ctypes.c_int
+
+    library.vrp_set_coordinates.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
+    library.vrp_set_coordinates.restype = None
+
+    library.vrp_last_stats.argtypes = [
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_double),
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_double),
+        ctypes.POINTER(ctypes.c_double),
+        np.ctypeslib.ndpointer(dtype=np.float64, ndim=1, flags='C_CONTIGUOUS'),
+        np.ctypeslib.ndpointer(dtype=np.uint64, ndim=1, flags='C_CONTIGUOUS'),
+        ctypes.c_int,
+    ]
+    library.vrp_last_stats.restype = ctypes.c_int
+
+    library.vrp_set_control.argtypes = [ctypes.c_int, ctypes.c_int]
+    library.vrp_set_control.restype = None
+
+    library.vrp_set_limits.argtypes = [ctypes.c_double, ctypes.c_ulonglong]
+    library.vrp_set_limits.restype = None
+
+    library.vrp_set_params.argtypes = [ctypes.c_char_p]
+    library.vrp_set_params.restype = ctypes.c_int
+
+    _library = library
+    return _library
+
+
+TOPOLOGIES = {"ring": 0, "full": 1}
+
+# Paramètres réglables de l'algorithme génétique (GAParams de include/genetic.h)
+GA_PARAMS = ["population_size", "mutation_rate", "crossover_rate",
+             "tournament_size", "elite_size", "stagnation_limit", "local_search_rate",
+             "crossover", "restart_diversity"]
+
+# Classes de taille d'instance (nombre maximal de villes, dépôt compris) pour
+# les paramètres réglés par tuner.py, un fichier JSON par classe
+SIZE_CLASSES = [("small", 100), ("medium", 300), ("large", None)]
+PARAMS_DIR = os.path.join(ROOT_DIR, "data", "params")
+
+
+def size_class(num_cities):
+    """Nom de la classe de taille d'une instance de num_cities villes."""
+    for name, max_cities in SIZE_CLASSES:
+        if max_cities is None or num_cities <= max_cities:
+            return name
+
+
+def tuned_params(num_cities, params_dir=PARAMS_DIR):
+    """Paramètres réglés pour la classe de taille de l'instance, None s'il n'y en a pas."""
+    path = os.path.join(params_dir, f"{size_class(num_cities)}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def solve(time_matrix, dist_matrix, runs=1, jobs=None, seed=None,
+          islands=0, migration_interval=20, migrants=5, topology="ring",
+          neighbors=None, construction=None, coordinates=None, progress=None, stop=None,
+          time_limit=None, target=None, params=None):
+    """
+    Résout le VRP sur des matrices carrées de temps (s) et de distances (m).
+
+    Les matrices int32 contiguës sont transmises sans copie.
+
+    Args:
+        runs: Nombre d'exécutions indépendantes (la meilleure est retenue)
+        jobs: Exécutions en parallèle (par défaut, le nombre de cœurs)
+        seed: Graine de la première exécution (les suivantes: seed+1, ...)
+        islands: Si >= 2, modèle en îles avec ce nombre de populations (remplace runs/jobs)
+        migration_interval: Générations entre deux migrations
+        migrants: Individus envoyés par île à chaque migration
+        topology: Topologie de migration, "ring" ou "full"
+        neighbors: Voisines candidates par ville pour les insertions (0: recherche complète,
+            None: 20 sur les grandes instances, recherche complète sur les petites)
+        construction: Mélange des heuristiques de la population initiale, par ex.
+            "nn:2,savings:1,sweep:1" (None: mélange par défaut)
+        coordinates: Tableau (n, 2) des latitudes et longitudes des villes, dans
+            l'ordre des matrices ; active la construction par balayage
+        progress: Fonction appelée (depuis un autre thread) avec chaque point de
+            progression : dict seed, generation, fitness, vehicles, distance,
+            duration, gen_per_s, elapsed, final
+        stop: threading.Event ; une fois levé, le solveur s'arrête et retourne
+            la meilleure solution trouvée jusque-là
+        time_limit: Budget de temps en secondes (None: pas de limite) ; à son
+            terme la meilleure solution trouvée est retournée
+        target: Fitness cible : arrêt dès qu'une solution au moins aussi bonne
+            est trouvée (None: pas de cible)
+        params: Paramètres de l'algorithme génétique (dict, clés de GA_PARAMS),
+            les absents gardant leur valeur par défaut
+
+    Returns:
+        SolveResult (routes en tableaux d'indices sans le dépôt, fitness, graine retenue,
+        SolverStats de l'exécution retenue, None en modèle d'îles)
+    """
+    library = load_library()
+
+    time_matrix = np.ascontiguousarray(time_matrix, dtype=np.int32)
+    dist_matrix = np.ascontiguousarray(dist_matrix, dtype=np.int32)
+    num_cities = time_matrix.shape[0]
+
+    if time_matrix.shape != (num_cities, num_cities) or dist_matrix.shape != time_matrix.shape:
+        raise ValueError("Les matrices de temps et de distances doivent être carrées et de même taille")
+
+    routes = np.empty(max(1, 2 * num_cities), dtype=np.int32)
+    lengths = np.empty(max(1, num_cities), dtype=np.int32)
+    fitness = ctypes.c_ulonglong(0)
+    best_seed = ctypes.c_uint(0)
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if seed is None:
+        seed = time.time_ns() & 0xFFFFFFFF
+
+    library.vrp_set_neighbors(-1 if neighbors is None else neighbors)
+    if time_limit is not None and time_limit <= 0:
+        raise ValueError(f"Budget de temps invalide : {time_limit}")
+    library.vrp_set_limits(time_limit or 0.0, target or 0)
+    if not library.vrp_set_params(json.dumps(params).encode() if params else None):
+        raise ValueError(f"Paramètres de l'algorithme invalides : {params}")
+    if not library.vrp_set_construction(construction.encode() if construction else None):
+        raise ValueError(f"Mélange de construction invalide : {construction}")
+
+    if coordinates is not None:
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        if coordinates.shape != (num_cities, 2) or not np.isfinite(coordinates).all():
+            raise ValueError("Les coordonnées doivent former un tableau (nombre de villes, 2) sans valeur manquante")
+        latitude = np.ascontiguousarray(coordinates[:, 0])
+        longitude = np.ascontiguousarray(coordinates[:, 1])
+        library.vrp_set_coordinates(latitude.ctypes.data, longitude.ctypes.data, num_cities)
+    else:
+        library.vrp_set_coordinates(None, None, 0)
+    with _control(library, progress, stop):
+        num_vehicles = _run(library, time_matrix, dist_matrix, num_cities, runs, jobs, seed,
+                            islands, migration_interval, migrants, topology, routes, lengths,
+                            fitness, best_seed)
+    if num_vehicles < 0:
+        raise RuntimeError("Échec du solveur")
+
+    stats = None if islands else _last_stats(library)
+
+    bounds = np.cumsum(lengths[:num_vehicles])
+    if num_vehicles == 0:
+        return SolveResult([], fitness.value, best_seed.value, stats)
+    return SolveResult(np.split(routes[:bounds[-1]], bounds[:-1]), fitness.value, best_seed.value, stats)
+
+
+def _run(library, time_matrix, dist_matrix, num_cities, runs, jobs, seed,
+         islands, migration_interval, migrants, topology, routes, lengths, fitness, best_seed):
+    if islands:
+        return library.vrp_solve_islands(time_matrix, dist_matrix, num_cities,
+                                         islands, migration_interval, migrants,
+                                         TOPOLOGIES[topology], seed,
+                                         routes, len(routes), lengths, len(lengths),
+                                         ctypes.byref(fitness), ctypes.byref(best_seed))
+    return library.vrp_solve(time_matrix, dist_matrix, num_cities,
+                             runs, jobs, seed,
+                             routes, len(routes), lengths, len(lengths),
+                             ctypes.byref(fitness), ctypes.byref(best_seed))
+
+
+@contextmanager
+def _control(library, progress, stop):
+    """
+    Branche le flux de progression et la demande d'arrêt du solveur le temps d'un appel.
+
+    Le solveur écrit ses lignes JSON dans un tube lu par un thread ; la demande
+    d'arrêt est un octet écrit dans un second tube que le solveur surveille.
+    Une exception du callback de progression est relancée à la fin de l'appel
+    (le tube reste vidé jusque-là pour que le solveur ne bloque pas).
+    """
+    progress_read = progress_write = stop_read = stop_write = -1
+    finished = threading.Event()
+    threads = []
+    errors = []
+
+    if progress is not None:
+        progress_read, progress_write = os.pipe()
+
+        def read_progress():
+            with os.fdopen(progress_read, "r") as stream:
+                for line in stream:
+                    if errors:
+                        continue
+                    try:
+                        progress(json.loads(line))
+                    except Exception as e:
+                        errors.append(e)
+
+        threads.append(threading.Thread(target=read_progress, daemon=True))
+
+    if stop is not None:
+        stop_read, stop_write = os.pipe()
+
+        def watch_stop():
+            while not finished.is_set():
+                if stop.wait(0.1):
+                    os.write(stop_write, b"x")
+                    return
+
+        threads.append(threading.Thread(target=watch_stop, daemon=True))
+
+    for thread in threads:
+        thread.start()
+    library.vrp_set_control(progress_write, stop_read)
+    try:
+        yield
+    finally:
+        library.vrp_set_control(-1, -1)
+        finished.set()
+        if progress_write >= 0:
+            os.close(progress_write)  # Fin du flux : le thread de lecture termine
+        for thread in threads:
+            thread.join()
+        for fd in (stop_read, stop_write):
+            if fd >= 0:
+                os.close(fd)
+    if errors:
+        raise errors[0]
+
+
+class SolveJob:
+    """
+    Résolution lancée en arrière-plan (mêmes arguments que solve).
+
+    history reçoit les points de progression au fil de l'eau ; stop() demande
+    l'arrêt anticipé avec la meilleure solution trouvée jusque-là. solver
+    remplace solve par une fonction de même interface (numpy_solver.solve).
+    """
+
+    def __init__(self, time_matrix, dist_matrix, solver=None, **options):
+        self.history = []
+        self.result = None
+        self.error = None
+        self._solver = solver or solve
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(time_matrix, dist_matrix, options), daemon=True)
+        self._thread.start()
+
+    def _run(self, time_matrix, dist_matrix, options):
+        try:
+            self.result = self._solver(time_matrix, dist_matrix, progress=self.history.append, stop=self._stop,
+                                       **options)
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        self._stop.set()
+
+    def stopped(self):
+        """Vrai si l'arrêt a été demandé (résultat possiblement inachevé)."""
+        return self._stop.is_set()
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.done()
+
+
+def _last_stats(library):
+    generations = ctypes.c_int(0)
+    init_time = ctypes.c_double(0)
+    elapsed = ctypes.c_double(0)
+    restarts = ctypes.c_int(0)
+    clones = ctypes.c_int(0)
+    diversity = ctypes.c_double(0)
+    cache_hit_rate = ctypes.c_double(0)
+    trace_time = np.empty(TRACE_CAPACITY, dtype=np.float64)
+    trace_fitness = np.empty(TRACE_CAPACITY, dtype=np.uint64)
+
+    length = library.vrp_last_stats(ctypes.byref(generations), ctypes.byref(init_time), ctypes.byref(elapsed),
+                                    ctypes.byref(restarts), ctypes.byref(clones), ctypes.byref(diversity),
+                                    ctypes.byref(cache_hit_rate),
+                                    trace_time, trace_fitness, TRACE_CAPACITY)
+    trace = [(float(t), int(f)) for t, f in zip(trace_time[:length], trace_fitness[:length])]
+    return SolverStats(generations.value, init_time.value, elapsed.value, trace,
+                       restarts.value, clones.value, diversity.value, cache_hit_rate.value)
+
+
+def write_routes(routes, route_file=os.path.join("data", "output.txt")):
+    """Écrit les routes au format de write_solution (une route [a,b,c] par ligne)."""
+    os.makedirs(os.path.dirname(route_file), exist_ok=True)
+    with open(route_file, "w") as f:
+        for route in routes:
+            f.write("[" + ",".join(str(city) for city in route) + "]\n")
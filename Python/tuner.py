@@ -0,0 +1,171 @@
+"""
+Réglage automatique des paramètres de l'algorithme génétique
+Par classe de taille d'instance, des jeux de paramètres tirés au hasard (plus
+celui par défaut) sont mis en course par éliminations successives (successive
+halving) : à chaque tour, tous les candidats restants résolvent les
+instances de la classe avec le même budget de temps, seul le meilleur tiers
+(1/eta) continue, avec un budget eta fois plus long.
+Le meilleur jeu de chaque classe est écrit dans data/params/<classe>.json,
+utilisable tel quel par le solveur (vrp -C, solver.tuned_params).
+
+Usage (depuis la racine du dépôt) :
+    python Python/tuner.py [--candidates 27] [--eta 3] [--budget 1] [--seeds 1,2] [--synthetic 150,250,500]
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark import DELIVERY_FILES, INPUT_DIR, _init_worker, delivery_instance, synthetic_instance
+from solver import PARAMS_DIR, SIZE_CLASSES, load_library, size_class, solve
+
+DEFAULT_SYNTHETIC = [150, 250, 500]
+
+# Valeurs par défaut de include/genetic.h (candidat de référence)
+DEFAULT_PARAMS = {"population_size": 500, "mutation_rate": 0.2, "crossover_rate": 0.9,
+                  "tournament_size": 7, "elite_size": 0, "stagnation_limit": 200,
+                  "local_search_rate": 0.05, "crossover": "routes", "restart_diversity": 0.75}
+
+
+def sample_params(rng):
+    """Jeu de paramètres tiré au hasard (échelle logarithmique pour les tailles)."""
+    population = int(round(math.exp(rng.uniform(math.log(50), math.log(1000)))))
+    return {
+        "population_size": population,
+        "mutation_rate": round(rng.uniform(0.05, 0.6), 3),
+        "crossover_rate": round(rng.uniform(0.5, 1.0), 3),
+        "tournament_size": rng.randint(2, 12),
+        "elite_size": max(1, int(round(population * rng.uniform(0.01, 0.2)))),
+        "stagnation_limit": int(round(math.exp(rng.uniform(math.log(50), math.log(1000))))),
+        "local_search_rate": round(rng.uniform(0.0, 0.5), 3),
+        "crossover": rng.choice(["routes", "ox", "pmx"]),
+        "restart_diversity": round(rng.uniform(0.0, 0.9), 3),
+    }
+
+
+_instances = None
+
+
+def _init_tuning_worker(instances):
+    global _instances
+    _init_worker()
+    _instances = instances
+
+
+def _evaluate(name, seed, params, budget):
+    time_matrix, dist_matrix, coordinates = _instances[name]
+    result = solve(time_matrix, dist_matrix, runs=1, jobs=1, seed=seed, coordinates=coordinates,
+                   time_limit=budget, params=params)
+    return result.fitness
+
+
+def _race(executor, candidates, names, seeds, budget):
+    """
+    Un tour de course : chaque candidat sur chaque (instance, graine).
+
+    Returns:
+        Score de chaque candidat : écart relatif moyen à la meilleure fitness
+        obtenue sur chaque (instance, graine) pendant ce tour
+    """
+    cases = [(name, seed) for name in names for seed in seeds]
+    futures = {(c, case): executor.submit(_evaluate, *case, candidates[c], budget)
+               for c in range(len(candidates)) for case in cases}
+    fitness = {key: future.result() for key, future in futures.items()}
+
+    best = {case: min(fitness[c, case] for c in range(len(candidates))) for case in cases}
+    return [statistics.mean(fitness[c, case] / best[case] - 1 for case in cases)
+            for c in range(len(candidates))]
+
+
+def successive_halving(executor, names, seeds, num_candidates, eta, budget, rng):
+    """
+    Sélection du meilleur jeu de paramètres pour un ensemble d'instances.
+
+    Returns:
+        (meilleurs paramètres, historique des tours)
+    """
+    candidates = [dict(DEFAULT_PARAMS)] + [sample_params(rng) for _ in range(num_candidates - 1)]
+    rounds = []
+
+    while len(candidates) > 1:
+        start = time.time()
+        scores = _race(executor, candidates, names, seeds, budget)
+        ranking = sorted(range(len(candidates)), key=lambda c: scores[c])
+        rounds.append({
+            "budget": budget,
+            "duration": round(time.time() - start, 1),
+            "candidates": [{"params": candidates[c], "score": round(scores[c], 6)} for c in ranking],
+        })
+        default = [scores[c] for c in range(len(candidates)) if candidates[c] == DEFAULT_PARAMS]
+        print(f"   {len(candidates)} candidats, {budget:g} s : écart médian au meilleur "
+              f"{statistics.median(scores):.3%}"
+              + (f", paramètres par défaut {default[0]:.3%}" if default else ""), flush=True)
+
+        candidates = [candidates[c] for c in ranking[:max(1, len(candidates) // eta)]]
+        budget *= eta
+    return candidates[0], rounds
+
+
+def tune(seeds, synthetic_sizes, num_candidates, eta, budget, workers, rng_seed=0):
+    """Réglage de chaque classe de taille représentée dans le jeu d'instances."""
+    load_library()  # Compilation éventuelle avant de lancer les processus
+
+    instances = {}
+    for name in DELIVERY_FILES:
+        instances[os.path.splitext(name)[0]] = delivery_instance(os.path.join(INPUT_DIR, name))
+    for size in synthetic_sizes:
+        instances[f"synthetic{size}"] = synthetic_instance(size, seed=size)
+
+    classes = {}
+    for name, (time_matrix, _, _) in instances.items():
+        classes.setdefault(size_class(len(time_matrix)), []).append(name)
+
+    rng = random.Random(rng_seed)
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "seeds": seeds, "eta": eta, "classes": {}}
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_tuning_worker, initargs=(instances,)) as executor:
+        for class_name, _ in SIZE_CLASSES:
+            if class_name not in classes:
+                continue
+            names = classes[class_name]
+            print(f"Classe {class_name} : {', '.join(names)}", flush=True)
+            best, rounds = successive_halving(executor, names, seeds, num_candidates, eta, budget, rng)
+            report["classes"][class_name] = {"instances": names, "best": best, "rounds": rounds}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réglage des paramètres de l'algorithme génétique")
+    parser.add_argument("--candidates", type=int, default=27, help="Jeux de paramètres au premier tour")
+    parser.add_argument("--eta", type=int, default=3, help="Facteur de réduction entre deux tours")
+    parser.add_argument("--budget", type=float, default=1.0, help="Secondes par résolution au premier tour")
+    parser.add_argument("--seeds", default="1", help="Graines, ex. 1,2")
+    parser.add_argument("--synthetic", default=",".join(map(str, DEFAULT_SYNTHETIC)),
+                        help="Tailles des instances synthétiques (vide: aucune)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Résolutions en parallèle")
+    parser.add_argument("--output", default=PARAMS_DIR, help="Dossier des paramètres par classe")
+    args = parser.parse_args()
+
+    if args.candidates < 1 or args.eta < 2 or args.budget <= 0:
+        parser.error("il faut au moins un candidat, eta >= 2 et un budget positif")
+
+    report = tune([int(s) for s in args.seeds.split(",") if s],
+                  [int(s) for s in args.synthetic.split(",") if s],
+                  args.candidates, args.eta, args.budget, args.workers)
+
+    os.makedirs(args.output, exist_ok=True)
+    for class_name, result in report["classes"].items():
+        path = os.path.join(args.output, f"{class_name}.json")
+        with open(path, "w", encoding='utf-8') as f:
+            json.dump(result["best"], f, indent=1)
+        print(f"{class_name} : {result['best']} -> {path}")
+    with open(os.path.join(args.output, "tuning.json"), "w", encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
@@ -0,0 +1,32 @@
+#ifndef CANDIDATES_H
+#define CANDIDATES_H
+
+#include "location.h"
+
+#define DEFAULT_NEIGHBORS 20
+#define AUTO_NEIGHBORS (-1)
+#define LOCAL_SEARCH_NEIGHBORS 15   /* longueur minimale des listes (recherche locale) */
+
+/* En dessous de ce nombre de villes par voisine, une recherche complète
+ * coûte autant que la recherche restreinte : k automatique = 0 */
+#define MIN_CITIES_PER_NEIGHBOR 8
+
+/* Listes de candidats granulaires : pour chaque ville, ses k plus proches
+ * voisines (dépôt exclu), classées par distance aller + retour puis par temps.
+ * Les insertions ne sont alors évaluées qu'à côté de ces voisines.
+ * Avec k = 0, les insertions restent des recherches complètes.
+ * Avec k = AUTO_NEIGHBORS, DEFAULT_NEIGHBORS voisines si l'instance est assez grande.
+ * Les listes comptent au moins LOCAL_SEARCH_NEIGHBORS villes quel que soit k. */
+void build_candidates(Board time_board, Board dist_board, int k);
+void free_candidates(void);
+
+/* Nombre de voisines par ville pour les insertions (0 : recherches complètes) */
+int candidate_count(void);
+
+/* Longueur des listes (au moins candidate_count()) */
+int neighbor_count(void);
+
+/* Voisines de city, de la plus proche à la plus lointaine (neighbor_count() éléments) */
+const int* city_neighbors(int city);
+
+#endif
@@ -0,0 +1,40 @@
+#ifndef CONSTRUCTION_H
+#define CONSTRUCTION_H
+
+#include "location.h"
+
+/* Heuristiques de construction de la population initiale.
+ * Le premier individu attribué à une heuristique en est la version
+ * déterministe, les suivants une version randomisée :
+ *   nn      plus proche voisin (tirage parmi les RANDOM_NN_CHOICES plus proches)
+ *   savings Clarke-Wright (gains perturbés de +/- SAVINGS_NOISE)
+ *   sweep   balayage angulaire autour du dépôt (angle de départ et sens tirés),
+ *           seulement si les coordonnées des villes sont connues */
+typedef enum {
+    BUILD_NEAREST,
+    BUILD_SAVINGS,
+    BUILD_SWEEP,
+    NUM_BUILDERS
+} Builder;
+
+#define DEFAULT_CONSTRUCTION_MIX "nn:2,savings:1,sweep:1"
+#define RANDOM_NN_CHOICES 3
+#define SAVINGS_NOISE 0.2
+
+/* Mélange au format "nn:2,savings:1,sweep:1" (poids relatifs, heuristiques
+ * absentes à 0). Retourne 0 si la description est invalide (mélange inchangé). */
+int set_construction_mix(const char* spec);
+
+/* Coordonnées (degrés) des n villes, copiées ; NULL pour les oublier.
+ * Le balayage n'est utilisé que si n correspond à NUM_CITIES. */
+void set_coordinates(const double* latitude, const double* longitude, int n);
+int has_coordinates(void);
+
+/* Heuristique de la case slot d'une population de size individus ;
+ * randomized vaut 0 pour la première case de chaque heuristique */
+Builder slot_builder(int slot, int size, int* randomized);
+
+/* Construction complète (réparée et évaluée) d'une solution */
+void build_solution(Board time_board, Board dist_board, Solution* sol, Builder builder, int randomized);
+
+#endif
@@ -0,0 +1,20 @@
+#ifndef DIVERSITY_H
+#define DIVERSITY_H
+
+#include "genetic.h"
+
+/* Empreinte canonique d'une solution : somme des empreintes de ses arcs
+ * orientés (départs et retours au dépôt compris), donc indépendante de
+ * l'ordre des routes, combinée au nombre de véhicules (routes vides
+ * comprises). Deux solutions de même empreinte sont des clones. Jamais 0. */
+unsigned long long solution_hash(const Solution* sol);
+
+/* Diversité des arêtes (arcs sans orientation) d'une population : 1 - part
+ * moyenne des arêtes d'un individu que chacun des autres individus possède
+ * aussi. 0 si tous les individus sont identiques, 1 si aucune arête n'est
+ * partagée. Mémoire proportionnelle au nombre d'arêtes distinctes. */
+double population_diversity(const Population* pop);
+
+void free_diversity(void);
+
+#endif
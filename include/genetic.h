@@ -3,48 +3,133 @@
 
 #include "location.h"
 
-#define POPULATION_SIZE 500
 #define MAX_GENERATIONS 10000
-#define MUTATION_RATE 0.2
-#define CROSSOVER_RATE 0.9
-#define TOURNAMENT_SIZE 7
-#define STAGNATION_LIMIT 200
 #define SERVICE_TIME 180
-#define ELITE_SIZE (POPULATION_SIZE/10)
+#define VEHICLE_COST 1500000   /* coût fixe d'un véhicule dans la fitness */
+#define DURATION_PENALTY 10000 /* pénalité par seconde au-delà de MAX_TIME */
+#define NN_MAX_CHOICES 8
+#define CLONE_RETRIES 3        /* mutations forcées d'un clone avant son remplacement par un individu neuf */
+
+/* Croisement : sur les routes (segment d'une route de parent1 puis insertions)
+ * ou sur les tours géants des parents (giant_tour.h), découpés par Split */
+typedef enum {
+    CROSSOVER_ROUTES,
+    CROSSOVER_OX,
+    CROSSOVER_PMX
+} Crossover;
+
+/* Valeurs par défaut des paramètres réglables (voir GAParams) */
+#define DEFAULT_POPULATION_SIZE 500
+#define DEFAULT_MUTATION_RATE 0.2
+#define DEFAULT_CROSSOVER_RATE 0.9
+#define DEFAULT_TOURNAMENT_SIZE 7
+#define DEFAULT_ELITE_SIZE 0           /* 0 : un dixième de la population */
+#define DEFAULT_STAGNATION_LIMIT 200
+#define DEFAULT_LOCAL_SEARCH_RATE 0.05
+#define DEFAULT_CROSSOVER CROSSOVER_ROUTES
+#define DEFAULT_RESTART_DIVERSITY 0.75
+
+/* Paramètres de l'algorithme génétique, fixés à l'exécution (set_ga_params)
+ * et hérités par les processus fils */
+typedef struct {
+    int population_size;
+    double mutation_rate;       /* probabilité de mutation d'un enfant */
+    double crossover_rate;      /* probabilité de croisement (sinon copie du parent) */
+    int tournament_size;
+    int elite_size;             /* meilleurs individus recopiés, 0 : population_size / 10 */
+    int stagnation_limit;       /* générations sans amélioration avant l'arrêt */
+    double local_search_rate;   /* probabilité de recherche locale sur un enfant (local_search.h) */
+    Crossover crossover;
+    double restart_diversity;   /* relance à mi-stagnation sous cette diversité (diversity.h), 0 : jamais */
+} GAParams;
 
 typedef struct {
     Solution solution;
     unsigned long long fitness;
+    unsigned long long hash;    /* solution_hash, pour la détection des clones */
 } Individual;
 
+#define TRACE_CAPACITY 256
+
+/* Statistiques d'une exécution. La trace de convergence note l'instant et la
+ * fitness de chaque amélioration du meilleur individu (population initiale
+ * comprise) ; au-delà de TRACE_CAPACITY points, elle est sous-échantillonnée
+ * de moitié en gardant le premier et le dernier point. */
 typedef struct {
-    Individual members[POPULATION_SIZE];
+    int generations;
+    double init_time;   /* construction de la population initiale (s) */
+    double elapsed;     /* durée totale (s) */
+    int restarts;       /* relances de la population (diversité trop faible) */
+    int clones;         /* enfants identiques à un individu déjà présent, mutés ou remplacés */
+    double diversity;   /* diversité de la dernière génération */
+    double cache_hit_rate;  /* part des évaluations de routes servies par le mémo (route_cache.h) */
+    int trace_length;
+    double trace_time[TRACE_CAPACITY];
+    unsigned long long trace_fitness[TRACE_CAPACITY];
+} SolverStats;
+
+/* Population en double tampon : la génération suivante est construite dans
+ * offspring puis les deux tableaux sont échangés. Les individus ne sont jamais
+ * déplacés, seul le tableau d'indices order est trié. Les empreintes des
+ * individus de la génération en construction sont rangées dans seen (adressage
+ * ouvert, 0 pour une case libre) pour en écarter les clones. */
+typedef struct {
+    Individual* members;    /* génération courante */
+    Individual* offspring;  /* tampon de la génération suivante */
+    int* order;             /* indices des membres par fitness croissante */
+    int size;
     int generation;
     Individual best_ever;
     int stagnation_count;
+    unsigned long long* seen;
+    int seen_mask;          /* nombre de cases de seen - 1 (puissance de deux) */
+    double diversity;       /* population_diversity de la génération courante */
+    int restarts;
+    int clones;
 } Population;
 
+/* Paramètres courants ; set_ga_params retourne 0 (sans rien changer) s'ils sont incohérents */
+void default_ga_params(GAParams* params);
+int check_ga_params(const GAParams* params);
+int set_ga_params(const GAParams* params);
+const GAParams* ga_params(void);
+
 /* Fonctions principales */
+Population* create_population(void);
+void free_population(Population* pop);
 void init_population(Board time_board, Board dist_board, Population* pop);
+void sort_population(Population* pop);
 void evolve_population(Board time_board, Board dist_board, Population* pop);
-void solve_vrp(Board time_board, Board dist_board, Solution* best_solution);
+void solve_vrp(Board time_board, Board dist_board, Solution* best_solution, unsigned int seed, SolverStats* stats);
 
 /* Fonctions utilitaires */
 unsigned long long calculate_fitness(Board time_board, Board dist_board, Solution* solution);
+unsigned long long solution_fitness(Solution* solution);
 void print_solution(Solution* solution);
 int route_duration(Board board, Route* route);
 int route_distance(Board board, Route* route);
 void repair_solution(Board time_board, Board dist_board, Solution* sol);
-void remove_route_crossings(Board dist_board, Solution* sol);
+void remove_route_crossings(Board time_board, Board dist_board, Solution* sol);
+int remove_crossings_in_route(Board time_board, Board dist_board, Solution* sol, int r);
+
+/* Modifications élémentaires avec mise à jour incrémentale des coûts */
+void insert_city(Board time_board, Board dist_board, Solution* sol, int r, int pos, int city);
+int remove_city(Board time_board, Board dist_board, Solution* sol, int r, int pos);
+int best_insertion(Board time_board, Board dist_board, Solution* sol, int city, int skip_route, int* best_route, int* best_pos);
+double wall_clock(void);
+
+void init_solution(Solution* solution);
+void copy_individual(Individual* dst, const Individual* src);
 
 /* Opérateurs génétiques */
-Individual tournament_selection(Population* pop);
+int tournament_selection(Population* pop);
 void crossover(Board time_board, Board dist_board, Individual* parent1, Individual* parent2, Individual* child);
 void mutate(Board time_board, Board dist_board, Individual* indiv);
 
-/* Construction initiale */
-void build_initial_solution(Board time_board, Board dist_board, Solution* sol);
-void nearest_neighbor_route(Board time_board, Board dist_board, Solution* sol, int* visited);
+/* Construction initiale (les autres heuristiques sont dans construction.h) */
+void build_initial_solution(Board time_board, Board dist_board, Solution* sol, int choices);
+void nearest_neighbor_route(Board time_board, Board dist_board, Solution* sol, int* visited, int choices);
+void finish_solution(Board time_board, Board dist_board, Solution* sol);
 
 /* Fonctions de comparaison */
 int compare_individuals(const void* a, const void* b);
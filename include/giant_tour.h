@@ -0,0 +1,32 @@
+#ifndef GIANT_TOUR_H
+#define GIANT_TOUR_H
+
+#include "location.h"
+
+/* Codage en tour géant : une permutation de toutes les villes (dépôt exclu),
+ * découpée en routes par Split. Une solution découpée garde l'ordre du tour :
+ * la concaténation de ses routes redonne le chromosome, les opérateurs sur les
+ * routes (mutations, recherche locale) restent donc utilisables tels quels. */
+
+/* Concaténation des routes de sol dans tour (NUM_CITIES - 1 places),
+ * retourne le nombre de villes écrites */
+int solution_tour(const Solution* sol, int* tour);
+
+/* Découpage optimal de tour (NUM_CITIES - 1 villes) en routes consécutives
+ * pour le coût de la fitness : distance et véhicules, sans dépasser MAX_TIME
+ * (une route d'une seule ville est toujours acceptée, avec sa pénalité).
+ * Programme dynamique sur le graphe auxiliaire : une route ne dépassant pas
+ * MAX_TIME / SERVICE_TIME villes, le coût est linéaire en nombre de villes.
+ * sol est remplacée, ses coûts sont calculés. */
+void split_tour(Board time_board, Board dist_board, const int* tour, Solution* sol);
+
+/* Croisements de permutations : l'enfant reçoit le segment [start, end] de
+ * parent1 à la même place, les autres villes dans l'ordre de parent2 (OX)
+ * ou à leur place dans parent2 à travers la correspondance du segment (PMX).
+ * L'enfant est toujours une permutation complète. */
+void order_crossover(const int* parent1, const int* parent2, int* child, int start, int end);
+void pmx_crossover(const int* parent1, const int* parent2, int* child, int start, int end);
+
+void free_giant_tour(void);
+
+#endif
@@ -1,11 +1,21 @@
 #ifndef INOUT_H
 #define INOUT_H
 
+#include <stddef.h>
 #include "location.h"
 
-#define MAX_LINE_LENGTH 10000
-
-int fread_board(const char* file, Board board);
+Board fread_board(const char* file, int* size);
 void write_solution(const char* filename, Solution* solution);
 
+/* Lecture des colonnes latitude et longitude des n premières lignes d'un CSV
+ * à en-tête (Python/output/coord.csv), une ligne par ville dans l'ordre des
+ * indices. Retourne 0 en cas d'erreur. */
+int read_coordinates(const char* file, int n, double* latitude, double* longitude);
+
+/* Échanges entre processus (tubes) */
+int write_all(int fd, const void* buf, size_t size);
+int read_all(int fd, void* buf, size_t size);
+int send_solution(int fd, Solution* solution);
+int recv_solution(int fd, Solution* solution);
+
 #endif
\ No newline at end of file
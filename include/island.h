@@ -0,0 +1,28 @@
+#ifndef ISLAND_H
+#define ISLAND_H
+
+#include "location.h"
+#include "genetic.h"
+
+typedef enum {
+    TOPOLOGY_RING,   /* chaque île reçoit les migrants de sa voisine */
+    TOPOLOGY_FULL    /* chaque île reçoit les meilleurs migrants de toutes les autres */
+} Topology;
+
+typedef struct {
+    int islands;             /* nombre de populations (un processus chacune) */
+    int migration_interval;  /* générations entre deux migrations */
+    int migrants;            /* individus envoyés par île à chaque migration */
+    Topology topology;
+} IslandConfig;
+
+/* Modèle en îles : les populations évoluent en parallèle et échangent leurs
+ * meilleurs individus toutes les migration_interval générations.
+ * best doit être initialisé (solution_new) par l'appelant.
+ * Retourne l'île ayant produit la meilleure solution, ou -1 en cas d'erreur. */
+int island_solve(Board time_board, Board dist_board, const IslandConfig* config,
+                 unsigned int seed, Individual* best);
+
+int parse_topology(const char* name, Topology* topology);
+
+#endif
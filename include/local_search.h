@@ -0,0 +1,25 @@
+#ifndef LOCAL_SEARCH_H
+#define LOCAL_SEARCH_H
+
+#include "location.h"
+
+#define OR_OPT_MAX_LENGTH 3   /* segments de 1 (relocate) à 3 villes déplacés d'un bloc */
+
+/* Recherche locale par premières améliorations sur le coût de la fitness
+ * (distance, véhicules et pénalités de durée), autour des villes voisines
+ * (listes de candidates.h) :
+ *   relocate / Or-opt  segment de 1 à OR_OPT_MAX_LENGTH villes inséré à côté d'une voisine
+ *   swap               échange d'une ville avec la suivante d'une voisine
+ *   2-opt              inversion d'un segment d'une route, créant l'arc vers une voisine
+ *   2-opt*             échange des fins de deux routes, créant l'arc vers une voisine
+ * Chaque mouvement est évalué en O(1) grâce aux cumuls de distance et de temps
+ * dans les deux sens de parcours (les matrices ne sont pas symétriques).
+ * Une ville dont aucun mouvement n'améliore la solution est ignorée (bit
+ * « don't look ») jusqu'à ce qu'un mouvement modifie son voisinage.
+ * La solution doit couvrir toutes les villes ; ses coûts sont tenus à jour et
+ * les routes vidées sont supprimées. Retourne le nombre de mouvements appliqués. */
+int local_search(Board time_board, Board dist_board, Solution* sol);
+
+void free_local_search(void);
+
+#endif
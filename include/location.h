@@ -1,32 +1,49 @@
 #ifndef LOCATION_H
 #define LOCATION_H
 
-#define MAX_CITIES 200
-#define MAX_VEHICLES 20
-#define MAX_ROUTE_LENGTH 50
 #define MAX_TIME 10800  /* 3 heures en secondes */
 #define DEPOT 0
 #define PENALTY_PER_VIOLATION 10000000
 
 extern int NUM_CITIES;
 
-typedef int Board[MAX_CITIES][MAX_CITIES];
+/* Matrice NUM_CITIES x NUM_CITIES stockée d'un seul bloc contigu :
+ * board[i][j] passe par un tableau de pointeurs de lignes, board[0] est
+ * le début des données. */
+typedef int** Board;
 
+/* Les routes et leurs chemins sont alloués à la demande : la mémoire d'une
+ * solution suit le nombre réel d'arrêts. Une solution remplie de zéros est
+ * une solution vide valide. */
 typedef struct {
-    int path[MAX_ROUTE_LENGTH];
+    int* path;
     int length;
+    int capacity;   /* Places allouées dans path */
     int duration;   /* Temps total en secondes */
     int distance;   /* Distance totale en mètres */
 } Route;
 
 typedef struct {
-    Route routes[MAX_VEHICLES];
+    Route* routes;
     int num_vehicles;
+    int capacity;         /* Routes allouées dans routes */
     int total_duration;   /* Temps total en secondes */
     int total_distance;   /* Distance totale en mètres */
+    unsigned long long coverage_penalty;  /* Pénalité des villes manquantes ou en double */
 } Solution;
 
-void initBoard(Board board);
+Board board_new(int n);
+Board board_wrap(int* data, int n);
+void board_free(Board board);
+void board_release(Board board);
 void display_board(Board board);
 
+/* Gestion mémoire des solutions */
+void solution_new(Solution* solution);
+void solution_free(Solution* solution);
+void solution_copy(Solution* dst, const Solution* src);
+void route_reserve(Route* route, int capacity);
+int solution_add_route(Solution* solution);
+void solution_drop_route(Solution* solution, int r);
+
 #endif
\ No newline at end of file
@@ -0,0 +1,29 @@
+#ifndef MULTISTART_H
+#define MULTISTART_H
+
+#include "location.h"
+#include "genetic.h"
+
+typedef struct {
+    unsigned int seed;
+    unsigned long long fitness;
+    Solution solution;
+    SolverStats stats;
+} RunResult;
+
+/* Les solutions de results sont allouées par multistart_solve et libérées
+ * par free_run_results (qui libère aussi le tableau). */
+
+/* Lance runs exécutions indépendantes de solve_vrp, au plus jobs en parallèle
+ * (un processus par exécution), avec les graines base_seed, base_seed+1, ...
+ * Avec un budget de temps (set_deadline), le temps restant est réparti entre
+ * les vagues d'exécutions successives.
+ * Remplit results[runs] et retourne l'indice de la meilleure exécution, ou -1. */
+int multistart_solve(Board time_board, Board dist_board, int runs, int jobs,
+                     unsigned int base_seed, RunResult* results);
+
+void free_run_results(RunResult* results, int runs);
+void print_run_summary(RunResult* results, int runs, int best);
+int available_cores(void);
+
+#endif
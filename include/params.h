@@ -0,0 +1,24 @@
+#ifndef PARAMS_H
+#define PARAMS_H
+
+#include "genetic.h"
+
+/* Lecture des paramètres de l'algorithme génétique (voir GAParams).
+ * Noms reconnus : population_size, mutation_rate, crossover_rate,
+ * tournament_size, elite_size, stagnation_limit, local_search_rate,
+ * crossover (routes, ox ou pmx) et restart_diversity.
+ * Les fonctions modifient params champ par champ et retournent 0 au premier
+ * nom inconnu ou à la première valeur illisible ; la cohérence de l'ensemble
+ * est vérifiée ensuite par check_ga_params. */
+
+/* Un paramètre, valeur sous forme de texte */
+int parse_ga_param(GAParams* params, const char* name, const char* value);
+
+/* Liste "population_size=300,mutation_rate=0.3" (option -p) */
+int parse_ga_params(GAParams* params, const char* spec);
+
+/* Objet JSON plat : {"population_size": 300, "mutation_rate": 0.3, "crossover": "ox"} */
+int parse_ga_params_json(GAParams* params, const char* text);
+int read_ga_params(const char* file, GAParams* params);
+
+#endif
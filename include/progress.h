@@ -0,0 +1,44 @@
+#ifndef PROGRESS_H
+#define PROGRESS_H
+
+#include "genetic.h"
+
+#define PROGRESS_INTERVAL 0.25  /* secondes entre deux lignes de progression */
+
+/* Suivi et contrôle d'une résolution en cours : flux de progression et
+ * conditions d'arrêt autres que MAX_GENERATIONS et la stagnation. */
+
+/* Flux de progression : une ligne JSON par point, écrite d'un seul appel
+ * write() pour que les processus parallèles ne mélangent pas leurs lignes :
+ *   {"seed":7,"generation":100,"fitness":11830316,"vehicles":7,"distance":665158,
+ *    "duration":52840,"gen_per_s":84.6,"elapsed":1.31,"final":false}
+ * Descripteur -1 : pas de flux. */
+void set_progress_fd(int fd);
+int progress_enabled(void);
+void report_progress(unsigned int seed, int generation, const Individual* best,
+                     double gen_per_s, double elapsed, int final);
+
+/* Demande d'arrêt : le solveur s'arrête avec sa meilleure solution dès que
+ * stop_fd devient lisible (un octet écrit ou l'autre extrémité fermée).
+ * L'octet n'est jamais lu, tous les processus fils voient donc la demande.
+ * Descripteur -1 : pas de demande possible. */
+void set_stop_fd(int fd);
+int stop_requested(void);
+
+/* SIGINT et SIGTERM deviennent une demande d'arrêt (via un tube interne qui
+ * remplace stop_fd, vu aussi par les processus fils) : la résolution se termine
+ * avec sa meilleure solution. Un second signal interrompt immédiatement.
+ * Retourne 0 en cas d'échec. */
+int catch_interrupts(void);
+int interrupted(void);
+
+/* Budget de temps : arrêt dès que wall_clock() atteint deadline (0 : aucun). */
+void set_deadline(double deadline);
+double current_deadline(void);
+int time_is_up(void);
+
+/* Fitness cible : arrêt dès qu'une solution au moins aussi bonne est trouvée (0 : aucune). */
+void set_target_fitness(unsigned long long target);
+int target_reached(unsigned long long fitness);
+
+#endif
@@ -0,0 +1,25 @@
+#ifndef ROUTE_CACHE_H
+#define ROUTE_CACHE_H
+
+#include "location.h"
+
+#define ROUTE_CACHE_SIZE 65536  /* entrées de la table (puissance de deux) */
+
+/* Mémo des coûts de routes partagé par tous les individus : une route héritée
+ * telle quelle (élitisme, croisements, Split) n'est évaluée qu'une fois.
+ * Table à correspondance directe indexée par l'empreinte de la séquence des
+ * villes : une nouvelle route remplace celle qui occupait sa case. La
+ * faisabilité se lit sur la durée (MAX_TIME), elle n'est pas stockée.
+ * La table suit l'instance courante : free_route_cache à chaque changement. */
+
+/* Calcul de duration et distance de route, depuis le mémo si possible */
+void evaluate_route(Board time_board, Board dist_board, Route* route);
+
+/* Part des évaluations servies par le mémo depuis le dernier reset_route_cache_stats
+ * (0 sans évaluation) */
+void reset_route_cache_stats(void);
+double route_cache_hit_rate(void);
+
+void free_route_cache(void);
+
+#endif
@@ -0,0 +1,61 @@
+#ifndef SOLVER_H
+#define SOLVER_H
+
+/* Nombre de voisines candidates par ville pour les insertions des résolutions
+ * suivantes (0 : recherche complète, négatif : choix automatique selon la taille). */
+void vrp_set_neighbors(int k);
+
+/* Mélange des heuristiques de construction, au format "nn:2,savings:1,sweep:1"
+ * (NULL : mélange par défaut). Retourne 0 si la description est invalide. */
+int vrp_set_construction(const char* mix);
+
+/* Coordonnées des villes (degrés) pour la construction par balayage,
+ * copiées ; NULL pour les oublier. */
+void vrp_set_coordinates(const double* latitude, const double* longitude, int num_cities);
+
+/* Descripteurs du flux de progression (lignes JSON, voir progress.h) et de
+ * demande d'arrêt pour les résolutions suivantes ; -1 pour les désactiver. */
+void vrp_set_control(int progress_fd, int stop_fd);
+
+/* Paramètres de l'algorithme génétique en objet JSON plat (voir params.h),
+ * les paramètres absents gardant leur valeur par défaut (NULL : tous).
+ * Retourne 0 si la description est invalide ou incohérente (paramètres inchangés). */
+int vrp_set_params(const char* json);
+
+/* Conditions d'arrêt des résolutions suivantes : budget de temps en secondes
+ * compté à partir de l'appel, fitness cible (0 : aucune limite). Une fois la
+ * limite atteinte, la meilleure solution trouvée est retournée. */
+void vrp_set_limits(double seconds, unsigned long long target_fitness);
+
+/* Point d'entrée de la bibliothèque partagée (libvrp.so).
+ * Les matrices sont des tableaux int32 contigus de num_cities x num_cities.
+ * runs exécutions sont lancées (jobs en parallèle) avec les graines seed, seed+1, ...
+ * Les routes de la meilleure sont écrites bout à bout dans routes, leurs longueurs
+ * dans route_lengths, sa graine dans best_seed.
+ * Retourne le nombre de véhicules, ou -1 en cas d'erreur. */
+int vrp_solve(const int* time_matrix, const int* dist_matrix, int num_cities,
+              int runs, int jobs, unsigned int seed,
+              int* routes, int routes_capacity,
+              int* route_lengths, int lengths_capacity,
+              unsigned long long* fitness, unsigned int* best_seed);
+
+/* Variante en modèle d'îles (topology : 0 = anneau, 1 = complète).
+ * best_seed reçoit la graine de l'île ayant produit la meilleure solution. */
+int vrp_solve_islands(const int* time_matrix, const int* dist_matrix, int num_cities,
+                      int islands, int migration_interval, int migrants, int topology,
+                      unsigned int seed,
+                      int* routes, int routes_capacity,
+                      int* route_lengths, int lengths_capacity,
+                      unsigned long long* fitness, unsigned int* best_seed);
+
+/* Statistiques de la meilleure exécution du dernier appel à vrp_solve (vides
+ * après vrp_solve_islands) : générations, durées en secondes, relances, clones
+ * rejetés, diversité finale de la population, taux de succès du mémo des
+ * routes et trace de convergence
+ * (instants et fitness des améliorations, au plus capacity points).
+ * Retourne le nombre de points de la trace. */
+int vrp_last_stats(int* generations, double* init_time, double* elapsed,
+                   int* restarts, int* clones, double* diversity, double* cache_hit_rate,
+                   double* trace_time, unsigned long long* trace_fitness, int capacity);
+
+#endif
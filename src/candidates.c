@@ -0,0 +1,82 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "candidates.h"
+#include "location.h"
+
+static int* neighbors = NULL;   /* NUM_CITIES lignes de list_length villes */
+static int list_length = 0;
+static int num_neighbors = 0;   /* préfixe des listes utilisé par les insertions */
+
+void free_candidates(void) {
+    free(neighbors);
+    neighbors = NULL;
+    list_length = 0;
+    num_neighbors = 0;
+}
+
+int candidate_count(void) {
+    return num_neighbors;
+}
+
+int neighbor_count(void) {
+    return list_length;
+}
+
+const int* city_neighbors(int city) {
+    return &neighbors[city * list_length];
+}
+
+/* Vrai si j est plus proche de i que k (distance aller + retour, puis temps) */
+static int closer(Board time_board, Board dist_board, int i, int j, int k) {
+    int dj = dist_board[i][j] + dist_board[j][i];
+    int dk = dist_board[i][k] + dist_board[k][i];
+
+    if (dj != dk) return dj < dk;
+    return time_board[i][j] + time_board[j][i] < time_board[i][k] + time_board[k][i];
+}
+
+void build_candidates(Board time_board, Board dist_board, int k) {
+    int i, j, n, count;
+    int* row;
+
+    free_candidates();
+
+    if (k == AUTO_NEIGHBORS) {
+        k = (NUM_CITIES > DEFAULT_NEIGHBORS * MIN_CITIES_PER_NEIGHBOR) ? DEFAULT_NEIGHBORS : 0;
+    }
+    /* Une ville a au plus NUM_CITIES - 2 voisines hors dépôt */
+    if (k > NUM_CITIES - 2) k = NUM_CITIES - 2;
+    if (k < 0) k = 0;
+    num_neighbors = k;
+
+    /* La recherche locale a toujours besoin de listes, même sans insertions granulaires */
+    if (k < LOCAL_SEARCH_NEIGHBORS) k = LOCAL_SEARCH_NEIGHBORS;
+    if (k > NUM_CITIES - 2) k = NUM_CITIES - 2;
+    if (k <= 0) return;
+
+    neighbors = malloc((size_t)NUM_CITIES * k * sizeof(int));
+    if (neighbors == NULL) {
+        fprintf(stderr, "Erreur d'allocation des listes de candidats\n");
+        exit(EXIT_FAILURE);
+    }
+    list_length = k;
+
+    /* Insertion bornée dans une liste triée de k villes : O(NUM_CITIES) par ligne
+     * tant que la liste est pleine et que la ville examinée est plus lointaine */
+    for (i = 0; i < NUM_CITIES; i++) {
+        row = &neighbors[i * k];
+        count = 0;
+
+        for (j = 0; j < NUM_CITIES; j++) {
+            if (j == i || j == DEPOT) continue;
+            if (count == k && !closer(time_board, dist_board, i, j, row[k-1])) continue;
+
+            n = (count < k) ? count++ : k - 1;
+            while (n > 0 && closer(time_board, dist_board, i, j, row[n-1])) {
+                row[n] = row[n-1];
+                n--;
+            }
+            row[n] = j;
+        }
+    }
+}
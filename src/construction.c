@@ -0,0 +1,310 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include "construction.h"
+#include "candidates.h"
+#include "genetic.h"
+#include "location.h"
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+static const char* builder_names[NUM_BUILDERS] = { "nn", "savings", "sweep" };
+static int mix[NUM_BUILDERS] = { 2, 1, 1 };
+
+static double* latitudes = NULL;
+static double* longitudes = NULL;
+static int num_coordinates = 0;
+
+int set_construction_mix(const char* spec) {
+    int weights[NUM_BUILDERS];
+    const char* p = spec;
+    const char* colon;
+    char* end;
+    int b, total = 0;
+
+    for (b = 0; b < NUM_BUILDERS; b++) {
+        weights[b] = 0;
+    }
+
+    while (*p != '\0') {
+        colon = strchr(p, ':');
+        if (colon == NULL) return 0;
+
+        for (b = 0; b < NUM_BUILDERS; b++) {
+            if (strlen(builder_names[b]) == (size_t)(colon - p)
+                && strncmp(p, builder_names[b], colon - p) == 0) break;
+        }
+        if (b == NUM_BUILDERS) return 0;
+
+        weights[b] = (int)strtol(colon + 1, &end, 10);
+        if (end == colon + 1 || weights[b] < 0 || (*end != ',' && *end != '\0')) return 0;
+        total += weights[b];
+        p = (*end == ',') ? end + 1 : end;
+    }
+    if (total == 0) return 0;
+
+    for (b = 0; b < NUM_BUILDERS; b++) {
+        mix[b] = weights[b];
+    }
+    return 1;
+}
+
+void set_coordinates(const double* latitude, const double* longitude, int n) {
+    free(latitudes);
+    free(longitudes);
+    latitudes = NULL;
+    longitudes = NULL;
+    num_coordinates = 0;
+
+    if (latitude == NULL || longitude == NULL || n <= 0) return;
+
+    latitudes = malloc(n * sizeof(double));
+    longitudes = malloc(n * sizeof(double));
+    if (latitudes == NULL || longitudes == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    memcpy(latitudes, latitude, n * sizeof(double));
+    memcpy(longitudes, longitude, n * sizeof(double));
+    num_coordinates = n;
+}
+
+int has_coordinates(void) {
+    return num_coordinates > 0 && num_coordinates == NUM_CITIES;
+}
+
+Builder slot_builder(int slot, int size, int* randomized) {
+    int weights[NUM_BUILDERS];
+    int b, total = 0, cumulated = 0, first;
+
+    for (b = 0; b < NUM_BUILDERS; b++) {
+        weights[b] = (b == BUILD_SWEEP && !has_coordinates()) ? 0 : mix[b];
+        total += weights[b];
+    }
+    /* Sans coordonnées, un mélange réduit au balayage retombe sur le plus proche voisin */
+    if (total == 0) {
+        weights[BUILD_NEAREST] = total = 1;
+    }
+
+    /* Les cases sont réparties en blocs consécutifs proportionnels aux poids */
+    for (b = 0; b < NUM_BUILDERS; b++) {
+        if (weights[b] == 0) continue;
+        first = (int)((long)size * cumulated / total);
+        cumulated += weights[b];
+        if (slot < (int)((long)size * cumulated / total) || cumulated == total) {
+            *randomized = (slot != first);
+            return (Builder)b;
+        }
+    }
+    *randomized = 1;
+    return BUILD_NEAREST;
+}
+
+/* Ajout d'une route formée des villes cities[0..length-1] */
+static void append_route(Solution* sol, const int* cities, int length) {
+    int r = solution_add_route(sol);
+    Route* route = &sol->routes[r];
+
+    route_reserve(route, length);
+    memcpy(route->path, cities, length * sizeof(int));
+    route->length = length;
+}
+
+typedef struct {
+    int from;       /* dernière ville d'une route */
+    int to;         /* première ville de la route suivante */
+    int distance;   /* gain en distance de la fusion */
+    double key;     /* gain éventuellement perturbé, ordre de traitement */
+} Saving;
+
+static int compare_savings(const void* a, const void* b) {
+    const Saving* sa = (const Saving*)a;
+    const Saving* sb = (const Saving*)b;
+    if (sa->key > sb->key) return -1;
+    if (sa->key < sb->key) return 1;
+    return 0;
+}
+
+static void add_saving(Board dist_board, Saving* savings, int* count, int i, int j, int randomized) {
+    Saving* s = &savings[(*count)++];
+
+    s->from = i;
+    s->to = j;
+    s->distance = dist_board[i][DEPOT] + dist_board[DEPOT][j] - dist_board[i][j];
+    s->key = s->distance;
+    if (randomized) {
+        s->key *= 1.0 + SAVINGS_NOISE * (2.0 * rand() / RAND_MAX - 1.0);
+    }
+}
+
+/* Fusion des routes aller-retour par gains décroissants. Les matrices n'étant pas
+ * symétriques, une fusion relie toujours la fin d'une route au début d'une autre.
+ * Avec des listes de candidats, seules les paires de voisines sont examinées. */
+static void build_savings(Board time_board, Board dist_board, Solution* sol, int randomized) {
+    int n = NUM_CITIES;
+    int k = candidate_count();
+    long max_savings = (k > 0) ? (long)n * k : (long)n * n;
+    Saving* savings = malloc(max_savings * sizeof(Saving));
+    int* next = malloc(n * sizeof(int));
+    int* route_of = malloc(n * sizeof(int));
+    int* first = malloc(n * sizeof(int));
+    int* last = malloc(n * sizeof(int));
+    int* duration = malloc(n * sizeof(int));
+    int* path = malloc(n * sizeof(int));
+    int count = 0;
+    int i, j, c, a, b, length, merged;
+    long s;
+
+    if (savings == NULL || next == NULL || route_of == NULL || first == NULL
+        || last == NULL || duration == NULL || path == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+
+    /* Une route aller-retour par ville */
+    for (c = 1; c < n; c++) {
+        next[c] = DEPOT;
+        route_of[c] = first[c] = last[c] = c;
+        duration[c] = time_board[DEPOT][c] + SERVICE_TIME + time_board[c][DEPOT];
+    }
+
+    for (i = 1; i < n; i++) {
+        if (k > 0) {
+            for (j = 0; j < k; j++) {
+                add_saving(dist_board, savings, &count, i, city_neighbors(i)[j], randomized);
+            }
+        } else {
+            for (j = 1; j < n; j++) {
+                if (j != i) add_saving(dist_board, savings, &count, i, j, randomized);
+            }
+        }
+    }
+    qsort(savings, count, sizeof(Saving), compare_savings);
+
+    for (s = 0; s < count; s++) {
+        i = savings[s].from;
+        j = savings[s].to;
+        a = route_of[i];
+        b = route_of[j];
+        if (a == b || last[a] != i || first[b] != j) continue;
+
+        /* Une fusion économise un véhicule : rentable tant que le détour ne le dépasse pas */
+        if (2L * savings[s].distance + VEHICLE_COST <= 0) continue;
+
+        merged = duration[a] + duration[b] - time_board[i][DEPOT] - time_board[DEPOT][j] + time_board[i][j];
+        if (merged > MAX_TIME) continue;
+
+        next[i] = j;
+        for (c = j; c != DEPOT; c = next[c]) {
+            route_of[c] = a;
+        }
+        last[a] = last[b];
+        duration[a] = merged;
+    }
+
+    init_solution(sol);
+    for (c = 1; c < n; c++) {
+        if (first[route_of[c]] != c) continue;
+        length = 0;
+        for (j = c; j != DEPOT; j = next[j]) {
+            path[length++] = j;
+        }
+        append_route(sol, path, length);
+    }
+
+    free(savings);
+    free(next);
+    free(route_of);
+    free(first);
+    free(last);
+    free(duration);
+    free(path);
+}
+
+/* Angles des villes en cours de tri (qsort n'a pas de paramètre de contexte) */
+static const double* sweep_angles;
+
+static int compare_angles(const void* a, const void* b) {
+    double angle_a = sweep_angles[*(const int*)a];
+    double angle_b = sweep_angles[*(const int*)b];
+    if (angle_a < angle_b) return -1;
+    if (angle_a > angle_b) return 1;
+    return *(const int*)a - *(const int*)b;
+}
+
+/* Villes rangées par angle autour du dépôt, puis découpées en routes consécutives
+ * tant que MAX_TIME est respecté. Version randomisée : angle de départ et sens tirés. */
+static void build_sweep(Board time_board, Board dist_board, Solution* sol, int randomized) {
+    int n = NUM_CITIES;
+    double* angles = malloc(n * sizeof(double));
+    int* order = malloc(n * sizeof(int));
+    int* path = malloc(n * sizeof(int));
+    double scale = cos(latitudes[DEPOT] * M_PI / 180.0);
+    int start = 0, step = 1;
+    int i, c, length = 0, duration = 0, extended;
+
+    if (angles == NULL || order == NULL || path == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+
+    for (c = 0; c < n; c++) {
+        angles[c] = atan2(latitudes[c] - latitudes[DEPOT], (longitudes[c] - longitudes[DEPOT]) * scale);
+    }
+    for (c = 1; c < n; c++) {
+        order[c-1] = c;
+    }
+    sweep_angles = angles;
+    qsort(order, n - 1, sizeof(int), compare_angles);
+
+    if (randomized && n > 1) {
+        start = rand() % (n - 1);
+        step = (rand() % 2) ? 1 : -1;
+    }
+
+    init_solution(sol);
+    for (i = 0; i < n - 1; i++) {
+        c = order[(start + step * i + (n - 1)) % (n - 1)];
+
+        if (length == 0) {
+            extended = time_board[DEPOT][c] + SERVICE_TIME + time_board[c][DEPOT];
+        } else {
+            extended = duration - time_board[path[length-1]][DEPOT]
+                     + time_board[path[length-1]][c] + SERVICE_TIME + time_board[c][DEPOT];
+        }
+
+        if (length > 0 && extended > MAX_TIME) {
+            append_route(sol, path, length);
+            length = 0;
+            extended = time_board[DEPOT][c] + SERVICE_TIME + time_board[c][DEPOT];
+        }
+        path[length++] = c;
+        duration = extended;
+    }
+    if (length > 0) append_route(sol, path, length);
+
+    free(angles);
+    free(order);
+    free(path);
+}
+
+void build_solution(Board time_board, Board dist_board, Solution* sol, Builder builder, int randomized) {
+    switch (builder) {
+        case BUILD_SAVINGS:
+            build_savings(time_board, dist_board, sol, randomized);
+            break;
+        case BUILD_SWEEP:
+            if (has_coordinates()) {
+                build_sweep(time_board, dist_board, sol, randomized);
+                break;
+            }
+            /* Sans coordonnées : plus proche voisin */
+        default:
+            build_initial_solution(time_board, dist_board, sol, randomized ? RANDOM_NN_CHOICES : 1);
+            return;
+    }
+    finish_solution(time_board, dist_board, sol);
+}
@@ -0,0 +1,147 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "diversity.h"
+
+/* Nombre d'individus possédant chaque arête, en adressage ouvert : clé
+ * (min(a,b), max(a,b)) compactée et décalée de 1 (0 pour une case libre).
+ * La table grandit avec le nombre d'arêtes distinctes, pas avec NUM_CITIES². */
+static unsigned long* edge_keys = NULL;
+static int* edge_counts = NULL;
+static size_t capacity = 0;   /* puissance de deux */
+static size_t distinct = 0;
+
+void free_diversity(void) {
+    free(edge_keys);
+    free(edge_counts);
+    edge_keys = NULL;
+    edge_counts = NULL;
+    capacity = distinct = 0;
+}
+
+/* Mélange de bits (finaliseur de splitmix64) */
+static unsigned long long mix(unsigned long long x) {
+    x ^= x >> 30;
+    x *= 0xBF58476D1CE4E5B9ULL;
+    x ^= x >> 27;
+    x *= 0x94D049BB133111EBULL;
+    x ^= x >> 31;
+    return x;
+}
+
+static unsigned long long edge_hash(int from, int to) {
+    return mix((unsigned long long)from * NUM_CITIES + to + 1);
+}
+
+unsigned long long solution_hash(const Solution* sol) {
+    unsigned long long hash = mix((unsigned long long)sol->num_vehicles);
+    const Route* route;
+    int r, i, prev;
+
+    for (r = 0; r < sol->num_vehicles; r++) {
+        route = &sol->routes[r];
+        if (route->length == 0) continue;
+
+        prev = DEPOT;
+        for (i = 0; i < route->length; i++) {
+            hash += edge_hash(prev, route->path[i]);
+            prev = route->path[i];
+        }
+        hash += edge_hash(prev, DEPOT);
+    }
+    return (hash != 0) ? hash : 1;
+}
+
+static void allocate(size_t size) {
+    edge_keys = calloc(size, sizeof(unsigned long));
+    edge_counts = malloc(size * sizeof(int));
+    if (edge_keys == NULL || edge_counts == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    capacity = size;
+}
+
+static size_t find_slot(unsigned long key) {
+    size_t slot = (size_t)mix(key) & (capacity - 1);
+
+    while (edge_keys[slot] != 0 && edge_keys[slot] != key) {
+        slot = (slot + 1) & (capacity - 1);
+    }
+    return slot;
+}
+
+/* Doublement de la table, dès qu'elle est à moitié pleine */
+static void grow(void) {
+    unsigned long* old_keys = edge_keys;
+    int* old_counts = edge_counts;
+    size_t old_capacity = capacity, i, slot;
+
+    allocate(2 * old_capacity);
+    for (i = 0; i < old_capacity; i++) {
+        if (old_keys[i] == 0) continue;
+        slot = find_slot(old_keys[i]);
+        edge_keys[slot] = old_keys[i];
+        edge_counts[slot] = old_counts[i];
+    }
+    free(old_keys);
+    free(old_counts);
+}
+
+static void count_edge(int a, int b) {
+    unsigned long key = (a < b) ? (unsigned long)a * NUM_CITIES + b + 1
+                                : (unsigned long)b * NUM_CITIES + a + 1;
+    size_t slot = find_slot(key);
+
+    if (edge_keys[slot] == key) {
+        edge_counts[slot]++;
+        return;
+    }
+    edge_keys[slot] = key;
+    edge_counts[slot] = 1;
+    if (++distinct * 2 > capacity) grow();
+}
+
+/* Ajout des arêtes d'une solution (départs et retours au dépôt compris ;
+ * celle d'une route d'une seule ville n'est comptée qu'une fois).
+ * Retourne le nombre d'arêtes. */
+static int count_edges(const Solution* sol) {
+    const Route* route;
+    int r, i, edges = 0;
+
+    for (r = 0; r < sol->num_vehicles; r++) {
+        route = &sol->routes[r];
+        if (route->length == 0) continue;
+
+        count_edge(DEPOT, route->path[0]);
+        for (i = 1; i < route->length; i++) {
+            count_edge(route->path[i-1], route->path[i]);
+        }
+        if (route->length > 1) count_edge(route->path[route->length-1], DEPOT);
+        edges += (route->length > 1) ? route->length + 1 : 1;
+    }
+    return edges;
+}
+
+double population_diversity(const Population* pop) {
+    double shared = 0.0, edges = 0.0;
+    size_t i;
+    int k;
+
+    if (pop->size < 2) return 0.0;
+    if (capacity == 0) allocate(1024);
+    memset(edge_keys, 0, capacity * sizeof(unsigned long));
+    distinct = 0;
+
+    for (k = 0; k < pop->size; k++) {
+        edges += count_edges(&pop->members[k].solution);
+    }
+
+    /* Une arête possédée par c individus est partagée par chacun avec c - 1 autres */
+    for (i = 0; i < capacity; i++) {
+        if (edge_keys[i] != 0) shared += (double)edge_counts[i] * (edge_counts[i] - 1);
+    }
+
+    if (edges == 0.0) return 0.0;
+    return 1.0 - shared / (edges * (pop->size - 1));
+}
@@ -1,3 +1,5 @@
+#define _POSIX_C_SOURCE 199309L
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
@@ -5,8 +7,32 @@
 #include <limits.h>
 #include <math.h>
 #include "genetic.h"
+#include "candidates.h"
+#include "construction.h"
+#include "progress.h"
+#include "local_search.h"
+#include "giant_tour.h"
+#include "diversity.h"
+#include "route_cache.h"
 #include "location.h"
 
+/* Horloge murale en secondes (indépendante du temps CPU des processus) */
+double wall_clock(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+/* Tableau de marquage des villes (une case par ville de l'instance, à zéro) */
+static int* new_visited(void) {
+    int* visited = calloc(NUM_CITIES, sizeof(int));
+    if (visited == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    return visited;
+}
+
 /* Fonction de comparaison pour le tri */
 int compare_individuals(const void* a, const void* b) {
     const Individual* ia = (const Individual*)a;
@@ -46,30 +72,44 @@ int route_distance(Board board, Route* route) {
     return distance;
 }
 
-/* Fonction de fitness améliorée */
+/* Pénalité de dépassement du temps maximal d'une route */
+static unsigned long long route_penalty(Route* route) {
+    if (route->duration > MAX_TIME) {
+        return (unsigned long long)(route->duration - MAX_TIME) * DURATION_PENALTY;
+    }
+    return 0;
+}
+
+/* Fitness à partir des coûts de routes déjà connus, en O(nombre de routes) */
+unsigned long long solution_fitness(Solution* solution) {
+    unsigned long long penalty = solution->coverage_penalty;
+    int i;
+
+    for (i = 0; i < solution->num_vehicles; i++) {
+        penalty += route_penalty(&solution->routes[i]);
+    }
+    /* Calcul en 64 bits : une grande flotte dépasserait la capacité d'un int */
+    return (unsigned long long)solution->total_distance * 2
+        + (unsigned long long)solution->num_vehicles * VEHICLE_COST + penalty;
+}
+
+/* Fonction de fitness améliorée (recalcul complet de toutes les routes, par le mémo route_cache.h) */
 unsigned long long calculate_fitness(Board time_board, Board dist_board, Solution* solution) {
-    unsigned long long fitness = 0;
     unsigned long long penalty = 0;
     int i, j;
-    int visited[MAX_CITIES];
+    int* visited = new_visited();
 
     solution->total_duration = 0;
     solution->total_distance = 0;
-    memset(visited, 0, sizeof(visited));
     visited[DEPOT] = 1;
 
-    /* Calcul des métriques et pénalités de temps */
+    /* Calcul des métriques */
     for (i = 0; i < solution->num_vehicles; i++) {
         Route* route = &solution->routes[i];
-        route->duration = route_duration(time_board, route);
-        route->distance = route_distance(dist_board, route);
+        evaluate_route(time_board, dist_board, route);
         solution->total_duration += route->duration;
         solution->total_distance += route->distance;
 
-        if (route->duration > MAX_TIME) {
-            penalty += (route->duration - MAX_TIME) * 10000;
-        }
-
         for (j = 0; j < route->length; j++) {
             int city = route->path[j];
             if (visited[city] > 0) {
@@ -82,72 +122,332 @@ unsigned long long calculate_fitness(Board time_board, Board dist_board, Solutio
     for (i = 0; i < NUM_CITIES; i++) {
         if (!visited[i]) penalty += PENALTY_PER_VIOLATION;
     }
+    free(visited);
 
-    fitness = solution->total_distance * 2 + solution->num_vehicles * 1500000 + penalty;
-    return fitness;
+    solution->coverage_penalty = penalty;
+    return solution_fitness(solution);
 }
 
-/* Initialisation d'une solution */
-void init_solution(Solution* solution) {
+/* Report d'une variation de coût sur une route et sur les totaux de la solution */
+static void apply_route_delta(Solution* sol, Route* route, int d_duration, int d_distance) {
+    route->duration += d_duration;
+    route->distance += d_distance;
+    sol->total_duration += d_duration;
+    sol->total_distance += d_distance;
+}
+
+/* Voisins d'une position (le dépôt aux extrémités) */
+static int prev_city(Route* route, int pos) {
+    return (pos == 0) ? DEPOT : route->path[pos-1];
+}
+
+static int next_city(Route* route, int pos) {
+    return (pos >= route->length - 1) ? DEPOT : route->path[pos+1];
+}
+
+/* Insertion d'une ville en position pos, coût mis à jour en O(1) */
+void insert_city(Board time_board, Board dist_board, Solution* sol, int r, int pos, int city) {
+    Route* route = &sol->routes[r];
+    int prev = (pos == 0) ? DEPOT : route->path[pos-1];
+    int next = (pos == route->length) ? DEPOT : route->path[pos];
+    int i;
+
+    route_reserve(route, route->length + 1);
+    apply_route_delta(sol, route,
+        time_board[prev][city] + time_board[city][next] - time_board[prev][next] + SERVICE_TIME,
+        dist_board[prev][city] + dist_board[city][next] - dist_board[prev][next]);
+
+    for (i = route->length; i > pos; i--) {
+        route->path[i] = route->path[i-1];
+    }
+    route->path[pos] = city;
+    route->length++;
+}
+
+/* Retrait de la ville en position pos, coût mis à jour en O(1) */
+int remove_city(Board time_board, Board dist_board, Solution* sol, int r, int pos) {
+    Route* route = &sol->routes[r];
+    int city = route->path[pos];
+    int prev = prev_city(route, pos);
+    int next = next_city(route, pos);
+    int i;
+
+    apply_route_delta(sol, route,
+        time_board[prev][next] - time_board[prev][city] - time_board[city][next] - SERVICE_TIME,
+        dist_board[prev][next] - dist_board[prev][city] - dist_board[city][next]);
+
+    for (i = pos; i < route->length - 1; i++) {
+        route->path[i] = route->path[i+1];
+    }
+    route->length--;
+    return city;
+}
+
+/* Remplacement de la ville en position pos, coût mis à jour en O(1) */
+static void set_city(Board time_board, Board dist_board, Solution* sol, int r, int pos, int city) {
+    Route* route = &sol->routes[r];
+    int old = route->path[pos];
+    int prev = prev_city(route, pos);
+    int next = next_city(route, pos);
+
+    apply_route_delta(sol, route,
+        time_board[prev][city] + time_board[city][next] - time_board[prev][old] - time_board[old][next],
+        dist_board[prev][city] + dist_board[city][next] - dist_board[prev][old] - dist_board[old][next]);
+    route->path[pos] = city;
+}
+
+/* Inversion du segment [i, j] : seules les arêtes du segment et de ses bords sont réévaluées
+ * (les matrices ne sont pas symétriques) */
+static void reverse_segment(Board time_board, Board dist_board, Solution* sol, int r, int i, int j) {
+    Route* route = &sol->routes[r];
+    int d_duration = 0, d_distance = 0;
+    int k, a, b, temp;
+
+    for (k = i - 1; k <= j; k++) {
+        a = (k < 0) ? DEPOT : route->path[k];
+        b = (k + 1 >= route->length) ? DEPOT : route->path[k+1];
+        d_duration -= time_board[a][b];
+        d_distance -= dist_board[a][b];
+    }
+
+    for (a = i, b = j; a < b; a++, b--) {
+        temp = route->path[a];
+        route->path[a] = route->path[b];
+        route->path[b] = temp;
+    }
+
+    for (k = i - 1; k <= j; k++) {
+        a = (k < 0) ? DEPOT : route->path[k];
+        b = (k + 1 >= route->length) ? DEPOT : route->path[k+1];
+        d_duration += time_board[a][b];
+        d_distance += dist_board[a][b];
+    }
+
+    apply_route_delta(sol, route, d_duration, d_distance);
+}
+
+/* Meilleure position d'insertion réalisable (MAX_TIME) d'une ville hors de skip_route, -1 si aucune */
+int best_insertion(Board time_board, Board dist_board, Solution* sol, int city, int skip_route, int* best_route, int* best_pos) {
+    int r, pos, prev, next, added_time, added_dist;
+    int best_cost = INT_MAX;
+
+    *best_route = -1;
+    *best_pos = -1;
+
+    for (r = 0; r < sol->num_vehicles; r++) {
+        Route* route = &sol->routes[r];
+        if (r == skip_route) continue;
+
+        for (pos = 0; pos <= route->length; pos++) {
+            prev = (pos == 0) ? DEPOT : route->path[pos-1];
+            next = (pos == route->length) ? DEPOT : route->path[pos];
+
+            added_time = time_board[prev][city] + time_board[city][next] - time_board[prev][next] + SERVICE_TIME;
+            added_dist = dist_board[prev][city] + dist_board[city][next] - dist_board[prev][next];
+
+            if (route->duration + added_time <= MAX_TIME && added_dist < best_cost) {
+                best_cost = added_dist;
+                *best_route = r;
+                *best_pos = pos;
+            }
+        }
+    }
+    return *best_route;
+}
+
+/* Position de chaque ville dans la solution en cours de modification
+ * (route -1 : ville absente), pour les insertions granulaires */
+static int* city_route = NULL;
+static int* city_pos = NULL;
+static int locator_size = 0;
+
+static void locate_cities(Solution* sol) {
+    int r, i;
+
+    if (locator_size != NUM_CITIES) {
+        free(city_route);
+        free(city_pos);
+        city_route = malloc(NUM_CITIES * sizeof(int));
+        city_pos = malloc(NUM_CITIES * sizeof(int));
+        if (city_route == NULL || city_pos == NULL) {
+            fprintf(stderr, "Erreur d'allocation memoire\n");
+            exit(EXIT_FAILURE);
+        }
+        locator_size = NUM_CITIES;
+    }
+
+    for (i = 0; i < NUM_CITIES; i++) {
+        city_route[i] = -1;
+    }
+    for (r = 0; r < sol->num_vehicles; r++) {
+        for (i = 0; i < sol->routes[r].length; i++) {
+            city_route[sol->routes[r].path[i]] = r;
+            city_pos[sol->routes[r].path[i]] = i;
+        }
+    }
+}
+
+/* Mise à jour des positions de la route r à partir de l'indice from */
+static void relocate_route(Solution* sol, int r, int from) {
+    Route* route = &sol->routes[r];
     int i;
+
+    for (i = from; i < route->length; i++) {
+        city_route[route->path[i]] = r;
+        city_pos[route->path[i]] = i;
+    }
+}
+
+/* Meilleure insertion restreinte aux positions voisines (avant ou après) des
+ * plus proches voisines de city ; recherche complète si aucune n'est réalisable.
+ * Les positions doivent être à jour (locate_cities). */
+static int granular_insertion(Board time_board, Board dist_board, Solution* sol, int city, int skip_route, int* best_route, int* best_pos) {
+    const int* candidates;
+    int k, side, r, pos, prev, next, added_time, added_dist;
+    int best_cost = INT_MAX;
+
+    if (candidate_count() == 0) {
+        return best_insertion(time_board, dist_board, sol, city, skip_route, best_route, best_pos);
+    }
+
+    *best_route = -1;
+    *best_pos = -1;
+    candidates = city_neighbors(city);
+
+    for (k = 0; k < candidate_count(); k++) {
+        r = city_route[candidates[k]];
+        if (r == -1 || r == skip_route) continue;
+
+        for (side = 0; side < 2; side++) {
+            Route* route = &sol->routes[r];
+            pos = city_pos[candidates[k]] + side;
+            prev = (pos == 0) ? DEPOT : route->path[pos-1];
+            next = (pos == route->length) ? DEPOT : route->path[pos];
+
+            added_time = time_board[prev][city] + time_board[city][next] - time_board[prev][next] + SERVICE_TIME;
+            added_dist = dist_board[prev][city] + dist_board[city][next] - dist_board[prev][next];
+
+            if (route->duration + added_time <= MAX_TIME && added_dist < best_cost) {
+                best_cost = added_dist;
+                *best_route = r;
+                *best_pos = pos;
+            }
+        }
+    }
+
+    if (*best_route == -1) {
+        return best_insertion(time_board, dist_board, sol, city, skip_route, best_route, best_pos);
+    }
+    return *best_route;
+}
+
+#ifdef DEBUG_FITNESS
+/* Vérification de l'évaluation incrémentale par un recalcul complet */
+static void check_fitness(Board time_board, Board dist_board, Individual* indiv, const char* where) {
+    Solution copy;
+    unsigned long long full;
+
+    solution_new(&copy);
+    solution_copy(&copy, &indiv->solution);
+    full = calculate_fitness(time_board, dist_board, &copy);
+
+    if (full != indiv->fitness || copy.total_duration != indiv->solution.total_duration) {
+        fprintf(stderr, "Fitness incrementale incorrecte (%s): %llu au lieu de %llu\n",
+                where, indiv->fitness, full);
+        abort();
+    }
+    solution_free(&copy);
+}
+#endif
+
+/* Initialisation d'une solution (les tampons déjà alloués sont conservés) */
+void init_solution(Solution* solution) {
     solution->num_vehicles = 0;
     solution->total_duration = 0;
     solution->total_distance = 0;
-    for (i = 0; i < MAX_VEHICLES; i++) {
-        solution->routes[i].length = 0;
-        solution->routes[i].duration = 0;
-        solution->routes[i].distance = 0;
-        memset(solution->routes[i].path, -1, sizeof(solution->routes[i].path));
-    }
+    solution->coverage_penalty = 0;
+}
+
+void copy_individual(Individual* dst, const Individual* src) {
+    solution_copy(&dst->solution, &src->solution);
+    dst->fitness = src->fitness;
+    dst->hash = src->hash;
 }
 
-/* Construction d'une route avec l'heuristique du plus proche voisin */
-void nearest_neighbor_route(Board time_board, Board dist_board, Solution* sol, int* visited) {
-    Route* route = &sol->routes[sol->num_vehicles];
+/* Construction d'une route avec l'heuristique du plus proche voisin.
+ * Avec choices > 1, la ville suivante est tirée au hasard parmi les choices
+ * plus proches réalisables (variante randomisée). */
+void nearest_neighbor_route(Board time_board, Board dist_board, Solution* sol, int* visited, int choices) {
+    int r = solution_add_route(sol);
+    Route* route = &sol->routes[r];
     int current = DEPOT;
     int time_used = 0;
-    int best_city, best_dist;
-    int i;
+    int best_city[NN_MAX_CHOICES], best_dist[NN_MAX_CHOICES];
+    int found, chosen;
+    int i, j, k, n;
+
+    if (choices < 1) choices = 1;
+    if (choices > NN_MAX_CHOICES) choices = NN_MAX_CHOICES;
 
     while (1) {
-        best_city = -1;
-        best_dist = INT_MAX;
+        found = 0;
 
-        for (i = 0; i < NUM_CITIES; i++) {
+        /* Les plus proches voisines de la ville courante d'abord, toutes les villes sinon */
+        n = (current == DEPOT) ? 0 : candidate_count();
+        for (k = 0; k < n + NUM_CITIES; k++) {
             int travel_time, total_time, travel_dist;
 
+            if (k == n && found > 0) break;
+
+            i = (k < n) ? city_neighbors(current)[k] : k - n;
             if (i == DEPOT || visited[i]) continue;
 
             travel_time = time_board[current][i];
             total_time = time_used + travel_time + SERVICE_TIME + time_board[i][DEPOT];
             travel_dist = dist_board[current][i];
-
-            if (total_time <= MAX_TIME && travel_dist < best_dist) {
-                best_dist = travel_dist;
-                best_city = i;
+            if (total_time > MAX_TIME) continue;
+            if (found == choices && travel_dist >= best_dist[found-1]) continue;
+
+            /* Insertion dans la liste triée des choices meilleures */
+            j = (found < choices) ? found++ : found - 1;
+            while (j > 0 && travel_dist < best_dist[j-1]) {
+                best_city[j] = best_city[j-1];
+                best_dist[j] = best_dist[j-1];
+                j--;
             }
+            best_city[j] = i;
+            best_dist[j] = travel_dist;
         }
 
-        if (best_city == -1 || route->length >= MAX_ROUTE_LENGTH) break;
+        if (found == 0) break;
+        chosen = best_city[(found > 1) ? rand() % found : 0];
 
-        route->path[route->length++] = best_city;
-        time_used += time_board[current][best_city] + SERVICE_TIME;
-        current = best_city;
-        visited[best_city] = 1;
+        route_reserve(route, route->length + 1);
+        route->path[route->length++] = chosen;
+        time_used += time_board[current][chosen] + SERVICE_TIME;
+        current = chosen;
+        visited[chosen] = 1;
     }
 
-    if (route->length > 0) {
-        sol->num_vehicles++;
+    if (route->length == 0) {
+        sol->num_vehicles--;
     }
 }
 
-/* Construction de la solution initiale */
-void build_initial_solution(Board time_board, Board dist_board, Solution* sol) {
-    int visited[MAX_CITIES];
-    int i, all_visited;
+/* Réparation, suppression des croisements et évaluation d'une solution construite */
+void finish_solution(Board time_board, Board dist_board, Solution* sol) {
+    calculate_fitness(time_board, dist_board, sol);
+    repair_solution(time_board, dist_board, sol);
+    remove_route_crossings(time_board, dist_board, sol);
+    calculate_fitness(time_board, dist_board, sol);
+}
+
+/* Construction de la solution initiale par plus proche voisin (choices : voir nearest_neighbor_route) */
+void build_initial_solution(Board time_board, Board dist_board, Solution* sol, int choices) {
+    int* visited = new_visited();
+    int i, all_visited, before;
 
     init_solution(sol);
-    memset(visited, 0, sizeof(visited));
     visited[DEPOT] = 1;
 
     /* Créer des routes jusqu'à ce que toutes les villes soient visitées */
@@ -159,24 +459,25 @@ void build_initial_solution(Board time_board, Board dist_board, Solution* sol) {
                 break;
             }
         }
-        if (all_visited || sol->num_vehicles >= MAX_VEHICLES) break;
+        if (all_visited) break;
 
-        nearest_neighbor_route(time_board, dist_board, sol, visited);
+        /* Une route vide signifie qu'aucune ville restante n'est atteignable :
+         * la réparation tentera de les insérer */
+        before = sol->num_vehicles;
+        nearest_neighbor_route(time_board, dist_board, sol, visited, choices);
+        if (sol->num_vehicles == before) break;
     }
+    free(visited);
 
-    repair_solution(time_board, dist_board, sol);
-    remove_route_crossings(dist_board, sol);
-    calculate_fitness(time_board, dist_board, sol);
+    finish_solution(time_board, dist_board, sol);
 }
 
 /* Réparation d'une solution */
 void repair_solution(Board time_board, Board dist_board, Solution* sol) {
-    int visited[MAX_CITIES];
-    int city, r, pos, i;
-    int best_route, best_pos, best_cost;
-    int prev, next, added_time, new_duration, added_dist;
+    int* visited = new_visited();
+    int city, r, i, located = 0;
+    int best_route, best_pos;
 
-    memset(visited, 0, sizeof(visited));
     visited[DEPOT] = 1;
 
     /* Marquer les villes déjà visitées */
@@ -190,395 +491,607 @@ void repair_solution(Board time_board, Board dist_board, Solution* sol) {
     for (city = 0; city < NUM_CITIES; city++) {
         if (visited[city]) continue;
 
-        best_route = -1;
-        best_pos = -1;
-        best_cost = INT_MAX;
-
-        for (r = 0; r < sol->num_vehicles; r++) {
-            Route* route = &sol->routes[r];
-
-            for (pos = 0; pos <= route->length; pos++) {
-                prev = (pos == 0) ? DEPOT : route->path[pos-1];
-                next = (pos == route->length) ? DEPOT : route->path[pos];
-
-                added_time = time_board[prev][city] + time_board[city][next] - time_board[prev][next] + SERVICE_TIME;
-                new_duration = route->duration + added_time;
-                added_dist = dist_board[prev][city] + dist_board[city][next] - dist_board[prev][next];
-
-                if (new_duration <= MAX_TIME && added_dist < best_cost) {
-                    best_cost = added_dist;
-                    best_route = r;
-                    best_pos = pos;
-                }
-            }
+        if (!located) {
+            locate_cities(sol);
+            located = 1;
         }
+        if (granular_insertion(time_board, dist_board, sol, city, -1, &best_route, &best_pos) != -1) {
+            insert_city(time_board, dist_board, sol, best_route, best_pos, city);
+            relocate_route(sol, best_route, best_pos);
+            visited[city] = 1;
+        }
+    }
+    free(visited);
+}
 
-        if (best_route != -1) {
-            Route* route = &sol->routes[best_route];
-            for (i = route->length; i > best_pos; i--) {
-                route->path[i] = route->path[i-1];
+/* Suppression des croisements dans une route, retourne 1 si la route a changé */
+int remove_crossings_in_route(Board time_board, Board dist_board, Solution* sol, int r) {
+    Route* route = &sol->routes[r];
+    int i, j, a, b, c, d, ab_cd, ac_bd;
+    int changed = 0;
+
+    for (i = 0; i < route->length - 3; i++) {
+        for (j = i + 2; j < route->length - 1; j++) {
+            a = route->path[i];
+            b = route->path[i+1];
+            c = route->path[j];
+            d = route->path[j+1];
+
+            ab_cd = dist_board[a][c] + dist_board[b][d];
+            ac_bd = dist_board[a][b] + dist_board[c][d];
+
+            if (ab_cd < ac_bd) {
+                reverse_segment(time_board, dist_board, sol, r, i+1, j);
+                changed = 1;
             }
-            route->path[best_pos] = city;
-            route->length++;
-            route->duration += best_cost;
-            visited[city] = 1;
         }
     }
+    return changed;
 }
 
 /* Suppression des croisements dans les routes */
-void remove_route_crossings(Board dist_board, Solution* sol) {
-    int r, i, j, a, b, c, d, ab_cd, ac_bd, start, end, temp;
+void remove_route_crossings(Board time_board, Board dist_board, Solution* sol) {
+    int r;
 
     for (r = 0; r < sol->num_vehicles; r++) {
-        Route* route = &sol->routes[r];
+        remove_crossings_in_route(time_board, dist_board, sol, r);
+    }
+}
 
-        for (i = 0; i < route->length - 3; i++) {
-            for (j = i + 2; j < route->length - 1; j++) {
-                a = route->path[i];
-                b = route->path[i+1];
-                c = route->path[j];
-                d = route->path[j+1];
-
-                ab_cd = dist_board[a][c] + dist_board[b][d];
-                ac_bd = dist_board[a][b] + dist_board[c][d];
-
-                if (ab_cd < ac_bd) {
-                    start = i+1;
-                    end = j;
-                    while (start < end) {
-                        temp = route->path[start];
-                        route->path[start] = route->path[end];
-                        route->path[end] = temp;
-                        start++;
-                        end--;
-                    }
-                }
-            }
-        }
-        route->distance = route_distance(dist_board, route);
+static GAParams params = {
+    DEFAULT_POPULATION_SIZE, DEFAULT_MUTATION_RATE, DEFAULT_CROSSOVER_RATE,
+    DEFAULT_TOURNAMENT_SIZE, DEFAULT_ELITE_SIZE, DEFAULT_STAGNATION_LIMIT,
+    DEFAULT_LOCAL_SEARCH_RATE, DEFAULT_CROSSOVER, DEFAULT_RESTART_DIVERSITY
+};
+
+void default_ga_params(GAParams* p) {
+    p->population_size = DEFAULT_POPULATION_SIZE;
+    p->mutation_rate = DEFAULT_MUTATION_RATE;
+    p->crossover_rate = DEFAULT_CROSSOVER_RATE;
+    p->tournament_size = DEFAULT_TOURNAMENT_SIZE;
+    p->elite_size = DEFAULT_ELITE_SIZE;
+    p->stagnation_limit = DEFAULT_STAGNATION_LIMIT;
+    p->local_search_rate = DEFAULT_LOCAL_SEARCH_RATE;
+    p->crossover = DEFAULT_CROSSOVER;
+    p->restart_diversity = DEFAULT_RESTART_DIVERSITY;
+}
+
+int check_ga_params(const GAParams* p) {
+    return p->population_size >= 2
+        && p->mutation_rate >= 0.0 && p->mutation_rate <= 1.0
+        && p->crossover_rate >= 0.0 && p->crossover_rate <= 1.0
+        && p->tournament_size >= 1
+        && p->elite_size >= 0 && p->elite_size < p->population_size
+        && p->stagnation_limit >= 1
+        && p->local_search_rate >= 0.0 && p->local_search_rate <= 1.0
+        && (p->crossover == CROSSOVER_ROUTES || p->crossover == CROSSOVER_OX || p->crossover == CROSSOVER_PMX)
+        && p->restart_diversity >= 0.0 && p->restart_diversity <= 1.0;
+}
+
+int set_ga_params(const GAParams* p) {
+    if (!check_ga_params(p)) return 0;
+    params = *p;
+    return 1;
+}
+
+const GAParams* ga_params(void) {
+    return &params;
+}
+
+/* Allocation d'une population vide (tous les individus sont des solutions vides) */
+Population* create_population(void) {
+    Population* pop = calloc(1, sizeof(Population));
+    int slots = 1;
+
+    if (pop == NULL) return NULL;
+    pop->size = params.population_size;
+    pop->members = calloc(pop->size, sizeof(Individual));
+    pop->offspring = calloc(pop->size, sizeof(Individual));
+    pop->order = malloc(pop->size * sizeof(int));
+
+    /* Table des empreintes remplie au plus à moitié */
+    while (slots < 2 * pop->size) slots *= 2;
+    pop->seen = calloc(slots, sizeof(unsigned long long));
+    pop->seen_mask = slots - 1;
+    if (pop->members == NULL || pop->offspring == NULL || pop->order == NULL || pop->seen == NULL) {
+        free_population(pop);
+        return NULL;
     }
+    return pop;
+}
+
+void free_population(Population* pop) {
+    int i;
+
+    if (pop == NULL) return;
+    for (i = 0; i < pop->size; i++) {
+        if (pop->members != NULL) solution_free(&pop->members[i].solution);
+        if (pop->offspring != NULL) solution_free(&pop->offspring[i].solution);
+    }
+    solution_free(&pop->best_ever.solution);
+    free(pop->members);
+    free(pop->offspring);
+    free(pop->order);
+    free(pop->seen);
+    free(pop);
+}
+
+/* Oubli des empreintes : début d'une nouvelle génération */
+static void forget_all(Population* pop) {
+    memset(pop->seen, 0, (pop->seen_mask + 1) * sizeof(unsigned long long));
+}
+
+/* Ajout d'une empreinte, 0 si elle était déjà présente */
+static int remember(Population* pop, unsigned long long hash) {
+    int slot = (int)(hash & pop->seen_mask);
+
+    while (pop->seen[slot] != 0) {
+        if (pop->seen[slot] == hash) return 0;
+        slot = (slot + 1) & pop->seen_mask;
+    }
+    pop->seen[slot] = hash;
+    return 1;
+}
+
+/* Budget de temps épuisé ou arrêt demandé : la génération en cours se
+ * termine sans nouvelle construction */
+static int must_stop(void) {
+    return time_is_up() || stop_requested();
+}
+
+static int elite_count(const Population* pop) {
+    return (params.elite_size > 0) ? params.elite_size : pop->size / 10;
+}
+
+static void admit(Board time_board, Board dist_board, Population* pop, Individual* indiv);
+
+/* Membres de la population en cours de tri (qsort n'a pas de paramètre de contexte) */
+static const Individual* sorted_members;
+
+static int compare_order(const void* a, const void* b) {
+    return compare_individuals(&sorted_members[*(const int*)a], &sorted_members[*(const int*)b]);
+}
+
+/* Tri du tableau d'indices par fitness croissante */
+void sort_population(Population* pop) {
+    int i;
+
+    for (i = 0; i < pop->size; i++) {
+        pop->order[i] = i;
+    }
+    sorted_members = pop->members;
+    qsort(pop->order, pop->size, sizeof(int), compare_order);
 }
 
 /* Initialisation de la population */
 void init_population(Board time_board, Board dist_board, Population* pop) {
-    int i;
+    Builder builder;
+    int i, built, randomized;
 
     pop->generation = 0;
     pop->stagnation_count = 0;
-
-    for (i = 0; i < POPULATION_SIZE; i++) {
-        init_solution(&pop->members[i].solution);
-        build_initial_solution(time_board, dist_board, &pop->members[i].solution);
-        pop->members[i].fitness = calculate_fitness(time_board, dist_board, &pop->members[i].solution);
+    forget_all(pop);
+
+    /* Chaque case est remplie par l'heuristique de construction que lui attribue le mélange.
+     * Budget épuisé : les cases restantes reçoivent des copies des individus déjà construits */
+    for (i = 0; i < pop->size; i++) {
+        if (i > 0 && must_stop()) {
+            for (built = i; i < pop->size; i++) {
+                copy_individual(&pop->members[i], &pop->members[i % built]);
+            }
+            break;
+        }
+        builder = slot_builder(i, pop->size, &randomized);
+        build_solution(time_board, dist_board, &pop->members[i].solution, builder, randomized);
+        pop->members[i].fitness = solution_fitness(&pop->members[i].solution);
+        admit(time_board, dist_board, pop, &pop->members[i]);
 
         if (i == 0 || pop->members[i].fitness < pop->best_ever.fitness) {
-            pop->best_ever = pop->members[i];
+            copy_individual(&pop->best_ever, &pop->members[i]);
         }
     }
 
-    qsort(pop->members, POPULATION_SIZE, sizeof(Individual), compare_individuals);
+    sort_population(pop);
+    pop->diversity = population_diversity(pop);
 }
 
-/* Sélection par tournoi */
-Individual tournament_selection(Population* pop) {
+/* Sélection par tournoi, retourne l'indice du gagnant */
+int tournament_selection(Population* pop) {
     int i;
-    Individual best = pop->members[rand() % POPULATION_SIZE];
+    int best = rand() % pop->size;
 
-    for (i = 1; i < TOURNAMENT_SIZE; i++) {
-        Individual contender = pop->members[rand() % POPULATION_SIZE];
-        if (contender.fitness < best.fitness) {
+    for (i = 1; i < params.tournament_size; i++) {
+        int contender = rand() % pop->size;
+        if (pop->members[contender].fitness < pop->members[best].fitness) {
             best = contender;
         }
     }
     return best;
 }
 
+/* Croisement OX ou PMX des tours géants puis Split ; 0 si un parent n'est pas
+ * une permutation complète (l'enfant n'est alors pas modifié) */
+static int tour_crossover(Board time_board, Board dist_board, Individual* parent1, Individual* parent2, Individual* child) {
+    int n = NUM_CITIES - 1;
+    int* tours;
+    int start, end;
+
+    if (n < 2 || parent1->solution.coverage_penalty > 0 || parent2->solution.coverage_penalty > 0) return 0;
+
+    tours = malloc(3 * n * sizeof(int));
+    if (tours == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    if (solution_tour(&parent1->solution, tours) != n || solution_tour(&parent2->solution, tours + n) != n) {
+        free(tours);
+        return 0;
+    }
+
+    start = rand() % n;
+    end = start + rand() % (n - start);
+    if (params.crossover == CROSSOVER_PMX) {
+        pmx_crossover(tours, tours + n, tours + 2 * n, start, end);
+    } else {
+        order_crossover(tours, tours + n, tours + 2 * n, start, end);
+    }
+
+    split_tour(time_board, dist_board, tours + 2 * n, &child->solution);
+    child->fitness = solution_fitness(&child->solution);
+    free(tours);
+
+#ifdef DEBUG_FITNESS
+    check_fitness(time_board, dist_board, child, "split");
+#endif
+    return 1;
+}
+
 /* Croisement amélioré */
 void crossover(Board time_board, Board dist_board, Individual* parent1, Individual* parent2, Individual* child) {
-    int route1, start, end, i, j, r, cr, pos, city, best_route, best_pos, best_cost;
-    int prev, next, added_time, new_duration, added_dist;
-    int visited[MAX_CITIES];
+    int route1, start, end, i, r, city, best_route, best_pos;
+    int* visited;
+    Route* p1_route;
+    Route* child_route;
+
+    if (params.crossover != CROSSOVER_ROUTES
+        && tour_crossover(time_board, dist_board, parent1, parent2, child)) return;
 
     init_solution(&child->solution);
 
     /* Sélection aléatoire d'un segment du parent1 */
     route1 = rand() % parent1->solution.num_vehicles;
-    Route* p1_route = &parent1->solution.routes[route1];
+    p1_route = &parent1->solution.routes[route1];
     start = (p1_route->length > 0) ? rand() % p1_route->length : 0;
     end = (p1_route->length > 0) ? start + rand() % (p1_route->length - start) : 0;
 
     /* Copie du segment dans l'enfant */
-    Route* child_route = &child->solution.routes[0];
-    for (i = start; i <= end && child_route->length < MAX_ROUTE_LENGTH; i++) {
-        child_route->path[child_route->length++] = p1_route->path[i];
+    r = solution_add_route(&child->solution);
+    child_route = &child->solution.routes[r];
+    for (i = start; i <= end; i++) {
+        insert_city(time_board, dist_board, &child->solution, 0, child_route->length, p1_route->path[i]);
     }
-    child->solution.num_vehicles = 1;
 
     /* Ajout des villes manquantes du parent2 */
-    memset(visited, 0, sizeof(visited));
+    visited = new_visited();
     for (i = 0; i < child_route->length; i++) {
         visited[child_route->path[i]] = 1;
     }
+    locate_cities(&child->solution);
 
     for (r = 0; r < parent2->solution.num_vehicles; r++) {
         Route* p2_route = &parent2->solution.routes[r];
         for (i = 0; i < p2_route->length; i++) {
             city = p2_route->path[i];
-            if (!visited[city]) {
-                /* Trouver la meilleure position d'insertion */
-                best_route = -1;
-                best_pos = -1;
-                best_cost = INT_MAX;
-
-                for (cr = 0; cr < child->solution.num_vehicles; cr++) {
-                    Route* c_route = &child->solution.routes[cr];
-                    for (pos = 0; pos <= c_route->length; pos++) {
-                        prev = (pos == 0) ? DEPOT : c_route->path[pos-1];
-                        next = (pos == c_route->length) ? DEPOT : c_route->path[pos];
-
-                        added_time = time_board[prev][city] + time_board[city][next] - time_board[prev][next] + SERVICE_TIME;
-                        new_duration = route_duration(time_board, c_route) + added_time;
-                        added_dist = dist_board[prev][city] + dist_board[city][next] - dist_board[prev][next];
-
-                        if (new_duration <= MAX_TIME && added_dist < best_cost) {
-                            best_cost = added_dist;
-                            best_route = cr;
-                            best_pos = pos;
-                        }
-                    }
-                }
-
-                if (best_route != -1) {
-                    Route* c_route = &child->solution.routes[best_route];
-                    for (j = c_route->length; j > best_pos; j--) {
-                        c_route->path[j] = c_route->path[j-1];
-                    }
-                    c_route->path[best_pos] = city;
-                    c_route->length++;
-                    visited[city] = 1;
-                } else if (child->solution.num_vehicles < MAX_VEHICLES) {
-                    Route* new_route = &child->solution.routes[child->solution.num_vehicles++];
-                    new_route->path[new_route->length++] = city;
-                    visited[city] = 1;
-                }
+            if (visited[city]) continue;
+
+            /* Trouver la meilleure position d'insertion */
+            if (granular_insertion(time_board, dist_board, &child->solution, city, -1, &best_route, &best_pos) == -1) {
+                best_route = solution_add_route(&child->solution);
+                best_pos = 0;
             }
+            insert_city(time_board, dist_board, &child->solution, best_route, best_pos, city);
+            relocate_route(&child->solution, best_route, best_pos);
+            visited[city] = 1;
         }
     }
+    free(visited);
 
     repair_solution(time_board, dist_board, &child->solution);
-    remove_route_crossings(dist_board, &child->solution);
+    remove_route_crossings(time_board, dist_board, &child->solution);
     child->fitness = calculate_fitness(time_board, dist_board, &child->solution);
 }
 
-/* Mutation améliorée */
+/* Recherche de la position d'une ville, retourne sa route ou -1 */
+static int locate_city(Solution* sol, int city, int* idx) {
+    int r, i;
+
+    for (r = 0; r < sol->num_vehicles; r++) {
+        for (i = 0; i < sol->routes[r].length; i++) {
+            if (sol->routes[r].path[i] == city) {
+                *idx = i;
+                return r;
+            }
+        }
+    }
+    return -1;
+}
+
+/* Déplacement d'une ville vers sa meilleure position d'insertion */
+static int mutate_relocate(Board time_board, Board dist_board, Solution* sol, int* touched) {
+    int city, src_route, src_idx, best_route, best_pos;
+    Route* route;
+
+    do {
+        city = rand() % NUM_CITIES;
+    } while (city == DEPOT);
+
+    src_route = locate_city(sol, city, &src_idx);
+    if (src_route == -1) return 0;
+
+    route = &sol->routes[src_route];
+    remove_city(time_board, dist_board, sol, src_route, src_idx);
+    touched[0] = src_route;
+
+    /* Une route vidée ne peut pas récupérer la ville */
+    if (candidate_count() > 0) locate_cities(sol);
+    granular_insertion(time_board, dist_board, sol, city,
+                       (route->length == 0) ? src_route : -1, &best_route, &best_pos);
+
+    if (best_route != -1) {
+        insert_city(time_board, dist_board, sol, best_route, best_pos, city);
+        touched[1] = best_route;
+        return (best_route == src_route) ? 1 : 2;
+    }
+    insert_city(time_board, dist_board, sol, src_route, route->length, city);
+    return 1;
+}
+
+/* Échange de deux villes */
+static int mutate_swap(Board time_board, Board dist_board, Solution* sol, int* touched) {
+    int city1, city2, idx1, idx2, route1, route2;
+
+    do {
+        city1 = rand() % NUM_CITIES;
+        city2 = rand() % NUM_CITIES;
+    } while (city1 == DEPOT || city2 == DEPOT || city1 == city2);
+
+    route1 = locate_city(sol, city1, &idx1);
+    route2 = locate_city(sol, city2, &idx2);
+    if (route1 == -1 || route2 == -1) return 0;
+
+    set_city(time_board, dist_board, sol, route1, idx1, city2);
+    set_city(time_board, dist_board, sol, route2, idx2, city1);
+    touched[0] = route1;
+    touched[1] = route2;
+    return (route1 == route2) ? 1 : 2;
+}
+
+/* Inversion de segment (2-opt) */
+static int mutate_two_opt(Board time_board, Board dist_board, Solution* sol, int* touched) {
+    Route* route;
+    int r, i, j;
+
+    if (sol->num_vehicles == 0) return 0;
+
+    r = rand() % sol->num_vehicles;
+    route = &sol->routes[r];
+    if (route->length < 4) return 0;
+
+    i = 1 + rand() % (route->length - 2);
+    j = i + 1 + rand() % (route->length - i - 1);
+    reverse_segment(time_board, dist_board, sol, r, i, j);
+    touched[0] = r;
+    return 1;
+}
+
+/* Échange de segments entre routes */
+static int mutate_segment_exchange(Board time_board, Board dist_board, Solution* sol, int* touched) {
+    Route* route1;
+    Route* route2;
+    int r1, r2, i, j, k, len1, len2, temp;
+
+    if (sol->num_vehicles < 2) return 0;
+
+    r1 = rand() % sol->num_vehicles;
+    r2 = rand() % sol->num_vehicles;
+    if (r1 == r2) return 0;
+
+    route1 = &sol->routes[r1];
+    route2 = &sol->routes[r2];
+    if (route1->length == 0 || route2->length == 0) return 0;
+
+    i = rand() % route1->length;
+    j = rand() % route2->length;
+    len1 = 1 + rand() % (route1->length - i);
+    len2 = 1 + rand() % (route2->length - j);
+
+    /* Échanger les segments */
+    for (k = 0; k < len1 && k < len2; k++) {
+        temp = route1->path[i+k];
+        set_city(time_board, dist_board, sol, r1, i+k, route2->path[j+k]);
+        set_city(time_board, dist_board, sol, r2, j+k, temp);
+    }
+    touched[0] = r1;
+    touched[1] = r2;
+    return 2;
+}
+
+/* Suppression de route vide */
+static int mutate_drop_empty(Solution* sol) {
+    int r;
+
+    for (r = 0; r < sol->num_vehicles; r++) {
+        if (sol->routes[r].length == 0) {
+            solution_drop_route(sol, r);
+            break;
+        }
+    }
+    return 0;
+}
+
+/* Mutation améliorée : seules les routes modifiées sont réévaluées */
+static void apply_mutation(Board time_board, Board dist_board, Individual* indiv) {
+    Solution* sol = &indiv->solution;
+    int touched[2];
+    int num_touched = 0;
+    int k;
+
+    switch (rand() % 5) {
+        case 0: num_touched = mutate_relocate(time_board, dist_board, sol, touched); break;
+        case 1: num_touched = mutate_swap(time_board, dist_board, sol, touched); break;
+        case 2: num_touched = mutate_two_opt(time_board, dist_board, sol, touched); break;
+        case 3: num_touched = mutate_segment_exchange(time_board, dist_board, sol, touched); break;
+        case 4: num_touched = mutate_drop_empty(sol); break;
+    }
+
+    /* Les opérateurs conservent la couverture : réparation seulement si la solution était incomplète */
+    if (sol->coverage_penalty > 0) {
+        repair_solution(time_board, dist_board, sol);
+        remove_route_crossings(time_board, dist_board, sol);
+        indiv->fitness = calculate_fitness(time_board, dist_board, sol);
+        return;
+    }
+
+    for (k = 0; k < num_touched; k++) {
+        remove_crossings_in_route(time_board, dist_board, sol, touched[k]);
+    }
+    indiv->fitness = solution_fitness(sol);
+
+#ifdef DEBUG_FITNESS
+    check_fitness(time_board, dist_board, indiv, "mutation");
+#endif
+}
+
 void mutate(Board time_board, Board dist_board, Individual* indiv) {
-    if ((double)rand() / RAND_MAX < MUTATION_RATE) {
-        int mutation_type = rand() % 5;
-        int city, src_route, src_idx, i, j, r, pos;
-        int best_route, best_pos, best_cost;
-        int prev, next, added_time, new_duration, added_dist;
-
-        switch(mutation_type) {
-            case 0: /* Déplacement d'une ville */
-                do {
-                    city = rand() % NUM_CITIES;
-                } while (city == DEPOT);
-
-                src_route = -1;
-                for (r = 0; r < indiv->solution.num_vehicles; r++) {
-                    for (i = 0; i < indiv->solution.routes[r].length; i++) {
-                        if (indiv->solution.routes[r].path[i] == city) {
-                            src_route = r;
-                            src_idx = i;
-                            break;
-                        }
-                    }
-                    if (src_route != -1) break;
-                }
-                if (src_route == -1) return;
-
-                Route* route = &indiv->solution.routes[src_route];
-                for (i = src_idx; i < route->length - 1; i++) {
-                    route->path[i] = route->path[i+1];
-                }
-                route->length--;
-
-                best_route = -1;
-                best_pos = -1;
-                best_cost = INT_MAX;
-                for (r = 0; r < indiv->solution.num_vehicles; r++) {
-                    if (r == src_route && route->length == 0) continue;
-
-                    for (pos = 0; pos <= indiv->solution.routes[r].length; pos++) {
-                        prev = (pos == 0) ? DEPOT : indiv->solution.routes[r].path[pos-1];
-                        next = (pos == indiv->solution.routes[r].length) ? DEPOT : indiv->solution.routes[r].path[pos];
-
-                        added_time = time_board[prev][city] + time_board[city][next] - time_board[prev][next] + SERVICE_TIME;
-                        new_duration = indiv->solution.routes[r].duration + added_time;
-                        added_dist = dist_board[prev][city] + dist_board[city][next] - dist_board[prev][next];
-
-                        if (new_duration <= MAX_TIME && added_dist < best_cost) {
-                            best_cost = added_dist;
-                            best_route = r;
-                            best_pos = pos;
-                        }
-                    }
-                }
-
-                if (best_route != -1) {
-                    Route* dest_route = &indiv->solution.routes[best_route];
-                    for (i = dest_route->length; i > best_pos; i--) {
-                        dest_route->path[i] = dest_route->path[i-1];
-                    }
-                    dest_route->path[best_pos] = city;
-                    dest_route->length++;
-                    dest_route->duration += best_cost;
-                } else {
-                    route->path[route->length++] = city;
-                }
-                break;
+    if ((double)rand() / RAND_MAX >= params.mutation_rate) return;
+    apply_mutation(time_board, dist_board, indiv);
+}
 
-            case 1: /* Échange de deux villes */
-				int city1, city2;
-                do {
-                    city1 = rand() % NUM_CITIES;
-                    city2 = rand() % NUM_CITIES;
-                } while (city1 == DEPOT || city2 == DEPOT || city1 == city2);
-
-				int idx1 = -1, idx2 = -1, route1 = -1, route2 = -1;
-                for (r = 0; r < indiv->solution.num_vehicles; r++) {
-                    for (i = 0; i < indiv->solution.routes[r].length; i++) {
-                        if (indiv->solution.routes[r].path[i] == city1) {
-                            route1 = r;
-                            idx1 = i;
-                        }
-                        if (indiv->solution.routes[r].path[i] == city2) {
-                            route2 = r;
-                            idx2 = i;
-                        }
-                    }
-                }
-
-                if (route1 != -1 && route2 != -1 && idx1 != -1 && idx2 != -1) {
-                    indiv->solution.routes[route1].path[idx1] = city2;
-                    indiv->solution.routes[route2].path[idx2] = city1;
-                }
-                break;
+/* Recherche locale (algorithme mémétique) sur une part local_search_rate des enfants complets */
+static void improve(Board time_board, Board dist_board, Individual* child) {
+    if ((double)rand() / RAND_MAX >= params.local_search_rate) return;
+    if (child->solution.coverage_penalty > 0) return;
 
-            case 2: /* Inversion de segment (2-opt) */
-                if (indiv->solution.num_vehicles > 0) {
-                    r = rand() % indiv->solution.num_vehicles;
-                    Route* route = &indiv->solution.routes[r];
-
-                    if (route->length >= 4) {
-						int temp;
-                        i = 1 + rand() % (route->length - 2);
-                        j = i + 1 + rand() % (route->length - i - 1);
-
-                        while (i < j) {
-                            temp = route->path[i];
-                            route->path[i] = route->path[j];
-                            route->path[j] = temp;
-                            i++;
-                            j--;
-                        }
-
-                        route->duration = route_duration(time_board, route);
-                        route->distance = route_distance(dist_board, route);
-                    }
-                }
-                break;
+    if (local_search(time_board, dist_board, &child->solution) > 0) {
+        child->fitness = solution_fitness(&child->solution);
+#ifdef DEBUG_FITNESS
+        check_fitness(time_board, dist_board, child, "recherche locale");
+#endif
+    }
+}
 
-            case 3: /* Échange de segments entre routes */
-                if (indiv->solution.num_vehicles >= 2) {
-                    int r1 = rand() % indiv->solution.num_vehicles;
-                    int r2 = rand() % indiv->solution.num_vehicles;
-                    if (r1 == r2) break;
-
-                    Route* route1 = &indiv->solution.routes[r1];
-                    Route* route2 = &indiv->solution.routes[r2];
-                    if (route1->length == 0 || route2->length == 0) break;
-
-                    i = rand() % route1->length;
-                    j = rand() % route2->length;
-                    int len1 = 1 + rand() % (route1->length - i);
-                    int len2 = 1 + rand() % (route2->length - j);
-
-                    /* Échanger les segments */
-					int k, temp;
-                    for (k = 0; k < len1 && k < len2; k++) {
-                        temp = route1->path[i+k];
-                        route1->path[i+k] = route2->path[j+k];
-                        route2->path[j+k] = temp;
-                    }
-
-                    route1->duration = route_duration(time_board, route1);
-                    route1->distance = route_distance(dist_board, route1);
-                    route2->duration = route_duration(time_board, route2);
-                    route2->distance = route_distance(dist_board, route2);
-                }
-                break;
+/* Individu neuf, construit par une heuristique randomisée tirée selon le mélange */
+static void fresh_individual(Board time_board, Board dist_board, Population* pop, Individual* indiv) {
+    int randomized;
+    Builder builder = slot_builder(rand() % pop->size, pop->size, &randomized);
 
-            case 4: /* Suppression de route vide */
-                for (r = 0; r < indiv->solution.num_vehicles; r++) {
-                    if (indiv->solution.routes[r].length == 0) {
-                        for (i = r; i < indiv->solution.num_vehicles - 1; i++) {
-                            indiv->solution.routes[i] = indiv->solution.routes[i+1];
-                        }
-                        indiv->solution.num_vehicles--;
-                        break;
-                    }
-                }
-                break;
+    build_solution(time_board, dist_board, &indiv->solution, builder, 1);
+    indiv->fitness = solution_fitness(&indiv->solution);
+}
+
+/* Entrée d'un individu dans la génération en construction : un clone d'un
+ * individu déjà présent est muté (CLONE_RETRIES fois au plus) puis remplacé
+ * par un individu neuf, gardé même s'il est encore un clone */
+static void admit(Board time_board, Board dist_board, Population* pop, Individual* indiv) {
+    int attempt;
+
+    indiv->hash = solution_hash(&indiv->solution);
+    for (attempt = 0; attempt <= CLONE_RETRIES && !remember(pop, indiv->hash); attempt++) {
+        if (attempt == 0) pop->clones++;
+        if (attempt < CLONE_RETRIES) {
+            apply_mutation(time_board, dist_board, indiv);
+        } else {
+            fresh_individual(time_board, dist_board, pop, indiv);
         }
+        indiv->hash = solution_hash(&indiv->solution);
+    }
+}
+
+/* Relance : les élites restent, les autres individus sont reconstruits */
+static void restart_population(Board time_board, Board dist_board, Population* pop) {
+    int elite = elite_count(pop);
+    int k;
 
-        repair_solution(time_board, dist_board, &indiv->solution);
-        remove_route_crossings(dist_board, &indiv->solution);
-        indiv->fitness = calculate_fitness(time_board, dist_board, &indiv->solution);
+    forget_all(pop);
+    for (k = 0; k < elite; k++) {
+        remember(pop, pop->members[pop->order[k]].hash);
     }
+    for (k = elite; k < pop->size && !must_stop(); k++) {
+        fresh_individual(time_board, dist_board, pop, &pop->members[pop->order[k]]);
+        admit(time_board, dist_board, pop, &pop->members[pop->order[k]]);
+    }
+    pop->restarts++;
+    sort_population(pop);
 }
 
 /* Évolution de la population */
 void evolve_population(Board time_board, Board dist_board, Population* pop) {
-    Population new_pop;
-    int i;
+    Individual* next = pop->offspring;
+    Individual* best;
+    int elite = elite_count(pop);
+    int i, k;
 
-    new_pop.generation = pop->generation + 1;
+    forget_all(pop);
 
-    /* Élitisme: conserver les meilleurs individus */
-    for (i = 0; i < ELITE_SIZE; i++) {
-        new_pop.members[i] = pop->members[i];
+    /* Élitisme: conserver les meilleurs individus distincts */
+    for (i = 0, k = 0; i < elite && k < pop->size; k++) {
+        if (remember(pop, pop->members[pop->order[k]].hash)) {
+            copy_individual(&next[i++], &pop->members[pop->order[k]]);
+        }
     }
 
-    /* Remplir le reste de la population */
-    for (i = ELITE_SIZE; i < POPULATION_SIZE; i++) {
-        Individual parent1 = tournament_selection(pop);
-        Individual parent2 = tournament_selection(pop);
-        Individual child;
+    /* Remplir le reste de la population ; budget épuisé : les places restantes
+     * reprennent les individus de la génération courante, dans l'ordre */
+    for (; i < pop->size; i++) {
+        Individual* parent1;
+        Individual* parent2;
+        Individual* child = &next[i];
+
+        if (must_stop()) {
+            for (; i < pop->size; i++) {
+                copy_individual(&next[i], &pop->members[pop->order[i]]);
+            }
+            break;
+        }
+        parent1 = &pop->members[tournament_selection(pop)];
+        parent2 = &pop->members[tournament_selection(pop)];
 
-        if ((double)rand() / RAND_MAX < CROSSOVER_RATE) {
-            crossover(time_board, dist_board, &parent1, &parent2, &child);
+        if ((double)rand() / RAND_MAX < params.crossover_rate) {
+            crossover(time_board, dist_board, parent1, parent2, child);
         } else {
-            child = parent1;
+            copy_individual(child, parent1);
         }
 
-        mutate(time_board, dist_board, &child);
-        new_pop.members[i] = child;
+        mutate(time_board, dist_board, child);
+        improve(time_board, dist_board, child);
+        admit(time_board, dist_board, pop, child);
     }
 
-    /* Trier la population par fitness */
-    qsort(new_pop.members, POPULATION_SIZE, sizeof(Individual), compare_individuals);
+    /* Échange des tampons puis tri des indices par fitness */
+    pop->offspring = pop->members;
+    pop->members = next;
+    pop->generation++;
+    sort_population(pop);
+
+    /* Population trop uniforme à mi-chemin de la limite de stagnation : une
+     * relance, qui garde les élites, laisse à la recherche l'autre moitié de
+     * la limite pour repartir (au plus une relance par palier) */
+    pop->diversity = population_diversity(pop);
+    if (pop->stagnation_count == params.stagnation_limit / 2
+        && pop->diversity < params.restart_diversity && !must_stop()) {
+        printf("Relance a la generation %d (diversite %.3f)\n", pop->generation, pop->diversity);
+        restart_population(time_board, dist_board, pop);
+        pop->diversity = population_diversity(pop);
+    }
 
     /* Mettre à jour la meilleure solution */
-    new_pop.best_ever = new_pop.members[0];
-    if (new_pop.best_ever.fitness < pop->best_ever.fitness) {
-        new_pop.stagnation_count = 0;
+    best = &pop->members[pop->order[0]];
+    if (best->fitness < pop->best_ever.fitness) {
+        pop->stagnation_count = 0;
     } else {
-        new_pop.stagnation_count = pop->stagnation_count + 1;
+        pop->stagnation_count++;
     }
-
-    *pop = new_pop;
+    copy_individual(&pop->best_ever, best);
 }
 
 /* Affichage d'une solution */
@@ -600,30 +1113,102 @@ void print_solution(Solution* solution) {
     }
 }
 
-/* Résolution du VRP */
-void solve_vrp(Board time_board, Board dist_board, Solution* best_solution) {
-    Population pop;
-    int gen;
+/* Ajout d'un point à la trace de convergence */
+static void record_improvement(SolverStats* stats, double time, unsigned long long fitness) {
+    int i;
+
+    if (stats->trace_length == TRACE_CAPACITY) {
+        /* Un point sur deux est conservé, le dernier est remplacé par le nouveau */
+        for (i = 1; i < TRACE_CAPACITY / 2; i++) {
+            stats->trace_time[i] = stats->trace_time[2*i];
+            stats->trace_fitness[i] = stats->trace_fitness[2*i];
+        }
+        stats->trace_length = TRACE_CAPACITY / 2;
+    }
+    stats->trace_time[stats->trace_length] = time;
+    stats->trace_fitness[stats->trace_length] = fitness;
+    stats->trace_length++;
+}
+
+/* Motif d'arrêt de la résolution, NULL pour continuer */
+static const char* stop_reason(const Population* pop) {
+    if (pop->stagnation_count >= params.stagnation_limit) return "stagnation";
+    if (target_reached(pop->best_ever.fitness)) return "fitness cible atteinte";
+    if (time_is_up()) return "budget de temps epuise";
+    if (stop_requested()) return "arret demande";
+    return NULL;
+}
 
-    srand(time(NULL));
-    init_population(time_board, dist_board, &pop);
+/* Résolution du VRP (stats peut être NULL) */
+void solve_vrp(Board time_board, Board dist_board, Solution* best_solution, unsigned int seed, SolverStats* stats) {
+    Population* pop = create_population();
+    SolverStats local;
+    double start = wall_clock();
+    double now, last_report;
+    const char* reason;
+    int gen, last_generation = 0;
+
+    if (stats == NULL) stats = &local;
+    memset(stats, 0, sizeof(SolverStats));
+
+    if (pop == NULL) {
+        fprintf(stderr, "Erreur d'allocation de la population\n");
+        init_solution(best_solution);
+        return;
+    }
 
-    for (gen = 0; gen < MAX_GENERATIONS; gen++) {
-        evolve_population(time_board, dist_board, &pop);
+    srand(seed);
+    reset_route_cache_stats();
+    init_population(time_board, dist_board, pop);
+    stats->init_time = wall_clock() - start;
+    record_improvement(stats, stats->init_time, pop->best_ever.fitness);
+    report_progress(seed, 0, &pop->best_ever, 0.0, stats->init_time, 0);
+    last_report = wall_clock();
+
+    /* La population initiale peut déjà suffire (cible atteinte, budget épuisé) */
+    reason = stop_reason(pop);
+    if (reason != NULL) printf("Arret avant la premiere generation (%s)\n", reason);
+
+    for (gen = 0; reason == NULL && gen < MAX_GENERATIONS; gen++) {
+        unsigned long long previous = pop->best_ever.fitness;
+
+        evolve_population(time_board, dist_board, pop);
+        stats->generations++;
+        if (pop->best_ever.fitness < previous) {
+            record_improvement(stats, wall_clock() - start, pop->best_ever.fitness);
+        }
 
         if (gen % 100 == 0) {
-            printf("Generation %d: Fitness=%llu Vehicules=%d Duree=%d Distance=%d\n",
-                   gen, pop.best_ever.fitness,
-                   pop.best_ever.solution.num_vehicles,
-                   pop.best_ever.solution.total_duration,
-                   pop.best_ever.solution.total_distance);
+            printf("Generation %d: Fitness=%llu Vehicules=%d Duree=%d Distance=%d Diversite=%.3f\n",
+                   gen, pop->best_ever.fitness,
+                   pop->best_ever.solution.num_vehicles,
+                   pop->best_ever.solution.total_duration,
+                   pop->best_ever.solution.total_distance,
+                   pop->diversity);
         }
 
-        if (pop.stagnation_count >= STAGNATION_LIMIT) {
-            printf("Arret premature a la generation %d (stagnation)\n", gen);
+        if (progress_enabled() && (now = wall_clock()) - last_report >= PROGRESS_INTERVAL) {
+            report_progress(seed, stats->generations, &pop->best_ever,
+                            (stats->generations - last_generation) / (now - last_report), now - start, 0);
+            last_report = now;
+            last_generation = stats->generations;
+        }
+
+        reason = stop_reason(pop);
+        if (reason != NULL) {
+            printf("Arret premature a la generation %d (%s)\n", gen, reason);
             break;
         }
     }
-
-    *best_solution = pop.best_ever.solution;
-}
\ No newline at end of file
+    stats->elapsed = wall_clock() - start;
+    stats->restarts = pop->restarts;
+    stats->clones = pop->clones;
+    stats->diversity = pop->diversity;
+    stats->cache_hit_rate = route_cache_hit_rate();
+    report_progress(seed, stats->generations, &pop->best_ever,
+                    (stats->elapsed > stats->init_time) ? stats->generations / (stats->elapsed - stats->init_time) : 0.0,
+                    stats->elapsed, 1);
+
+    solution_copy(best_solution, &pop->best_ever.solution);
+    free_population(pop);
+}
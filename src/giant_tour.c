@@ -0,0 +1,157 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "giant_tour.h"
+#include "genetic.h"
+#include "route_cache.h"
+
+/* Tampons indexés par position dans le tour (0 à NUM_CITIES - 1) ou par ville */
+static long long* label = NULL;   /* coût optimal du découpage des k premières villes, -1 si inconnu */
+static int* pred = NULL;          /* début de la dernière route de ce découpage */
+static int* position = NULL;      /* position d'une ville dans parent1, -1 si hors segment */
+static int allocated = 0;
+
+void free_giant_tour(void) {
+    free(label);
+    free(pred);
+    free(position);
+    label = NULL;
+    pred = position = NULL;
+    allocated = 0;
+}
+
+static void allocate(void) {
+    if (allocated == NUM_CITIES) return;
+
+    free_giant_tour();
+    label = malloc(NUM_CITIES * sizeof(long long));
+    pred = malloc(NUM_CITIES * sizeof(int));
+    position = malloc(NUM_CITIES * sizeof(int));
+    if (label == NULL || pred == NULL || position == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    allocated = NUM_CITIES;
+}
+
+int solution_tour(const Solution* sol, int* tour) {
+    int r, i, n = 0;
+
+    for (r = 0; r < sol->num_vehicles; r++) {
+        for (i = 0; i < sol->routes[r].length; i++) {
+            if (n == NUM_CITIES - 1) return n + 1;  /* ville en double : tour invalide */
+            tour[n++] = sol->routes[r].path[i];
+        }
+    }
+    return n;
+}
+
+void split_tour(Board time_board, Board dist_board, const int* tour, Solution* sol) {
+    int n = NUM_CITIES - 1;
+    int i, j, k, r, first, last, distance, travel, duration, count;
+    long long cost;
+    Route* route;
+
+    allocate();
+    label[0] = 0;
+    for (j = 1; j <= n; j++) {
+        label[j] = -1;
+    }
+
+    /* Arc i -> j du graphe auxiliaire : route des villes tour[i..j-1] */
+    for (i = 0; i < n; i++) {
+        if (label[i] < 0) continue;
+        first = tour[i];
+        distance = dist_board[DEPOT][first];
+        travel = time_board[DEPOT][first] + SERVICE_TIME;
+
+        for (j = i + 1; j <= n; j++) {
+            last = tour[j-1];
+            if (j > i + 1) {
+                distance += dist_board[tour[j-2]][last];
+                travel += time_board[tour[j-2]][last] + SERVICE_TIME;
+                /* Le retour au dépôt ne peut que rallonger : les routes suivantes dépassent aussi */
+                if (travel > MAX_TIME) break;
+            }
+            duration = travel + time_board[last][DEPOT];
+            if (duration > MAX_TIME && j > i + 1) continue;
+
+            cost = label[i] + (long long)(distance + dist_board[last][DEPOT]) * 2 + VEHICLE_COST;
+            if (duration > MAX_TIME) cost += (long long)(duration - MAX_TIME) * DURATION_PENALTY;
+            if (label[j] < 0 || cost < label[j]) {
+                label[j] = cost;
+                pred[j] = i;
+            }
+        }
+    }
+
+    /* Nombre de routes, puis reconstruction de la dernière à la première */
+    count = 0;
+    for (j = n; j > 0; j = pred[j]) {
+        count++;
+    }
+
+    init_solution(sol);
+    for (r = 0; r < count; r++) {
+        solution_add_route(sol);
+    }
+    for (r = count - 1, j = n; r >= 0; r--, j = pred[j]) {
+        i = pred[j];
+        route = &sol->routes[r];
+        route_reserve(route, j - i);
+        route->length = j - i;
+        for (k = i; k < j; k++) {
+            route->path[k - i] = tour[k];
+        }
+        evaluate_route(time_board, dist_board, route);
+        sol->total_distance += route->distance;
+        sol->total_duration += route->duration;
+    }
+}
+
+void order_crossover(const int* parent1, const int* parent2, int* child, int start, int end) {
+    int n = NUM_CITIES - 1;
+    int k, pos, city;
+
+    allocate();
+    for (k = 0; k < NUM_CITIES; k++) {
+        position[k] = -1;
+    }
+    for (k = start; k <= end; k++) {
+        child[k] = parent1[k];
+        position[parent1[k]] = k;
+    }
+
+    /* Villes de parent2 à partir de la fin du segment, en boucle */
+    pos = (end + 1) % n;
+    for (k = 0; k < n; k++) {
+        city = parent2[(end + 1 + k) % n];
+        if (position[city] >= 0) continue;
+        child[pos] = city;
+        pos = (pos + 1) % n;
+    }
+}
+
+void pmx_crossover(const int* parent1, const int* parent2, int* child, int start, int end) {
+    int n = NUM_CITIES - 1;
+    int k, city;
+
+    allocate();
+    for (k = 0; k < NUM_CITIES; k++) {
+        position[k] = -1;
+    }
+    for (k = start; k <= end; k++) {
+        child[k] = parent1[k];
+        position[parent1[k]] = k;
+    }
+
+    /* Une ville déjà placée par le segment est remplacée par celle que
+     * parent2 met à sa place, jusqu'à sortir du segment */
+    for (k = 0; k < n; k++) {
+        if (k >= start && k <= end) continue;
+        city = parent2[k];
+        while (position[city] >= 0) {
+            city = parent2[position[city]];
+        }
+        child[k] = city;
+    }
+}
@@ -1,54 +1,169 @@
+#define _POSIX_C_SOURCE 200112L
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <unistd.h>
 #include "inout.h"
 #include "location.h"
 
 int NUM_CITIES = 0;
 
-int fread_board(const char* file, Board board) {
+/* Lecture d'une ligne complète, quelle que soit sa longueur (tampon agrandi
+ * au besoin). Retourne 0 en fin de fichier. */
+static int read_line(FILE* f, char** line, size_t* capacity) {
+    size_t length = 0;
+
+    if (*line == NULL) {
+        *capacity = 4096;
+        *line = malloc(*capacity);
+        if (*line == NULL) return 0;
+    }
+
+    while (fgets(*line + length, (int)(*capacity - length), f) != NULL) {
+        length += strlen(*line + length);
+        if (length > 0 && (*line)[length - 1] == '\n') return 1;
+        if (length + 1 == *capacity) {
+            char* bigger = realloc(*line, *capacity * 2);
+            if (bigger == NULL) return 0;
+            *line = bigger;
+            *capacity *= 2;
+        }
+    }
+    return length > 0;
+}
+
+/* Lecture d'une matrice CSV carrée (en-tête d'indices, puis une ligne par ville
+ * précédée de son indice). Retourne une matrice allouée et sa taille dans size,
+ * ou NULL en cas d'erreur. */
+Board fread_board(const char* file, int* size) {
     FILE* f = fopen(file, "r");
-    char line[MAX_LINE_LENGTH];
-    int row = 0;
-    int col;
-    char* token;
+    char* line = NULL;
+    size_t capacity = 0;
+    Board board;
+    int n = 0, row, col;
+    char* p;
+    char* end;
 
     if (f == NULL) {
         fprintf(stderr, "Erreur d'ouverture du fichier %s\n", file);
-        return 0;
+        return NULL;
     }
 
-    /* Lecture de la première ligne (en-tête) pour déterminer le nombre de villes */
-    if (fgets(line, MAX_LINE_LENGTH, f) == NULL) {
+    /* L'en-tête commence par une case vide : autant de villes que de virgules */
+    if (read_line(f, &line, &capacity)) {
+        for (p = line; *p != '\0'; p++) {
+            if (*p == ',') n++;
+        }
+    }
+    if (n == 0) {
         fprintf(stderr, "Fichier vide ou en-tête manquante\n");
+        free(line);
         fclose(f);
-        return 0;
+        return NULL;
+    }
+
+    board = board_new(n);
+
+    /* Lire les lignes de données */
+    for (row = 0; row < n; row++) {
+        if (!read_line(f, &line, &capacity)) {
+            fprintf(stderr, "%s : %d lignes lues sur %d\n", file, row, n);
+            break;
+        }
+        p = strchr(line, ',');  /* index ignoré */
+        for (col = 0; col < n && p != NULL; col++) {
+            board[row][col] = (int)strtol(p + 1, &end, 10);
+            p = strchr(end, ',');
+        }
+        if (col < n) {
+            fprintf(stderr, "%s : ligne %d incomplète (%d valeurs sur %d)\n", file, row + 1, col, n);
+            break;
+        }
+    }
+    free(line);
+    fclose(f);
+
+    if (row < n) {
+        board_free(board);
+        return NULL;
+    }
+    *size = n;
+    return board;
+}
+
+/* Début du champ index d'une ligne CSV (les virgules entre guillemets ne
+ * séparent pas les champs), NULL s'il manque */
+static const char* csv_field(const char* line, int index) {
+    int quoted = 0;
+    const char* p;
+
+    for (p = line; index > 0; p++) {
+        if (*p == '\0') return NULL;
+        if (*p == '"') quoted = !quoted;
+        else if (*p == ',' && !quoted) index--;
+    }
+    return p;
+}
+
+/* Position de la colonne name dans une ligne d'en-tête, -1 si absente */
+static int csv_column(const char* header, const char* name) {
+    size_t length = strlen(name);
+    const char* p;
+    int i;
+
+    for (i = 0; (p = csv_field(header, i)) != NULL; i++) {
+        if (*p == '"') p++;
+        if (strncmp(p, name, length) == 0 && strchr("\",\r\n", p[length]) != NULL) return i;
     }
+    return -1;
+}
+
+int read_coordinates(const char* file, int n, double* latitude, double* longitude) {
+    FILE* f = fopen(file, "r");
+    char* line = NULL;
+    size_t capacity = 0;
+    const char* field;
+    char* end;
+    int lat_col = -1, lon_col = -1, row;
 
-    /* Compter le nombre de colonnes (ignore la première cellule vide) */
-    token = strtok(line, ",");  /* Ce token est la case vide en début de ligne */
-    NUM_CITIES = 0;
-    while ((token = strtok(NULL, ",")) != NULL) {
-        NUM_CITIES++;
+    if (f == NULL) {
+        fprintf(stderr, "Erreur d'ouverture du fichier %s\n", file);
+        return 0;
     }
 
-    if (NUM_CITIES > MAX_CITIES) {
-        fprintf(stderr, "Trop de villes ! Max = %d\n", MAX_CITIES);
+    if (read_line(f, &line, &capacity)) {
+        lat_col = csv_column(line, "latitude");
+        lon_col = csv_column(line, "longitude");
+    }
+    if (lat_col < 0 || lon_col < 0) {
+        fprintf(stderr, "%s : colonnes latitude et longitude introuvables\n", file);
+        free(line);
         fclose(f);
         return 0;
     }
 
-    /* Lire les lignes de données */
-    while (fgets(line, MAX_LINE_LENGTH, f) != NULL && row < NUM_CITIES) {
-        col = 0;
-        token = strtok(line, ",");  /* index ignoré */
-        while ((token = strtok(NULL, ",")) != NULL && col < NUM_CITIES) {
-            board[row][col] = atoi(token);
-            col++;
+    for (row = 0; row < n; row++) {
+        if (!read_line(f, &line, &capacity)) {
+            fprintf(stderr, "%s : %d lignes lues sur %d\n", file, row, n);
+            break;
         }
-        row++;
+        field = csv_field(line, lat_col);
+        if (field == NULL) break;
+        latitude[row] = strtod(field, &end);
+        if (end == field) break;
+        field = csv_field(line, lon_col);
+        if (field == NULL) break;
+        longitude[row] = strtod(field, &end);
+        if (end == field) break;
     }
+    free(line);
     fclose(f);
+
+    if (row < n) {
+        fprintf(stderr, "%s : coordonnées invalides ligne %d\n", file, row + 1);
+        return 0;
+    }
     return 1;
 }
 
@@ -76,4 +191,73 @@ void write_solution(const char* filename, Solution* solution) {
     }
 
     fclose(f);
-}
\ No newline at end of file
+}
+
+/* Écriture complète d'un tampon sur un descripteur (tube entre processus) */
+int write_all(int fd, const void* buf, size_t size) {
+    const char* p = (const char*)buf;
+    while (size > 0) {
+        ssize_t n = write(fd, p, size);
+        if (n <= 0) return 0;
+        p += n;
+        size -= (size_t)n;
+    }
+    return 1;
+}
+
+/* Lecture complète d'un tampon depuis un descripteur */
+int read_all(int fd, void* buf, size_t size) {
+    char* p = (char*)buf;
+    while (size > 0) {
+        ssize_t n = read(fd, p, size);
+        if (n <= 0) return 0;
+        p += n;
+        size -= (size_t)n;
+    }
+    return 1;
+}
+
+/* Transmission d'une solution entre processus : en-tête puis chaque route
+ * (longueur, coûts, chemin) */
+int send_solution(int fd, Solution* solution) {
+    int r;
+
+    if (!write_all(fd, &solution->num_vehicles, sizeof(int))
+        || !write_all(fd, &solution->total_duration, sizeof(int))
+        || !write_all(fd, &solution->total_distance, sizeof(int))
+        || !write_all(fd, &solution->coverage_penalty, sizeof(unsigned long long))) return 0;
+
+    for (r = 0; r < solution->num_vehicles; r++) {
+        Route* route = &solution->routes[r];
+        if (!write_all(fd, &route->length, sizeof(int))
+            || !write_all(fd, &route->duration, sizeof(int))
+            || !write_all(fd, &route->distance, sizeof(int))
+            || !write_all(fd, route->path, route->length * sizeof(int))) return 0;
+    }
+    return 1;
+}
+
+/* Réception dans une solution existante (ses tampons sont réutilisés) */
+int recv_solution(int fd, Solution* solution) {
+    int num_vehicles, r;
+
+    if (!read_all(fd, &num_vehicles, sizeof(int))) return 0;
+
+    solution->num_vehicles = 0;
+    for (r = 0; r < num_vehicles; r++) {
+        solution_add_route(solution);
+    }
+    if (!read_all(fd, &solution->total_duration, sizeof(int))
+        || !read_all(fd, &solution->total_distance, sizeof(int))
+        || !read_all(fd, &solution->coverage_penalty, sizeof(unsigned long long))) return 0;
+
+    for (r = 0; r < num_vehicles; r++) {
+        Route* route = &solution->routes[r];
+        if (!read_all(fd, &route->length, sizeof(int))) return 0;
+        route_reserve(route, route->length);
+        if (!read_all(fd, &route->duration, sizeof(int))
+            || !read_all(fd, &route->distance, sizeof(int))
+            || !read_all(fd, route->path, route->length * sizeof(int))) return 0;
+    }
+    return 1;
+}
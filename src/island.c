@@ -0,0 +1,271 @@
+#define _POSIX_C_SOURCE 200112L
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include "island.h"
+#include "inout.h"
+#include "genetic.h"
+#include "progress.h"
+#include "location.h"
+#include "diversity.h"
+
+/* Message d'une île vers le coordinateur à chaque migration */
+typedef struct {
+    int generation;
+    int count;
+} MigrationHeader;
+
+int parse_topology(const char* name, Topology* topology) {
+    if (strcmp(name, "ring") == 0) {
+        *topology = TOPOLOGY_RING;
+    } else if (strcmp(name, "full") == 0) {
+        *topology = TOPOLOGY_FULL;
+    } else {
+        return 0;
+    }
+    return 1;
+}
+
+/* Envoi de count individus, dans l'ordre de order si fourni */
+static int send_individuals(int fd, Individual* members, const int* order, int count) {
+    int i;
+    for (i = 0; i < count; i++) {
+        Individual* indiv = &members[(order != NULL) ? order[i] : i];
+        if (!write_all(fd, &indiv->fitness, sizeof(indiv->fitness))
+            || !send_solution(fd, &indiv->solution)) return 0;
+    }
+    return 1;
+}
+
+static int recv_individuals(int fd, Individual* members, int count) {
+    int i;
+    for (i = 0; i < count; i++) {
+        if (!read_all(fd, &members[i].fitness, sizeof(members[i].fitness))
+            || !recv_solution(fd, &members[i].solution)) return 0;
+        members[i].hash = solution_hash(&members[i].solution);
+    }
+    return 1;
+}
+
+/* Les immigrants remplacent les pires individus de la population */
+static void receive_migrants(Population* pop, Individual* migrants, int count) {
+    Individual* best;
+    int i;
+
+    for (i = 0; i < count; i++) {
+        copy_individual(&pop->members[pop->order[pop->size - 1 - i]], &migrants[i]);
+    }
+    sort_population(pop);
+
+    best = &pop->members[pop->order[0]];
+    if (best->fitness < pop->best_ever.fitness) {
+        copy_individual(&pop->best_ever, best);
+        pop->stagnation_count = 0;
+    }
+}
+
+static void free_individuals(Individual* members, int count) {
+    int i;
+
+    if (members == NULL) return;
+    for (i = 0; i < count; i++) {
+        solution_free(&members[i].solution);
+    }
+    free(members);
+}
+
+/* Boucle d'une île : évolution locale, arrêt décidé par le coordinateur */
+static void island_worker(Board time_board, Board dist_board, const IslandConfig* config,
+                          unsigned int seed, int up_fd, int down_fd) {
+    Population* pop = create_population();
+    Individual* migrants = calloc(config->migrants, sizeof(Individual));
+    MigrationHeader header;
+    int gen, go_on;
+
+    if (pop == NULL || migrants == NULL) {
+        free_population(pop);
+        free(migrants);
+        return;
+    }
+
+    srand(seed);
+    init_population(time_board, dist_board, pop);
+
+    for (gen = 1; gen <= MAX_GENERATIONS; gen++) {
+        evolve_population(time_board, dist_board, pop);
+
+        /* Hors migration, seul un arrêt imminent fait remonter l'île au coordinateur */
+        if (gen % config->migration_interval != 0 && gen != MAX_GENERATIONS
+            && !target_reached(pop->best_ever.fitness) && !time_is_up() && !stop_requested()) continue;
+
+        /* Envoi des meilleurs individus (population triée) */
+        header.generation = gen;
+        header.count = config->migrants;
+        if (!write_all(up_fd, &header, sizeof(header))
+            || !send_individuals(up_fd, pop->members, pop->order, config->migrants)) break;
+
+        /* Réponse du coordinateur : poursuite et immigrants */
+        if (!read_all(down_fd, &go_on, sizeof(go_on)) || !go_on) break;
+        if (!read_all(down_fd, &header, sizeof(header)) || header.count > config->migrants
+            || !recv_individuals(down_fd, migrants, header.count)) break;
+        receive_migrants(pop, migrants, header.count);
+    }
+
+    free_individuals(migrants, config->migrants);
+    free_population(pop);
+}
+
+/* Choix des immigrants de l'île i selon la topologie
+ * (copies superficielles : out partage les tampons de received) */
+static int select_migrants(const IslandConfig* config, Individual* received, int island, Individual* out) {
+    int n = config->islands, m = config->migrants;
+    int i, j, count = 0;
+
+    if (config->topology == TOPOLOGY_RING) {
+        int from = (island - 1 + n) % n;
+        for (i = 0; i < m; i++) {
+            out[count++] = received[from * m + i];
+        }
+        return count;
+    }
+
+    /* Topologie complète : les m meilleurs migrants de toutes les autres îles */
+    for (i = 0; i < n; i++) {
+        if (i == island) continue;
+        for (j = 0; j < m; j++) {
+            out[count++] = received[i * m + j];
+        }
+    }
+    qsort(out, count, sizeof(Individual), compare_individuals);
+    return (count < m) ? count : m;
+}
+
+int island_solve(Board time_board, Board dist_board, const IslandConfig* config,
+                 unsigned int seed, Individual* best) {
+    int n = config->islands, m = config->migrants;
+    pid_t* pids = malloc(n * sizeof(pid_t));
+    int* up = malloc(n * sizeof(int));
+    int* down = malloc(n * sizeof(int));
+    Individual* received = calloc(n * m, sizeof(Individual));
+    Individual* outgoing = malloc((n - 1) * m * sizeof(Individual));
+    MigrationHeader header;
+    int best_island = -1, stagnation = 0, generation = 0, alive = 0, last_generation = 0;
+    int i, j, go_on, improved;
+    double start = wall_clock(), last_report = start, now;
+
+    best->fitness = 0;
+
+    for (i = 0; i < n; i++) {
+        int to_parent[2], to_child[2];
+
+        if (pipe(to_parent) != 0 || pipe(to_child) != 0) {
+            perror("pipe");
+            break;
+        }
+        fflush(stdout);
+        fflush(stderr);
+
+        pids[i] = fork();
+        if (pids[i] == 0) {
+            close(to_parent[0]);
+            close(to_child[1]);
+            for (j = 0; j < i; j++) {
+                close(up[j]);
+                close(down[j]);
+            }
+            island_worker(time_board, dist_board, config, seed + (unsigned int)i, to_parent[1], to_child[0]);
+            fflush(stdout);
+            _exit(0);
+        }
+        close(to_parent[1]);
+        close(to_child[0]);
+        if (pids[i] < 0) {
+            perror("fork");
+            close(to_parent[0]);
+            close(to_child[1]);
+            break;
+        }
+        up[i] = to_parent[0];
+        down[i] = to_child[1];
+        alive++;
+    }
+
+    /* Coordination : une époque par migration */
+    go_on = (alive == n);
+    while (go_on) {
+        improved = 0;
+        for (i = 0; i < n; i++) {
+            if (!read_all(up[i], &header, sizeof(header)) || header.count != m
+                || !recv_individuals(up[i], &received[i * m], m)) {
+                fprintf(stderr, "Ile %d interrompue\n", i);
+                go_on = 0;
+                break;
+            }
+            if (best_island == -1 || received[i * m].fitness < best->fitness) {
+                copy_individual(best, &received[i * m]);
+                best_island = i;
+                improved = 1;
+            }
+        }
+        if (!go_on) break;
+
+        stagnation = improved ? 0 : stagnation + config->migration_interval;
+        generation = header.generation;
+
+        if (generation % 100 < config->migration_interval) {
+            printf("Generation %d: Fitness=%llu Vehicules=%d Duree=%d Distance=%d (ile %d)\n",
+                   generation, best->fitness, best->solution.num_vehicles,
+                   best->solution.total_duration, best->solution.total_distance, best_island + 1);
+        }
+
+        if (stagnation >= ga_params()->stagnation_limit) {
+            printf("Arret premature a la generation %d (stagnation globale)\n", generation);
+            go_on = 0;
+        } else if (generation >= MAX_GENERATIONS) {
+            go_on = 0;
+        } else if (target_reached(best->fitness)) {
+            printf("Arret premature a la generation %d (fitness cible atteinte)\n", generation);
+            go_on = 0;
+        } else if (time_is_up()) {
+            printf("Arret premature a la generation %d (budget de temps epuise)\n", generation);
+            go_on = 0;
+        } else if (stop_requested()) {
+            printf("Arret premature a la generation %d (arret demande)\n", generation);
+            go_on = 0;
+        }
+
+        /* Progression du modèle en îles : meilleur individu toutes îles confondues */
+        now = wall_clock();
+        if (progress_enabled() && (now - last_report >= PROGRESS_INTERVAL || !go_on)) {
+            report_progress(seed + (unsigned int)best_island, generation, best,
+                            (generation - last_generation) / (now - last_report), now - start, !go_on);
+            last_report = now;
+            last_generation = generation;
+        }
+
+        for (i = 0; i < n; i++) {
+            write_all(down[i], &go_on, sizeof(go_on));
+            if (!go_on) continue;
+            header.count = select_migrants(config, received, i, outgoing);
+            write_all(down[i], &header, sizeof(header));
+            send_individuals(down[i], outgoing, NULL, header.count);
+        }
+    }
+
+    for (i = 0; i < alive; i++) {
+        close(up[i]);
+        close(down[i]);
+        waitpid(pids[i], NULL, 0);
+    }
+
+    free(pids);
+    free(up);
+    free(down);
+    free_individuals(received, n * m);
+    free(outgoing);
+    return best_island;
+}
@@ -0,0 +1,408 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "local_search.h"
+#include "candidates.h"
+#include "genetic.h"
+
+/* Position de chaque ville et cumuls le long de sa route, indexés par ville :
+ *   fdist[c]  distance depuis le dépôt jusqu'à c dans le sens de la route
+ *   rdist[c]  distance des arcs entre la première ville et c parcourus à l'envers
+ *   ftime, rtime  mêmes cumuls en temps de trajet (service non compris)
+ * Le coût d'un segment [s, e] vaut fdist[e] - fdist[s] à l'endroit et
+ * rdist[e] - rdist[s] à l'envers. */
+static int* route_of = NULL;
+static int* pos_of = NULL;
+static int* fdist = NULL;
+static int* rdist = NULL;
+static int* ftime = NULL;
+static int* rtime = NULL;
+static char* dont_look = NULL;
+static int* buffer = NULL;     /* segment en cours de déplacement */
+static int allocated = 0;
+
+void free_local_search(void) {
+    free(route_of);
+    free(pos_of);
+    free(fdist);
+    free(rdist);
+    free(ftime);
+    free(rtime);
+    free(dont_look);
+    free(buffer);
+    route_of = pos_of = fdist = rdist = ftime = rtime = buffer = NULL;
+    dont_look = NULL;
+    allocated = 0;
+}
+
+static void allocate(void) {
+    if (allocated == NUM_CITIES) return;
+
+    free_local_search();
+    route_of = malloc(NUM_CITIES * sizeof(int));
+    pos_of = malloc(NUM_CITIES * sizeof(int));
+    fdist = malloc(NUM_CITIES * sizeof(int));
+    rdist = malloc(NUM_CITIES * sizeof(int));
+    ftime = malloc(NUM_CITIES * sizeof(int));
+    rtime = malloc(NUM_CITIES * sizeof(int));
+    dont_look = malloc(NUM_CITIES);
+    buffer = malloc(NUM_CITIES * sizeof(int));
+    if (route_of == NULL || pos_of == NULL || fdist == NULL || rdist == NULL
+        || ftime == NULL || rtime == NULL || dont_look == NULL || buffer == NULL) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    allocated = NUM_CITIES;
+}
+
+/* Ville en position k, le dépôt avant la première et après la dernière */
+static int node_at(const Route* route, int k) {
+    return (k < 0 || k >= route->length) ? DEPOT : route->path[k];
+}
+
+/* Cumul aller jusqu'à la position k (0 au dépôt de départ) */
+static int forward(const int* cumul, const Route* route, int k) {
+    return (k < 0) ? 0 : cumul[route->path[k]];
+}
+
+/* Part d'une route dans la fitness (route vide : aucun véhicule) */
+static long long route_cost(int distance, int duration, int length) {
+    long long cost;
+
+    if (length == 0) return 0;
+    cost = (long long)distance * 2 + VEHICLE_COST;
+    if (duration > MAX_TIME) cost += (long long)(duration - MAX_TIME) * DURATION_PENALTY;
+    return cost;
+}
+
+static long long current_cost(const Route* route) {
+    return route_cost(route->distance, route->duration, route->length);
+}
+
+/* Positions, cumuls et coûts de la route r recalculés (totaux de la solution compris) */
+static void index_route(Board time_board, Board dist_board, Solution* sol, int r) {
+    Route* route = &sol->routes[r];
+    int k, c, prev = DEPOT;
+    int fd = 0, rd = 0, ft = 0, rt = 0;
+    int distance = 0, duration = 0;
+
+    for (k = 0; k < route->length; k++) {
+        c = route->path[k];
+        fd += dist_board[prev][c];
+        ft += time_board[prev][c];
+        if (k > 0) {
+            rd += dist_board[c][prev];
+            rt += time_board[c][prev];
+        }
+        route_of[c] = r;
+        pos_of[c] = k;
+        fdist[c] = fd;
+        rdist[c] = rd;
+        ftime[c] = ft;
+        rtime[c] = rt;
+        prev = c;
+    }
+    if (route->length > 0) {
+        distance = fd + dist_board[prev][DEPOT];
+        duration = ft + time_board[prev][DEPOT] + route->length * SERVICE_TIME;
+    }
+
+    sol->total_distance += distance - route->distance;
+    sol->total_duration += duration - route->duration;
+    route->distance = distance;
+    route->duration = duration;
+}
+
+static void wake(int city) {
+    if (city != DEPOT) dont_look[city] = 0;
+}
+
+/* Segment de length villes à partir de la position i de r1 inséré avant ou après v (route r2) */
+static void apply_or_opt(Board time_board, Board dist_board, Solution* sol,
+                         int r1, int i, int length, int r2, int v, int after) {
+    Route* from = &sol->routes[r1];
+    Route* to = &sol->routes[r2];
+    int pos = pos_of[v];
+
+    memcpy(buffer, &from->path[i], length * sizeof(int));
+    memmove(&from->path[i], &from->path[i + length], (from->length - i - length) * sizeof(int));
+    from->length -= length;
+
+    if (r1 == r2 && pos > i) pos -= length;
+    if (after) pos++;
+
+    route_reserve(to, to->length + length);
+    memmove(&to->path[pos + length], &to->path[pos], (to->length - pos) * sizeof(int));
+    memcpy(&to->path[pos], buffer, length * sizeof(int));
+    to->length += length;
+
+    index_route(time_board, dist_board, sol, r1);
+    if (r2 != r1) index_route(time_board, dist_board, sol, r2);
+}
+
+/* Relocate (length 1) et Or-opt : segment commençant par u placé après ou avant v */
+static int try_or_opt(Board time_board, Board dist_board, Solution* sol, int u, int v, int length) {
+    int r1 = route_of[u], r2 = route_of[v];
+    Route* from = &sol->routes[r1];
+    Route* to = &sol->routes[r2];
+    int i = pos_of[u], end = pos_of[u] + length - 1;
+    int last, a, b, x, y, side;
+    int inner_dist, inner_time, removed_dist, removed_time, added_dist, added_time;
+    long long gain;
+
+    if (end >= from->length) return 0;
+    if (r1 == r2 && pos_of[v] >= i && pos_of[v] <= end) return 0;
+
+    last = from->path[end];
+    a = node_at(from, i - 1);
+    b = node_at(from, end + 1);
+    /* Le segment emporte ses arcs internes et ses temps de service */
+    inner_dist = fdist[last] - fdist[u];
+    inner_time = ftime[last] - ftime[u] + length * SERVICE_TIME;
+    removed_dist = dist_board[a][b] - dist_board[a][u] - dist_board[last][b] - inner_dist;
+    removed_time = time_board[a][b] - time_board[a][u] - time_board[last][b] - inner_time;
+
+    for (side = 0; side < 2; side++) {
+        /* Après v (arc v -> suivante) puis avant v (arc précédente -> v) ;
+         * la position actuelle du segment est exclue */
+        if (side == 0) {
+            if (v == a) continue;
+            x = v;
+            y = node_at(to, pos_of[v] + 1);
+        } else {
+            if (v == b) continue;
+            x = node_at(to, pos_of[v] - 1);
+            y = v;
+        }
+        added_dist = dist_board[x][u] + dist_board[last][y] - dist_board[x][y] + inner_dist;
+        added_time = time_board[x][u] + time_board[last][y] - time_board[x][y] + inner_time;
+
+        if (r1 == r2) {
+            gain = current_cost(from)
+                 - route_cost(from->distance + removed_dist + added_dist,
+                              from->duration + removed_time + added_time, from->length);
+        } else {
+            gain = current_cost(from) + current_cost(to)
+                 - route_cost(from->distance + removed_dist, from->duration + removed_time, from->length - length)
+                 - route_cost(to->distance + added_dist, to->duration + added_time, to->length + length);
+        }
+
+        if (gain > 0) {
+            apply_or_opt(time_board, dist_board, sol, r1, i, length, r2, v, side == 0);
+            wake(a);
+            wake(b);
+            wake(x);
+            wake(y);
+            wake(u);
+            wake(last);
+            return 1;
+        }
+    }
+    return 0;
+}
+
+/* Échange des villes u et w */
+static int try_swap(Board time_board, Board dist_board, Solution* sol, int u, int w) {
+    int r1, r2, i, j, pu, nu, pw, nw;
+    int du, tu, dw, tw;
+    Route* ru;
+    Route* rw;
+    long long gain;
+
+    if (w == DEPOT || w == u) return 0;
+
+    r1 = route_of[u];
+    r2 = route_of[w];
+    i = pos_of[u];
+    j = pos_of[w];
+    /* Villes consécutives : déjà couvert par le relocate */
+    if (r1 == r2 && (i - j == 1 || j - i == 1)) return 0;
+
+    ru = &sol->routes[r1];
+    rw = &sol->routes[r2];
+    pu = node_at(ru, i - 1);
+    nu = node_at(ru, i + 1);
+    pw = node_at(rw, j - 1);
+    nw = node_at(rw, j + 1);
+
+    du = dist_board[pu][w] + dist_board[w][nu] - dist_board[pu][u] - dist_board[u][nu];
+    tu = time_board[pu][w] + time_board[w][nu] - time_board[pu][u] - time_board[u][nu];
+    dw = dist_board[pw][u] + dist_board[u][nw] - dist_board[pw][w] - dist_board[w][nw];
+    tw = time_board[pw][u] + time_board[u][nw] - time_board[pw][w] - time_board[w][nw];
+
+    if (r1 == r2) {
+        gain = current_cost(ru) - route_cost(ru->distance + du + dw, ru->duration + tu + tw, ru->length);
+    } else {
+        gain = current_cost(ru) + current_cost(rw)
+             - route_cost(ru->distance + du, ru->duration + tu, ru->length)
+             - route_cost(rw->distance + dw, rw->duration + tw, rw->length);
+    }
+    if (gain <= 0) return 0;
+
+    ru->path[i] = w;
+    rw->path[j] = u;
+    index_route(time_board, dist_board, sol, r1);
+    if (r2 != r1) index_route(time_board, dist_board, sol, r2);
+    wake(pu);
+    wake(nu);
+    wake(pw);
+    wake(nw);
+    wake(u);
+    wake(w);
+    return 1;
+}
+
+/* Variation de distance et de temps de l'inversion des positions [s, e] d'une route */
+static void reverse_delta(Board time_board, Board dist_board, const Route* route, int s, int e,
+                          int* d_distance, int* d_time) {
+    int first = route->path[s], last = route->path[e];
+    int before = node_at(route, s - 1), after = node_at(route, e + 1);
+
+    *d_distance = dist_board[before][last] + dist_board[first][after]
+                - dist_board[before][first] - dist_board[last][after]
+                + (rdist[last] - rdist[first]) - (fdist[last] - fdist[first]);
+    *d_time = time_board[before][last] + time_board[first][after]
+            - time_board[before][first] - time_board[last][after]
+            + (rtime[last] - rtime[first]) - (ftime[last] - ftime[first]);
+}
+
+/* 2-opt dans une route : inversion créant l'arc u -> v (u placée avant v) */
+static int try_two_opt(Board time_board, Board dist_board, Solution* sol, int u, int v) {
+    int r = route_of[u];
+    Route* route = &sol->routes[r];
+    int i = pos_of[u], j = pos_of[v];
+    int variant, s, e, a, b, temp, d_distance, d_time;
+
+    if (i >= j) return 0;
+
+    /* u devient la précédente du segment inversé [i+1, j],
+     * ou v la suivante du segment inversé [i, j-1] */
+    for (variant = 0; variant < 2; variant++) {
+        s = (variant == 0) ? i + 1 : i;
+        e = (variant == 0) ? j : j - 1;
+        if (s >= e) continue;
+
+        reverse_delta(time_board, dist_board, route, s, e, &d_distance, &d_time);
+        if (current_cost(route) - route_cost(route->distance + d_distance, route->duration + d_time,
+                                             route->length) <= 0) continue;
+
+        wake(node_at(route, s - 1));
+        wake(node_at(route, e + 1));
+        wake(route->path[s]);
+        wake(route->path[e]);
+        for (a = s, b = e; a < b; a++, b--) {
+            temp = route->path[a];
+            route->path[a] = route->path[b];
+            route->path[b] = temp;
+        }
+        index_route(time_board, dist_board, sol, r);
+        return 1;
+    }
+    return 0;
+}
+
+/* 2-opt* entre deux routes : arc u -> v, les fins de routes sont échangées
+ *   route de u : début jusqu'à u, puis v et la suite de sa route
+ *   route de v : début jusqu'à la précédente de v, puis la suite de u */
+static int try_two_opt_star(Board time_board, Board dist_board, Solution* sol, int u, int v) {
+    int r1 = route_of[u], r2 = route_of[v];
+    Route* ru = &sol->routes[r1];
+    Route* rv = &sol->routes[r2];
+    int i = pos_of[u], j = pos_of[v];
+    int pv = node_at(rv, j - 1), nu = node_at(ru, i + 1);
+    int travel_u = ru->duration - ru->length * SERVICE_TIME;
+    int travel_v = rv->duration - rv->length * SERVICE_TIME;
+    int length1 = i + 1 + rv->length - j;
+    int length2 = j + ru->length - i - 1;
+    int distance1, time1, distance2, time2, tail;
+    long long gain;
+
+    distance1 = fdist[u] + dist_board[u][v] + (rv->distance - fdist[v]);
+    time1 = ftime[u] + time_board[u][v] + (travel_v - ftime[v]) + length1 * SERVICE_TIME;
+    distance2 = forward(fdist, rv, j - 1) + dist_board[pv][nu] + ((nu == DEPOT) ? 0 : ru->distance - fdist[nu]);
+    time2 = forward(ftime, rv, j - 1) + time_board[pv][nu] + ((nu == DEPOT) ? 0 : travel_u - ftime[nu])
+          + length2 * SERVICE_TIME;
+
+    gain = current_cost(ru) + current_cost(rv)
+         - route_cost(distance1, time1, length1) - route_cost(distance2, time2, length2);
+    if (gain <= 0) return 0;
+
+    /* Fin de la route de u mise de côté, remplacée par la fin de celle de v */
+    tail = ru->length - i - 1;
+    memcpy(buffer, &ru->path[i + 1], tail * sizeof(int));
+    route_reserve(ru, length1);
+    memcpy(&ru->path[i + 1], &rv->path[j], (rv->length - j) * sizeof(int));
+    ru->length = length1;
+    route_reserve(rv, length2);
+    memcpy(&rv->path[j], buffer, tail * sizeof(int));
+    rv->length = length2;
+
+    index_route(time_board, dist_board, sol, r1);
+    index_route(time_board, dist_board, sol, r2);
+    wake(u);
+    wake(v);
+    wake(pv);
+    wake(nu);
+    return 1;
+}
+
+/* Premier mouvement améliorant autour de u, 1 s'il a été appliqué */
+static int improve_city(Board time_board, Board dist_board, Solution* sol, int u) {
+    const int* neighbors = city_neighbors(u);
+    Route* route;
+    int k, v, length;
+
+    for (k = 0; k < neighbor_count(); k++) {
+        v = neighbors[k];
+        if (route_of[v] < 0) continue;
+
+        for (length = 1; length <= OR_OPT_MAX_LENGTH; length++) {
+            if (try_or_opt(time_board, dist_board, sol, u, v, length)) return 1;
+        }
+
+        /* u prend la place de la suivante ou de la précédente de v */
+        route = &sol->routes[route_of[v]];
+        if (try_swap(time_board, dist_board, sol, u, node_at(route, pos_of[v] + 1))) return 1;
+        if (try_swap(time_board, dist_board, sol, u, node_at(route, pos_of[v] - 1))) return 1;
+
+        if (route_of[u] == route_of[v]) {
+            if (try_two_opt(time_board, dist_board, sol, u, v)) return 1;
+        } else {
+            if (try_two_opt_star(time_board, dist_board, sol, u, v)) return 1;
+        }
+    }
+    return 0;
+}
+
+int local_search(Board time_board, Board dist_board, Solution* sol) {
+    int moves = 0, improved, c, r;
+
+    if (neighbor_count() == 0) return 0;
+    allocate();
+
+    for (c = 0; c < NUM_CITIES; c++) {
+        route_of[c] = -1;
+        dont_look[c] = 0;
+    }
+    for (r = 0; r < sol->num_vehicles; r++) {
+        index_route(time_board, dist_board, sol, r);
+    }
+
+    do {
+        improved = 0;
+        for (c = 0; c < NUM_CITIES; c++) {
+            if (c == DEPOT || dont_look[c] || route_of[c] < 0) continue;
+            if (improve_city(time_board, dist_board, sol, c)) {
+                moves++;
+                improved = 1;
+            } else {
+                dont_look[c] = 1;
+            }
+        }
+    } while (improved);
+
+    for (r = sol->num_vehicles - 1; r >= 0; r--) {
+        if (sol->routes[r].length == 0) solution_drop_route(sol, r);
+    }
+    return moves;
+}
@@ -1,14 +1,53 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include "location.h"
 
-void initBoard(Board board) {
-    int i, j;
-    for (i = 0; i < MAX_CITIES; i++) {
-        for (j = 0; j < MAX_CITIES; j++) {
-            board[i][j] = (i == j) ? 0 : -1;
-        }
+static void* xrealloc(void* ptr, size_t size) {
+    void* p = realloc(ptr, size);
+    if (p == NULL && size > 0) {
+        fprintf(stderr, "Erreur d'allocation memoire\n");
+        exit(EXIT_FAILURE);
+    }
+    return p;
+}
+
+/* Pointeurs de lignes sur une matrice n x n contiguë existante (sans copie) */
+Board board_wrap(int* data, int n) {
+    Board board = xrealloc(NULL, (n > 0 ? n : 1) * sizeof(int*));
+    int i;
+
+    for (i = 0; i < n; i++) {
+        board[i] = data + (size_t)i * n;
+    }
+    return board;
+}
+
+/* Nouvelle matrice n x n (0 sur la diagonale, -1 ailleurs) */
+Board board_new(int n) {
+    int* data = xrealloc(NULL, ((size_t)n * n > 0 ? (size_t)n * n : 1) * sizeof(int));
+    Board board;
+    size_t k;
+
+    for (k = 0; k < (size_t)n * n; k++) {
+        data[k] = (k % (n + 1) == 0) ? 0 : -1;
     }
+    board = board_wrap(data, n);
+    board[0] = data;  /* Garde le bloc de données même pour n = 0 */
+    return board;
+}
+
+/* Libère une matrice créée par board_new */
+void board_free(Board board) {
+    if (board == NULL) return;
+    free(board[0]);
+    free(board);
+}
+
+/* Libère les pointeurs de lignes d'une matrice créée par board_wrap
+ * (les données appartiennent à l'appelant) */
+void board_release(Board board) {
+    free(board);
 }
 
 void display_board(Board board) {
@@ -33,4 +72,86 @@ void display_board(Board board) {
     if (NUM_CITIES > 5) {
         printf("[...] (Matrice de %d x %d)\n", NUM_CITIES, NUM_CITIES);
     }
-}
\ No newline at end of file
+}
+
+void solution_new(Solution* solution) {
+    memset(solution, 0, sizeof(Solution));
+}
+
+void solution_free(Solution* solution) {
+    int r;
+    for (r = 0; r < solution->capacity; r++) {
+        free(solution->routes[r].path);
+    }
+    free(solution->routes);
+    solution_new(solution);
+}
+
+/* Garantit au moins capacity places dans le chemin d'une route */
+void route_reserve(Route* route, int capacity) {
+    int size = (route->capacity > 0) ? route->capacity : 8;
+
+    if (capacity <= route->capacity) return;
+    while (size < capacity) size *= 2;
+    route->path = xrealloc(route->path, size * sizeof(int));
+    route->capacity = size;
+}
+
+static void solution_reserve(Solution* solution, int capacity) {
+    int size = (solution->capacity > 0) ? solution->capacity : 4;
+
+    if (capacity <= solution->capacity) return;
+    while (size < capacity) size *= 2;
+    solution->routes = xrealloc(solution->routes, size * sizeof(Route));
+    memset(solution->routes + solution->capacity, 0, (size - solution->capacity) * sizeof(Route));
+    solution->capacity = size;
+}
+
+/* Ajoute une route vide en fin de solution et retourne son indice */
+int solution_add_route(Solution* solution) {
+    Route* route;
+
+    solution_reserve(solution, solution->num_vehicles + 1);
+    route = &solution->routes[solution->num_vehicles];
+    route->length = 0;
+    route->duration = 0;
+    route->distance = 0;
+    return solution->num_vehicles++;
+}
+
+/* Retire la route r (son tampon est conservé en fin de tableau pour réutilisation) */
+void solution_drop_route(Solution* solution, int r) {
+    Route removed = solution->routes[r];
+    int i;
+
+    solution->total_duration -= removed.duration;
+    solution->total_distance -= removed.distance;
+    for (i = r; i < solution->num_vehicles - 1; i++) {
+        solution->routes[i] = solution->routes[i+1];
+    }
+    solution->routes[--solution->num_vehicles] = removed;
+}
+
+/* Copie profonde réutilisant les tampons déjà alloués dans dst */
+void solution_copy(Solution* dst, const Solution* src) {
+    int r;
+
+    if (dst == src) return;
+    solution_reserve(dst, src->num_vehicles);
+    for (r = 0; r < src->num_vehicles; r++) {
+        Route* to = &dst->routes[r];
+        const Route* from = &src->routes[r];
+
+        route_reserve(to, from->length);
+        if (from->length > 0) {
+            memcpy(to->path, from->path, from->length * sizeof(int));
+        }
+        to->length = from->length;
+        to->duration = from->duration;
+        to->distance = from->distance;
+    }
+    dst->num_vehicles = src->num_vehicles;
+    dst->total_duration = src->total_duration;
+    dst->total_distance = src->total_distance;
+    dst->coverage_penalty = src->coverage_penalty;
+}
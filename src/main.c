@@ -1,38 +1,188 @@
+#define _POSIX_C_SOURCE 200112L
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <time.h>
 #include <limits.h>
+#include <fcntl.h>
+#include <unistd.h>
 #include "inout.h"
 #include "location.h"
 #include "genetic.h"
+#include "multistart.h"
+#include "island.h"
+#include "candidates.h"
+#include "construction.h"
+#include "progress.h"
+#include "params.h"
+#include "local_search.h"
+#include "giant_tour.h"
+#include "diversity.h"
+#include "route_cache.h"
+
+static void usage(const char* prog) {
+    printf("Usage: %s [options] time_file.csv distance_file.csv\n", prog);
+    printf("  -r runs       nombre d'executions independantes (defaut 3)\n");
+    printf("  -j jobs       executions en parallele (defaut: nombre de coeurs)\n");
+    printf("  -s seed       graine de la premiere execution (les suivantes: seed+1, ...)\n");
+    printf("  -i islands    modele en iles: nombre de populations (remplace -r/-j)\n");
+    printf("  -g gens       generations entre deux migrations (defaut 20)\n");
+    printf("  -m migrants   individus migrants par ile (defaut 5)\n");
+    printf("  -T topology   topologie de migration: ring ou full (defaut ring)\n");
+    printf("  -k neighbors  voisines candidates par ville pour les insertions (0: recherche complete,\n");
+    printf("                defaut: %d au-dela de %d villes, recherche complete sinon)\n",
+           DEFAULT_NEIGHBORS, DEFAULT_NEIGHBORS * MIN_CITIES_PER_NEIGHBOR);
+    printf("  -b mix        heuristiques de la population initiale (defaut %s)\n", DEFAULT_CONSTRUCTION_MIX);
+    printf("  -c coord.csv  coordonnees des villes (Python/output/coord.csv), pour le balayage\n");
+    printf("  -P file       progression en lignes JSON dans file (ex. /dev/stderr)\n");
+    printf("  -p params     parametres de l'algorithme, ex. population_size=300,mutation_rate=0.3\n");
+    printf("                (population_size, mutation_rate, crossover_rate, tournament_size,\n");
+    printf("                elite_size, stagnation_limit, local_search_rate,\n");
+    printf("                crossover: routes, ox ou pmx sur le tour geant decoupe par Split,\n");
+    printf("                restart_diversity: relance sous ce seuil de diversite, 0 pour aucune)\n");
+    printf("  -C config     memes parametres dans un fichier JSON (ex. data/params/small.json)\n");
+    printf("  -t seconds    budget de temps total, lecture des matrices comprise\n");
+    printf("  -F fitness    arret des qu'une solution atteint cette fitness\n");
+    printf("Ctrl-C (SIGINT) ou SIGTERM : arret avec la meilleure solution, enregistree dans data/output.txt\n");
+}
 
 int main(int argc, char* argv[]) {
     Board time_board, dist_board;
-    Solution best_solution, candidate;
-    int run;
-    long long fitness;
-    int best_fitness;
-    clock_t start, end;
-    double elapsed;
+    Solution best_solution;
+    RunResult* results;
+    IslandConfig islands;
+    GAParams params;
+    Individual island_best;
+    const char* files[2];
+    const char* coord_file = NULL;
+    int progress_fd = -1;
+    double* latitude;
+    double* longitude;
+    int num_files = 0;
+    int runs = 3;
+    int neighbors = AUTO_NEIGHBORS;
+    int jobs = available_cores();
+    unsigned int seed = (unsigned int)time(NULL);
+    int best, i, time_size, dist_size;
+    double start, elapsed;
+    double budget = 0.0;
+    double program_start = wall_clock();
     float total_distance_km, fuel_consumption, fuel_cost;
 
-    if (argc < 3) {
-        printf("Usage: %s time_file.csv distance_file.csv\n", argv[0]);
-        return EXIT_FAILURE;
+    solution_new(&best_solution);
+    solution_new(&island_best.solution);
+
+    default_ga_params(&params);
+    islands.islands = 0;
+    islands.migration_interval = 20;
+    islands.migrants = 5;
+    islands.topology = TOPOLOGY_RING;
+
+    for (i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "-r") == 0 && i + 1 < argc) {
+            runs = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "-j") == 0 && i + 1 < argc) {
+            jobs = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "-s") == 0 && i + 1 < argc) {
+            seed = (unsigned int)strtoul(argv[++i], NULL, 10);
+        } else if (strcmp(argv[i], "-i") == 0 && i + 1 < argc) {
+            islands.islands = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "-g") == 0 && i + 1 < argc) {
+            islands.migration_interval = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "-m") == 0 && i + 1 < argc) {
+            islands.migrants = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "-T") == 0 && i + 1 < argc) {
+            if (!parse_topology(argv[++i], &islands.topology)) {
+                usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[i], "-k") == 0 && i + 1 < argc) {
+            neighbors = atoi(argv[++i]);
+            if (neighbors < 0) {
+                usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[i], "-b") == 0 && i + 1 < argc) {
+            if (!set_construction_mix(argv[++i])) {
+                usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[i], "-c") == 0 && i + 1 < argc) {
+            coord_file = argv[++i];
+        } else if (strcmp(argv[i], "-P") == 0 && i + 1 < argc) {
+            progress_fd = open(argv[++i], O_WRONLY | O_CREAT | O_TRUNC, 0644);
+            if (progress_fd < 0) {
+                printf("Impossible d'ouvrir le fichier de progression %s\n", argv[i]);
+                return EXIT_FAILURE;
+            }
+            set_progress_fd(progress_fd);
+        } else if (strcmp(argv[i], "-p") == 0 && i + 1 < argc) {
+            if (!parse_ga_params(&params, argv[++i])) {
+                usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[i], "-C") == 0 && i + 1 < argc) {
+            if (!read_ga_params(argv[++i], &params)) return EXIT_FAILURE;
+        } else if (strcmp(argv[i], "-t") == 0 && i + 1 < argc) {
+            budget = atof(argv[++i]);
+            if (budget <= 0.0) {
+                usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[i], "-F") == 0 && i + 1 < argc) {
+            set_target_fitness(strtoull(argv[++i], NULL, 10));
+        } else if (argv[i][0] != '-' && num_files < 2) {
+            files[num_files++] = argv[i];
+        } else {
+            usage(argv[0]);
+            return EXIT_FAILURE;
+        }
     }
 
-    initBoard(time_board);
-    initBoard(dist_board);
+    if (!set_ga_params(&params)) {
+        printf("Parametres de l'algorithme incoherents\n");
+        return EXIT_FAILURE;
+    }
+    if (num_files < 2 || runs < 1 || islands.islands == 1 || islands.islands < 0
+        || islands.migration_interval < 1 || islands.migrants < 1 || islands.migrants > params.population_size / 2) {
+        usage(argv[0]);
+        return EXIT_FAILURE;
+    }
+    if (budget > 0.0) set_deadline(program_start + budget);
 
-    if (!fread_board(argv[1], time_board)) {
+    time_board = fread_board(files[0], &time_size);
+    if (time_board == NULL) {
         printf("Erreur lors de la lecture du fichier temps\n");
         return EXIT_FAILURE;
     }
-    if (!fread_board(argv[2], dist_board)) {
+    dist_board = fread_board(files[1], &dist_size);
+    if (dist_board == NULL) {
         printf("Erreur lors de la lecture du fichier distances\n");
         return EXIT_FAILURE;
     }
+    if (time_size != dist_size) {
+        printf("Les matrices temps (%d) et distances (%d) n'ont pas la meme taille\n", time_size, dist_size);
+        return EXIT_FAILURE;
+    }
+    NUM_CITIES = time_size;
+    build_candidates(time_board, dist_board, neighbors);
+
+    if (coord_file != NULL) {
+        latitude = malloc(NUM_CITIES * sizeof(double));
+        longitude = malloc(NUM_CITIES * sizeof(double));
+        if (latitude == NULL || longitude == NULL) {
+            printf("Erreur d'allocation\n");
+            return EXIT_FAILURE;
+        }
+        if (read_coordinates(coord_file, NUM_CITIES, latitude, longitude)) {
+            set_coordinates(latitude, longitude, NUM_CITIES);
+        } else {
+            printf("Coordonnees ignorees : pas de balayage\n");
+        }
+        free(latitude);
+        free(longitude);
+    }
 
     printf("Nombre de villes : %d\n", NUM_CITIES);
     printf("Matrice temps:\n");
@@ -40,28 +190,58 @@ int main(int argc, char* argv[]) {
     printf("\nMatrice distances:\n");
     display_board(dist_board);
 
-    printf("\nDémarrage de l'algorithme génétique...\n");
-    start = clock();
+    if (!catch_interrupts()) {
+        printf("Interruption impossible a intercepter : Ctrl-C arretera sans solution\n");
+    }
 
-    best_fitness = INT_MAX;
+    if (islands.islands > 0) {
+        printf("\nDémarrage du modele en iles (%d iles, migration toutes les %d generations)...\n",
+               islands.islands, islands.migration_interval);
+        start = wall_clock();
 
-    for (run = 0; run < 3; run++) {
-        solve_vrp(time_board, dist_board, &candidate);
-        fitness = calculate_fitness(time_board, dist_board, &candidate);
+        best = island_solve(time_board, dist_board, &islands, seed, &island_best);
 
-        if (fitness < best_fitness) {
-            best_solution = candidate;
-            best_fitness = fitness;
+        elapsed = wall_clock() - start;
+        printf("\nAlgorithme termine en %.2f secondes\n", elapsed);
+        if (best < 0) {
+            printf("Le modele en iles n'a pas abouti\n");
+            return EXIT_FAILURE;
+        }
+        printf("Meilleure solution: ile %d (graine %u), fitness %llu\n",
+               best+1, seed + (unsigned int)best, island_best.fitness);
+        solution_copy(&best_solution, &island_best.solution);
+        solution_free(&island_best.solution);
+    } else {
+        printf("\nDémarrage de l'algorithme génétique (%d executions, %d en parallele)...\n",
+               runs, (jobs < runs) ? jobs : runs);
+        start = wall_clock();
+
+        results = malloc(runs * sizeof(RunResult));
+        if (results == NULL) {
+            printf("Erreur d'allocation\n");
+            return EXIT_FAILURE;
         }
-        printf("Execution %d: fitness=%lld\n", run+1, fitness);
-    }
 
-    end = clock();
-    elapsed = (double)(end - start) / CLOCKS_PER_SEC;
-    printf("\nAlgorithme termine en %.2f secondes\n", elapsed);
+        best = multistart_solve(time_board, dist_board, runs, jobs, seed, results);
+
+        elapsed = wall_clock() - start;
+        printf("\nAlgorithme termine en %.2f secondes\n", elapsed);
+
+        print_run_summary(results, runs, best);
+        if (best < 0) {
+            printf("Aucune execution n'a abouti\n");
+            free_run_results(results, runs);
+            return EXIT_FAILURE;
+        }
+        solution_copy(&best_solution, &results[best].solution);
+        free_run_results(results, runs);
+    }
 
     print_solution(&best_solution);
     write_solution("data/output.txt", &best_solution);
+    if (interrupted()) {
+        printf("\nInterruption : meilleure solution enregistree dans data/output.txt\n");
+    }
 
     /* Calcul des statistiques */
     total_distance_km = best_solution.total_distance / 1000.0f;
@@ -73,5 +253,16 @@ int main(int argc, char* argv[]) {
     printf("Consommation carburant: %.2f L\n", fuel_consumption);
     printf("Coût carburant: %.2f €\n", fuel_cost);
 
+    solution_free(&best_solution);
+    free_candidates();
+    free_local_search();
+    free_giant_tour();
+    free_diversity();
+    free_route_cache();
+    set_coordinates(NULL, NULL, 0);
+    if (progress_fd >= 0) close(progress_fd);
+    board_free(time_board);
+    board_free(dist_board);
+
     return EXIT_SUCCESS;
-}
\ No newline at end of file
+}
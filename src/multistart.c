@@ -0,0 +1,174 @@
+#define _POSIX_C_SOURCE 200112L
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include "inout.h"
+#include "multistart.h"
+#include "genetic.h"
+#include "location.h"
+#include "progress.h"
+
+int available_cores(void) {
+    long n = sysconf(_SC_NPROCESSORS_ONLN);
+    return (n > 0) ? (int)n : 1;
+}
+
+/* Exécution complète d'un run dans le processus courant */
+static void run_once(Board time_board, Board dist_board, unsigned int seed, RunResult* result) {
+    result->seed = seed;
+    solve_vrp(time_board, dist_board, &result->solution, seed, &result->stats);
+    result->fitness = calculate_fitness(time_board, dist_board, &result->solution);
+}
+
+/* Part du budget de temps d'un run lancé maintenant : le temps restant est
+ * partagé entre les vagues de jobs runs encore à lancer (sans budget : rien) */
+static double run_deadline(double deadline, int remaining_runs, int jobs) {
+    int waves = (remaining_runs + jobs - 1) / jobs;
+    double now;
+
+    if (deadline <= 0.0) return 0.0;
+    now = wall_clock();
+    return (deadline > now) ? now + (deadline - now) / waves : deadline;
+}
+
+/* Récupère le résultat du plus ancien processus encore actif */
+static int collect(pid_t pid, int fd, RunResult* result) {
+    int status, ok;
+
+    ok = read_all(fd, &result->seed, sizeof(result->seed))
+         && read_all(fd, &result->fitness, sizeof(result->fitness))
+         && read_all(fd, &result->stats, sizeof(result->stats))
+         && recv_solution(fd, &result->solution);
+    close(fd);
+    waitpid(pid, &status, 0);
+
+    if (!ok || !WIFEXITED(status) || WEXITSTATUS(status) != 0) {
+        fprintf(stderr, "Echec de l'execution (graine %u)\n", result->seed);
+        return 0;
+    }
+    return 1;
+}
+
+int multistart_solve(Board time_board, Board dist_board, int runs, int jobs,
+                     unsigned int base_seed, RunResult* results) {
+    pid_t* pids;
+    int* fds;
+    int* ok;
+    int started = 0, collected = 0, best = -1;
+    double deadline = current_deadline();
+    int i;
+
+    if (runs <= 0) return -1;
+    if (jobs > runs) jobs = runs;
+
+    pids = malloc(runs * sizeof(pid_t));
+    fds = malloc(runs * sizeof(int));
+    ok = calloc(runs, sizeof(int));
+
+    for (i = 0; i < runs; i++) {
+        results[i].seed = base_seed + (unsigned int)i;
+        results[i].fitness = 0;
+        memset(&results[i].stats, 0, sizeof(SolverStats));
+        solution_new(&results[i].solution);
+    }
+
+    if (jobs <= 1) {
+        /* Mode séquentiel : pas de processus fils */
+        for (i = 0; i < runs; i++) {
+            set_deadline(run_deadline(deadline, runs - i, 1));
+            run_once(time_board, dist_board, results[i].seed, &results[i]);
+            ok[i] = 1;
+        }
+        set_deadline(deadline);
+    } else {
+        while (collected < runs) {
+            if (started < runs && started - collected < jobs) {
+                int pipefd[2];
+                pid_t pid;
+
+                if (pipe(pipefd) != 0) {
+                    perror("pipe");
+                    break;
+                }
+
+                /* Vider les tampons avant fork pour ne pas dupliquer la sortie */
+                fflush(stdout);
+                fflush(stderr);
+
+                pid = fork();
+                if (pid == 0) {
+                    RunResult result;
+                    solution_new(&result.solution);
+                    close(pipefd[0]);
+                    set_deadline(run_deadline(deadline, runs - started, jobs));
+                    run_once(time_board, dist_board, results[started].seed, &result);
+                    fflush(stdout);
+                    _exit(write_all(pipefd[1], &result.seed, sizeof(result.seed))
+                          && write_all(pipefd[1], &result.fitness, sizeof(result.fitness))
+                          && write_all(pipefd[1], &result.stats, sizeof(result.stats))
+                          && send_solution(pipefd[1], &result.solution) ? 0 : 1);
+                }
+                close(pipefd[1]);
+                if (pid < 0) {
+                    perror("fork");
+                    close(pipefd[0]);
+                    break;
+                }
+                pids[started] = pid;
+                fds[started] = pipefd[0];
+                started++;
+            } else {
+                ok[collected] = collect(pids[collected], fds[collected], &results[collected]);
+                collected++;
+            }
+        }
+        /* En cas d'erreur de fork, récupérer les processus déjà lancés */
+        while (collected < started) {
+            ok[collected] = collect(pids[collected], fds[collected], &results[collected]);
+            collected++;
+        }
+    }
+
+    for (i = 0; i < runs; i++) {
+        if (ok[i] && (best == -1 || results[i].fitness < results[best].fitness)) {
+            best = i;
+        }
+    }
+
+    free(pids);
+    free(fds);
+    free(ok);
+    return best;
+}
+
+void free_run_results(RunResult* results, int runs) {
+    int i;
+    for (i = 0; i < runs; i++) {
+        solution_free(&results[i].solution);
+    }
+    free(results);
+}
+
+void print_run_summary(RunResult* results, int runs, int best) {
+    int i;
+
+    printf("\nResume des executions:\n");
+    for (i = 0; i < runs; i++) {
+        SolverStats* stats = &results[i].stats;
+        printf("Execution %d: graine=%u fitness=%llu vehicules=%d distance=%d"
+               " generations=%d (%.1f/s) duree=%.2fs clones=%d relances=%d memo=%.0f%%%s\n",
+               i+1, results[i].seed, results[i].fitness,
+               results[i].solution.num_vehicles, results[i].solution.total_distance,
+               stats->generations,
+               (stats->elapsed > stats->init_time) ? stats->generations / (stats->elapsed - stats->init_time) : 0.0,
+               stats->elapsed, stats->clones, stats->restarts, 100.0 * stats->cache_hit_rate, (i == best) ? " (meilleure)" : "");
+    }
+    if (best >= 0) {
+        printf("Meilleure solution: execution %d, graine %u, fitness %llu\n",
+               best+1, results[best].seed, results[best].fitness);
+    }
+}
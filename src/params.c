@@ -0,0 +1,147 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <ctype.h>
+#include "params.h"
+
+#define MAX_PARAM_NAME 32
+#define MAX_PARAM_VALUE 32
+#define MAX_CONFIG_SIZE 4096
+
+static int parse_int(const char* value, int* out) {
+    char* end;
+    long v = strtol(value, &end, 10);
+
+    if (end == value || *end != '\0') return 0;
+    *out = (int)v;
+    return 1;
+}
+
+static int parse_double(const char* value, double* out) {
+    char* end;
+    double v = strtod(value, &end);
+
+    if (end == value || *end != '\0') return 0;
+    *out = v;
+    return 1;
+}
+
+static int parse_crossover(const char* value, Crossover* out) {
+    if (strcmp(value, "routes") == 0) {
+        *out = CROSSOVER_ROUTES;
+    } else if (strcmp(value, "ox") == 0) {
+        *out = CROSSOVER_OX;
+    } else if (strcmp(value, "pmx") == 0) {
+        *out = CROSSOVER_PMX;
+    } else {
+        return 0;
+    }
+    return 1;
+}
+
+int parse_ga_param(GAParams* params, const char* name, const char* value) {
+    if (strcmp(name, "population_size") == 0) return parse_int(value, &params->population_size);
+    if (strcmp(name, "mutation_rate") == 0) return parse_double(value, &params->mutation_rate);
+    if (strcmp(name, "crossover_rate") == 0) return parse_double(value, &params->crossover_rate);
+    if (strcmp(name, "tournament_size") == 0) return parse_int(value, &params->tournament_size);
+    if (strcmp(name, "elite_size") == 0) return parse_int(value, &params->elite_size);
+    if (strcmp(name, "stagnation_limit") == 0) return parse_int(value, &params->stagnation_limit);
+    if (strcmp(name, "local_search_rate") == 0) return parse_double(value, &params->local_search_rate);
+    if (strcmp(name, "crossover") == 0) return parse_crossover(value, &params->crossover);
+    if (strcmp(name, "restart_diversity") == 0) return parse_double(value, &params->restart_diversity);
+    return 0;
+}
+
+/* Copie de [start, end[ dans out (capacity octets), 0 si trop long ou vide */
+static int copy_token(const char* start, const char* end, char* out, size_t capacity) {
+    size_t length = (size_t)(end - start);
+
+    if (length == 0 || length >= capacity) return 0;
+    memcpy(out, start, length);
+    out[length] = '\0';
+    return 1;
+}
+
+int parse_ga_params(GAParams* params, const char* spec) {
+    char name[MAX_PARAM_NAME], value[MAX_PARAM_VALUE];
+    const char* p = spec;
+    const char* equal;
+    const char* end;
+
+    while (*p != '\0') {
+        equal = strchr(p, '=');
+        if (equal == NULL) return 0;
+        end = strchr(equal, ',');
+        if (end == NULL) end = equal + strlen(equal);
+
+        if (!copy_token(p, equal, name, sizeof(name))
+            || !copy_token(equal + 1, end, value, sizeof(value))
+            || !parse_ga_param(params, name, value)) return 0;
+        p = (*end == ',') ? end + 1 : end;
+    }
+    return 1;
+}
+
+static const char* skip_spaces(const char* p) {
+    while (isspace((unsigned char)*p)) p++;
+    return p;
+}
+
+int parse_ga_params_json(GAParams* params, const char* text) {
+    char name[MAX_PARAM_NAME], value[MAX_PARAM_VALUE];
+    const char* p = skip_spaces(text);
+    const char* end;
+
+    if (*p++ != '{') return 0;
+    p = skip_spaces(p);
+    if (*p == '}') return *skip_spaces(p + 1) == '\0';
+
+    for (;;) {
+        /* "nom" */
+        if (*p++ != '"') return 0;
+        end = strchr(p, '"');
+        if (end == NULL || !copy_token(p, end, name, sizeof(name))) return 0;
+        p = skip_spaces(end + 1);
+        if (*p++ != ':') return 0;
+
+        /* Valeur numérique ou chaîne sans échappement */
+        p = skip_spaces(p);
+        if (*p == '"') {
+            end = strchr(++p, '"');
+            if (end == NULL) return 0;
+        } else {
+            end = p;
+            while (*end != '\0' && *end != ',' && *end != '}' && !isspace((unsigned char)*end)) end++;
+        }
+        if (!copy_token(p, end, value, sizeof(value)) || !parse_ga_param(params, name, value)) return 0;
+
+        p = skip_spaces((*end == '"') ? end + 1 : end);
+        if (*p == '}') return *skip_spaces(p + 1) == '\0';
+        if (*p++ != ',') return 0;
+        p = skip_spaces(p);
+    }
+}
+
+int read_ga_params(const char* file, GAParams* params) {
+    FILE* f = fopen(file, "r");
+    char text[MAX_CONFIG_SIZE];
+    size_t length;
+
+    if (f == NULL) {
+        fprintf(stderr, "Erreur d'ouverture du fichier %s\n", file);
+        return 0;
+    }
+    length = fread(text, 1, sizeof(text) - 1, f);
+    fclose(f);
+    if (length == sizeof(text) - 1) {
+        fprintf(stderr, "%s : fichier de configuration trop long\n", file);
+        return 0;
+    }
+    text[length] = '\0';
+
+    if (!parse_ga_params_json(params, text)) {
+        fprintf(stderr, "%s : configuration invalide\n", file);
+        return 0;
+    }
+    return 1;
+}
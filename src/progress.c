@@ -0,0 +1,103 @@
+#define _XOPEN_SOURCE 600
+
+#include <stdio.h>
+#include <string.h>
+#include <signal.h>
+#include <poll.h>
+#include <unistd.h>
+#include "progress.h"
+#include "inout.h"
+
+static int progress_fd = -1;
+static int stop_fd = -1;
+static int interrupt_pipe[2] = { -1, -1 };
+static volatile sig_atomic_t interrupt_received = 0;
+static double deadline = 0.0;
+static unsigned long long target_fitness = 0;
+
+void set_progress_fd(int fd) {
+    progress_fd = fd;
+}
+
+int progress_enabled(void) {
+    return progress_fd >= 0;
+}
+
+void report_progress(unsigned int seed, int generation, const Individual* best,
+                     double gen_per_s, double elapsed, int final) {
+    char line[512];
+    int length;
+
+    if (progress_fd < 0) return;
+
+    length = sprintf(line,
+        "{\"seed\":%u,\"generation\":%d,\"fitness\":%llu,\"vehicles\":%d,\"distance\":%d,"
+        "\"duration\":%d,\"gen_per_s\":%.1f,\"elapsed\":%.3f,\"final\":%s}\n",
+        seed, generation, best->fitness, best->solution.num_vehicles,
+        best->solution.total_distance, best->solution.total_duration,
+        gen_per_s, elapsed, final ? "true" : "false");
+    write_all(progress_fd, line, (size_t)length);
+}
+
+void set_stop_fd(int fd) {
+    stop_fd = fd;
+}
+
+int stop_requested(void) {
+    struct pollfd p;
+
+    if (stop_fd < 0) return 0;
+    p.fd = stop_fd;
+    p.events = POLLIN;
+    p.revents = 0;
+    return poll(&p, 1, 0) > 0;
+}
+
+static void on_interrupt(int signal_number) {
+    ssize_t written;
+
+    (void)signal_number;
+    interrupt_received = 1;
+    written = write(interrupt_pipe[1], "x", 1);
+    (void)written;
+}
+
+int catch_interrupts(void) {
+    struct sigaction action;
+
+    if (interrupt_pipe[0] < 0 && pipe(interrupt_pipe) != 0) return 0;
+
+    memset(&action, 0, sizeof(action));
+    action.sa_handler = on_interrupt;
+    sigemptyset(&action.sa_mask);
+    /* Lectures des tubes reprises après le signal ; le second signal est fatal */
+    action.sa_flags = SA_RESTART | SA_RESETHAND;
+    if (sigaction(SIGINT, &action, NULL) != 0 || sigaction(SIGTERM, &action, NULL) != 0) return 0;
+
+    set_stop_fd(interrupt_pipe[0]);
+    return 1;
+}
+
+int interrupted(void) {
+    return interrupt_received;
+}
+
+void set_deadline(double wall_time) {
+    deadline = wall_time;
+}
+
+double current_deadline(void) {
+    return deadline;
+}
+
+int time_is_up(void) {
+    return deadline > 0.0 && wall_clock() >= deadline;
+}
+
+void set_target_fitness(unsigned long long target) {
+    target_fitness = target;
+}
+
+int target_reached(unsigned long long fitness) {
+    return target_fitness > 0 && fitness <= target_fitness;
+}
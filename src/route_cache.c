@@ -0,0 +1,86 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "route_cache.h"
+#include "genetic.h"
+
+typedef struct {
+    unsigned long long key;   /* empreinte de la séquence, 0 pour une case libre */
+    int length;
+    int duration;
+    int distance;
+} CacheEntry;
+
+static CacheEntry* table = NULL;
+static unsigned long lookups = 0;
+static unsigned long hits = 0;
+
+void free_route_cache(void) {
+    free(table);
+    table = NULL;
+}
+
+void reset_route_cache_stats(void) {
+    lookups = hits = 0;
+}
+
+double route_cache_hit_rate(void) {
+    return (lookups > 0) ? (double)hits / lookups : 0.0;
+}
+
+/* Empreinte de la séquence (FNV-1a sur les villes, puis finaliseur de
+ * splitmix64) : dépend de l'ordre, une route et son inverse diffèrent */
+static unsigned long long sequence_hash(const Route* route) {
+    unsigned long long h = 0xCBF29CE484222325ULL;
+    int i;
+
+    for (i = 0; i < route->length; i++) {
+        h = (h ^ (unsigned long long)(route->path[i] + 1)) * 0x100000001B3ULL;
+    }
+    h ^= h >> 30;
+    h *= 0xBF58476D1CE4E5B9ULL;
+    h ^= h >> 27;
+    h *= 0x94D049BB133111EBULL;
+    h ^= h >> 31;
+    return (h != 0) ? h : 1;
+}
+
+void evaluate_route(Board time_board, Board dist_board, Route* route) {
+    unsigned long long key;
+    CacheEntry* entry;
+
+    if (route->length == 0) {
+        route->duration = route->distance = 0;
+        return;
+    }
+    if (table == NULL) {
+        table = calloc(ROUTE_CACHE_SIZE, sizeof(CacheEntry));
+        if (table == NULL) {
+            fprintf(stderr, "Erreur d'allocation memoire\n");
+            exit(EXIT_FAILURE);
+        }
+    }
+
+    key = sequence_hash(route);
+    entry = &table[key & (ROUTE_CACHE_SIZE - 1)];
+    lookups++;
+    if (entry->key == key && entry->length == route->length) {
+        hits++;
+        route->duration = entry->duration;
+        route->distance = entry->distance;
+#ifdef DEBUG_FITNESS
+        if (route->duration != route_duration(time_board, route)
+            || route->distance != route_distance(dist_board, route)) {
+            fprintf(stderr, "Collision dans le memo des routes\n");
+            abort();
+        }
+#endif
+        return;
+    }
+
+    route->duration = route_duration(time_board, route);
+    route->distance = route_distance(dist_board, route);
+    entry->key = key;
+    entry->length = route->length;
+    entry->duration = route->duration;
+    entry->distance = route->distance;
+}
@@ -0,0 +1,185 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "solver.h"
+#include "genetic.h"
+#include "multistart.h"
+#include "island.h"
+#include "candidates.h"
+#include "construction.h"
+#include "progress.h"
+#include "params.h"
+#include "local_search.h"
+#include "giant_tour.h"
+#include "diversity.h"
+#include "route_cache.h"
+#include "location.h"
+
+/* Copie des routes d'une solution dans les tableaux de sortie */
+static int export_solution(Solution* best, int* routes, int routes_capacity,
+                           int* route_lengths, int lengths_capacity) {
+    int r, i, k = 0;
+
+    if (best->num_vehicles > lengths_capacity) return -1;
+
+    for (r = 0; r < best->num_vehicles; r++) {
+        Route* route = &best->routes[r];
+        if (k + route->length > routes_capacity) return -1;
+        for (i = 0; i < route->length; i++) {
+            routes[k++] = route->path[i];
+        }
+        route_lengths[r] = route->length;
+    }
+    return best->num_vehicles;
+}
+
+static int num_neighbors = AUTO_NEIGHBORS;
+static double time_limit = 0.0;
+static SolverStats last_stats;
+
+void vrp_set_neighbors(int k) {
+    num_neighbors = (k >= 0) ? k : AUTO_NEIGHBORS;
+}
+
+int vrp_set_construction(const char* mix) {
+    return set_construction_mix((mix != NULL) ? mix : DEFAULT_CONSTRUCTION_MIX);
+}
+
+void vrp_set_coordinates(const double* latitude, const double* longitude, int num_cities) {
+    set_coordinates(latitude, longitude, num_cities);
+}
+
+void vrp_set_control(int progress_fd, int stop_fd) {
+    set_progress_fd(progress_fd);
+    set_stop_fd(stop_fd);
+}
+
+int vrp_set_params(const char* json) {
+    GAParams params;
+
+    default_ga_params(&params);
+    if (json != NULL && !parse_ga_params_json(&params, json)) return 0;
+    return set_ga_params(&params);
+}
+
+void vrp_set_limits(double seconds, unsigned long long target_fitness) {
+    time_limit = (seconds > 0.0) ? seconds : 0.0;
+    set_target_fitness(target_fitness);
+}
+
+/* Matrices de l'instance : pointeurs de lignes posés sur les tableaux de
+ * l'appelant, sans copie (le solveur ne les modifie pas) */
+static int load_instance(const int* time_matrix, const int* dist_matrix, int num_cities,
+                         Board* time_board, Board* dist_board) {
+    if (num_cities <= 0) {
+        fprintf(stderr, "Nombre de villes invalide : %d\n", num_cities);
+        return 0;
+    }
+
+    /* Le budget court à partir de l'appel */
+    set_deadline((time_limit > 0.0) ? wall_clock() + time_limit : 0.0);
+    NUM_CITIES = num_cities;
+    *time_board = board_wrap((int*)time_matrix, num_cities);
+    *dist_board = board_wrap((int*)dist_matrix, num_cities);
+    build_candidates(*time_board, *dist_board, num_neighbors);
+    return 1;
+}
+
+static void release_instance(Board time_board, Board dist_board) {
+    free_candidates();
+    free_local_search();
+    free_giant_tour();
+    free_diversity();
+    free_route_cache();
+    board_release(time_board);
+    board_release(dist_board);
+}
+
+int vrp_solve(const int* time_matrix, const int* dist_matrix, int num_cities,
+              int runs, int jobs, unsigned int seed,
+              int* routes, int routes_capacity,
+              int* route_lengths, int lengths_capacity,
+              unsigned long long* fitness, unsigned int* best_seed) {
+    Board time_board, dist_board;
+    RunResult* results;
+    int best_run, num_vehicles;
+
+    memset(&last_stats, 0, sizeof(last_stats));
+    if (runs < 1 || !load_instance(time_matrix, dist_matrix, num_cities, &time_board, &dist_board)) return -1;
+
+    results = malloc(runs * sizeof(RunResult));
+    if (results == NULL) {
+        release_instance(time_board, dist_board);
+        return -1;
+    }
+
+    best_run = multistart_solve(time_board, dist_board, runs, jobs, seed, results);
+    release_instance(time_board, dist_board);
+    if (best_run < 0) {
+        free_run_results(results, runs);
+        return -1;
+    }
+    if (fitness != NULL) *fitness = results[best_run].fitness;
+    if (best_seed != NULL) *best_seed = results[best_run].seed;
+    last_stats = results[best_run].stats;
+
+    num_vehicles = export_solution(&results[best_run].solution, routes, routes_capacity,
+                                   route_lengths, lengths_capacity);
+    free_run_results(results, runs);
+    return num_vehicles;
+}
+
+int vrp_solve_islands(const int* time_matrix, const int* dist_matrix, int num_cities,
+                      int islands, int migration_interval, int migrants, int topology,
+                      unsigned int seed,
+                      int* routes, int routes_capacity,
+                      int* route_lengths, int lengths_capacity,
+                      unsigned long long* fitness, unsigned int* best_seed) {
+    Board time_board, dist_board;
+    IslandConfig config;
+    Individual best;
+    int best_island, num_vehicles;
+
+    memset(&last_stats, 0, sizeof(last_stats));
+    if (islands < 2 || migration_interval < 1 || migrants < 1 || migrants > ga_params()->population_size / 2) return -1;
+    if (!load_instance(time_matrix, dist_matrix, num_cities, &time_board, &dist_board)) return -1;
+
+    config.islands = islands;
+    config.migration_interval = migration_interval;
+    config.migrants = migrants;
+    config.topology = (topology == TOPOLOGY_FULL) ? TOPOLOGY_FULL : TOPOLOGY_RING;
+
+    solution_new(&best.solution);
+    best_island = island_solve(time_board, dist_board, &config, seed, &best);
+    release_instance(time_board, dist_board);
+    if (best_island < 0) {
+        solution_free(&best.solution);
+        return -1;
+    }
+
+    if (fitness != NULL) *fitness = best.fitness;
+    if (best_seed != NULL) *best_seed = seed + (unsigned int)best_island;
+
+    num_vehicles = export_solution(&best.solution, routes, routes_capacity, route_lengths, lengths_capacity);
+    solution_free(&best.solution);
+    return num_vehicles;
+}
+
+int vrp_last_stats(int* generations, double* init_time, double* elapsed,
+                   int* restarts, int* clones, double* diversity, double* cache_hit_rate,
+                   double* trace_time, unsigned long long* trace_fitness, int capacity) {
+    int i, length = (last_stats.trace_length < capacity) ? last_stats.trace_length : capacity;
+
+    *generations = last_stats.generations;
+    *init_time = last_stats.init_time;
+    *elapsed = last_stats.elapsed;
+    *restarts = last_stats.restarts;
+    *clones = last_stats.clones;
+    *diversity = last_stats.diversity;
+    *cache_hit_rate = last_stats.cache_hit_rate;
+    for (i = 0; i < length; i++) {
+        trace_time[i] = last_stats.trace_time[i];
+        trace_fitness[i] = last_stats.trace_fitness[i];
+    }
+    return length;
+}